@@ -16,6 +16,11 @@ from datetime import datetime
 import sys
 import os
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pensioner_rollup import refresh_rollup
+from pensioner_facts import is_unified
+from ppo_registry import PPORegistry
+
 class DLCPortalProcessor:
     def __init__(self, db_path='dlc_portal_database.db'):
         self.db_path = db_path
@@ -91,14 +96,15 @@ class DLCPortalProcessor:
             )
         ''')
         
-        # Create indexes for fast queries
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_ppo ON dlc_pensioner_data(ppo_number)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pensioner_pincode ON dlc_pensioner_data(pensioner_pincode_clean)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_branch_pincode ON dlc_pensioner_data(branch_pincode_clean)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_age_category ON dlc_pensioner_data(age_category)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pensioner_state ON dlc_pensioner_data(pensioner_state)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pensioner_district ON dlc_pensioner_data(pensioner_district)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_psa_type ON dlc_pensioner_data(psa_type)')
+        # Create indexes for fast queries (once unified by pensioner_facts.py they live on pensioner_fact)
+        if not is_unified(self.conn, 'dlc_pensioner_data'):
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_ppo ON dlc_pensioner_data(ppo_number)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_pensioner_pincode ON dlc_pensioner_data(pensioner_pincode_clean)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_branch_pincode ON dlc_pensioner_data(branch_pincode_clean)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_age_category ON dlc_pensioner_data(age_category)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_pensioner_state ON dlc_pensioner_data(pensioner_state)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_pensioner_district ON dlc_pensioner_data(pensioner_district)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_psa_type ON dlc_pensioner_data(psa_type)')
         
         # Summary table for quick statistics
         cursor.execute('''
@@ -118,6 +124,7 @@ class DLCPortalProcessor:
         ''')
         
         self.conn.commit()
+        self.ppo_registry = PPORegistry(self.conn)
         print("✓ Database tables created successfully")
     
     def extract_pincode(self, text):
@@ -374,6 +381,7 @@ class DLCPortalProcessor:
                         print(f"\n  ✗ Error at row {idx}: {e}")
             
             self.conn.commit()
+            registry = self.ppo_registry.sync('dlc_pensioner_data')
             
             # Update summary
             self.update_pincode_summary()
@@ -383,6 +391,7 @@ class DLCPortalProcessor:
             print(f"{'='*80}")
             print(f"✓ Inserted: {inserted:,} records")
             print(f"⚠ Duplicates skipped: {duplicates:,}")
+            print(f"⚠ PPOs already loaded from another source: {registry['cross_source']:,}")
             print(f"✗ Errors: {errors:,}")
             print(f"{'='*80}\n")
             
@@ -580,6 +589,7 @@ def main():
     try:
         # Process file
         processor.process_excel_file(file_path, sheet_name)
+        refresh_rollup(processor.conn)
         
         # Show statistics
         processor.get_statistics()
@@ -4,9 +4,105 @@ Query DLC Portal Database
 Interactive tool to query and analyze DLC pensioner data
 """
 
+import argparse
+import csv
+import gzip
+import io
+import os
+import re
 import sqlite3
 import sys
+import time
 from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pensioner_rollup import refresh_rollup
+
+EXPORT_COLUMNS = [
+    'ppo_number', 'birth_year', 'age', 'age_category',
+    'psa_type', 'psa_division', 'psa_area',
+    'pensioner_pincode_clean', 'pensioner_district', 'pensioner_state',
+    'branch_pincode_clean', 'branch_district', 'branch_state'
+]
+EXPORT_HEADER = [
+    'PPO Number', 'Birth Year', 'Age', 'Age Category', 'PSA Type', 'PSA Division', 'PSA Area',
+    'Pensioner Pincode', 'Pensioner District', 'Pensioner State',
+    'Branch Pincode', 'Branch District', 'Branch State'
+]
+EXPORT_BATCH_SIZE = 50000
+COMPRESSION_EXTENSIONS = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+def _with_extension(path, extension):
+    """Replace any export extension (.csv, .parquet, .gz, .zst) on path with extension"""
+    base = path
+    while True:
+        stripped = next((base[:-len(ext)] for ext in ('.gz', '.zst', '.csv', '.parquet') if base.endswith(ext)), None)
+        if stripped is None:
+            return base + extension
+        base = stripped
+
+
+class _CSVSink:
+    """CSV file (optionally gzip/zstd) written one encoded batch at a time"""
+    
+    def __init__(self, path, compression=None):
+        self.raw = open(path, 'wb')
+        if compression == 'gzip':
+            self.out = gzip.GzipFile(fileobj=self.raw, mode='wb', compresslevel=6)
+        elif compression == 'zstd':
+            self.out = zstandard.ZstdCompressor(level=3).stream_writer(self.raw, closefd=False)
+        else:
+            self.out = self.raw
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.write([EXPORT_HEADER])
+    
+    def write(self, rows):
+        self.writer.writerows(rows)
+        self.out.write(self.buffer.getvalue().encode('utf-8'))
+        self.buffer.seek(0)
+        self.buffer.truncate()
+    
+    def close(self):
+        if self.out is not self.raw:
+            self.out.close()
+        self.raw.close()
+
+
+class _ParquetSink:
+    """Parquet file written one row group per batch"""
+    
+    def __init__(self, path, compression='zstd'):
+        self.schema = pa.schema([
+            (column, pa.int64() if column in ('birth_year', 'age') else pa.string())
+            for column in EXPORT_COLUMNS
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema, compression=compression)
+    
+    def write(self, rows):
+        columns = list(zip(*rows))
+        self.writer.write_table(pa.table(
+            [pa.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+            schema=self.schema
+        ))
+    
+    def close(self):
+        self.writer.close()
+
 
 class DLCDataQuery:
     def __init__(self, db_path='dlc_portal_database.db'):
@@ -19,6 +115,7 @@ class DLCDataQuery:
             self.conn = sqlite3.connect(self.db_path)
             self.conn.row_factory = sqlite3.Row
             print(f"✓ Connected to {self.db_path}")
+            refresh_rollup(self.conn, verbose=False)
             return True
         except Exception as e:
             print(f"✗ Error connecting: {e}")
@@ -190,12 +287,14 @@ class DLCDataQuery:
         print(f"AGE ANALYSIS")
         print(f"{'='*80}\n")
         
-        # Overall age distribution
+        # Overall age distribution (from the rollup cube)
         cursor.execute('''
-            SELECT age_category, COUNT(*) as count,
-                   ROUND(COUNT(*) * 100.0 / (SELECT COUNT(*) FROM dlc_pensioner_data), 2) as percentage
-            FROM dlc_pensioner_data
-            GROUP BY age_category
+            SELECT age_bucket as age_category, SUM(pensioners) as count,
+                   ROUND(SUM(pensioners) * 100.0 / (SELECT SUM(pensioners) FROM pensioner_rollup
+                                                    WHERE source_table = 'dlc_pensioner_data'), 2) as percentage
+            FROM pensioner_rollup
+            WHERE source_table = 'dlc_pensioner_data'
+            GROUP BY age_bucket
             ORDER BY count DESC
         ''')
         
@@ -208,10 +307,12 @@ class DLCDataQuery:
         # Average age by state
         print(f"\n📊 Average Age by State (Top 10):")
         cursor.execute('''
-            SELECT pensioner_state, AVG(age) as avg_age, COUNT(*) as count
-            FROM dlc_pensioner_data
-            WHERE age IS NOT NULL AND pensioner_state IS NOT NULL
-            GROUP BY pensioner_state
+            SELECT state as pensioner_state, SUM(age_sum) * 1.0 / SUM(age_count) as avg_age,
+                   SUM(age_count) as count
+            FROM pensioner_rollup
+            WHERE source_table = 'dlc_pensioner_data' AND state != ''
+            GROUP BY state
+            HAVING SUM(age_count) > 0
             ORDER BY count DESC
             LIMIT 10
         ''')
@@ -219,36 +320,121 @@ class DLCDataQuery:
         for row in cursor.fetchall():
             print(f"  {row['pensioner_state']}: {row['avg_age']:.1f} years (n={row['count']:,})")
     
-    def export_to_csv(self, output_file='dlc_export.csv'):
-        """Export data to CSV"""
+    def _iter_export_batches(self, where=None, params=(), batch_size=EXPORT_BATCH_SIZE):
+        """Stream export rows as plain tuples, ordered by state/district/pincode"""
         cursor = self.conn.cursor()
-        
-        print(f"\n📤 Exporting data to {output_file}...")
-        
-        cursor.execute('''
-            SELECT 
-                ppo_number, birth_year, age, age_category,
-                psa_type, psa_division, psa_area,
-                pensioner_pincode_clean, pensioner_district, pensioner_state,
-                branch_pincode_clean, branch_district, branch_state
+        # Tuples are much cheaper than sqlite3.Row for bulk export
+        cursor.row_factory = None
+        cursor.arraysize = batch_size
+        where_sql = f"WHERE {where}" if where else ""
+        cursor.execute(f'''
+            SELECT {', '.join(EXPORT_COLUMNS)}
             FROM dlc_pensioner_data
+            {where_sql}
             ORDER BY pensioner_state, pensioner_district, pensioner_pincode_clean
-        ''')
-        
-        with open(output_file, 'w') as f:
-            # Write header
-            f.write("PPO Number,Birth Year,Age,Age Category,PSA Type,PSA Division,PSA Area,")
-            f.write("Pensioner Pincode,Pensioner District,Pensioner State,")
-            f.write("Branch Pincode,Branch District,Branch State\n")
-            
-            # Write data
-            for row in cursor.fetchall():
-                f.write(f"{row['ppo_number']},{row['birth_year']},{row['age']},{row['age_category']},")
-                f.write(f"{row['psa_type']},{row['psa_division']},{row['psa_area']},")
-                f.write(f"{row['pensioner_pincode_clean']},{row['pensioner_district']},{row['pensioner_state']},")
-                f.write(f"{row['branch_pincode_clean']},{row['branch_district']},{row['branch_state']}\n")
-        
-        print(f"✓ Export complete!")
+        ''', params)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            yield batch
+    
+    def _export(self, open_sink, output_file, where, params, partition_by_state, output_dir, batch_size):
+        """
+        Drive an export: one sink for the whole table, or one per state (rows
+        arrive sorted by state, so only one partition file is open at a time)
+        """
+        started = time.time()
+        rows = 0
+        files = []
+        
+        if partition_by_state:
+            os.makedirs(output_dir, exist_ok=True)
+            name = os.path.basename(output_file)
+            stem, suffix = name.split('.', 1) if '.' in name else (name, '')
+            state_index = EXPORT_COLUMNS.index('pensioner_state')
+            used_names = set()
+            sink = None
+            current_state = object()
+            try:
+                for batch in self._iter_export_batches(where, params, batch_size):
+                    for state, group in groupby(batch, key=itemgetter(state_index)):
+                        if state != current_state:
+                            if sink is not None:
+                                sink.close()
+                            current_state = state
+                            part = re.sub(r'[^A-Za-z0-9]+', '_', state or '').strip('_').upper() or 'UNKNOWN'
+                            while part.lower() in used_names:
+                                part += '_'
+                            used_names.add(part.lower())
+                            path = os.path.join(output_dir, f"{stem}_{part}.{suffix}" if suffix else f"{stem}_{part}")
+                            sink = open_sink(path)
+                            files.append(path)
+                        group = list(group)
+                        sink.write(group)
+                        rows += len(group)
+            finally:
+                if sink is not None:
+                    sink.close()
+        else:
+            sink = open_sink(output_file)
+            files.append(output_file)
+            try:
+                for batch in self._iter_export_batches(where, params, batch_size):
+                    sink.write(batch)
+                    rows += len(batch)
+            finally:
+                sink.close()
+        
+        elapsed = time.time() - started
+        size_mb = sum(os.path.getsize(path) for path in files) / (1024 * 1024)
+        print(f"✓ Export complete! {rows:,} rows in {len(files)} file(s), {size_mb:.1f} MB, "
+              f"{elapsed:.1f}s ({rows / elapsed if elapsed else 0:,.0f} rows/s)")
+        return {'rows': rows, 'files': files, 'seconds': round(elapsed, 2)}
+    
+    def export_to_csv(self, output_file='dlc_export.csv', where=None, params=(), compression=None,
+                      partition_by_state=False, output_dir='csv_exports', batch_size=EXPORT_BATCH_SIZE):
+        """
+        Export data to CSV, streamed in fetchmany batches through csv.writer
+        
+        Args:
+            output_file (str): Target file; with partition_by_state its name is the
+                pattern for <output_dir>/<stem>_<STATE>.<ext>
+            where (str): Optional SQL filter on dlc_pensioner_data (without WHERE)
+            params (tuple): Parameters for placeholders in where
+            compression (str): None, 'gzip' or 'zstd' (inferred from .gz/.zst if None)
+            partition_by_state (bool): One file per pensioner_state
+            output_dir (str): Directory for partitioned files
+            batch_size (int): Rows per fetchmany batch
+        
+        Returns:
+            dict: rows, files and seconds
+        """
+        if compression is None:
+            compression = 'gzip' if output_file.endswith('.gz') else 'zstd' if output_file.endswith('.zst') else None
+        if compression not in (None, 'gzip', 'zstd'):
+            raise ValueError(f"Unsupported compression: {compression}")
+        if compression == 'zstd' and zstandard is None:
+            raise RuntimeError("zstd output needs the zstandard package (pip install zstandard)")
+        output_file = _with_extension(output_file, '.csv' + COMPRESSION_EXTENSIONS[compression])
+        
+        print(f"\n📤 Exporting data to {output_dir + '/' if partition_by_state else ''}{output_file}...")
+        return self._export(lambda path: _CSVSink(path, compression), output_file, where, params,
+                            partition_by_state, output_dir, batch_size)
+    
+    def export_to_parquet(self, output_file='dlc_export.parquet', where=None, params=(), compression='zstd',
+                          partition_by_state=False, output_dir='csv_exports', batch_size=EXPORT_BATCH_SIZE):
+        """
+        Export data to Parquet (one row group per batch); arguments as export_to_csv,
+        compression is the Parquet codec ('zstd', 'snappy', 'gzip' or 'none')
+        """
+        if pa is None:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+        output_file = _with_extension(output_file, '.parquet')
+        
+        print(f"\n📤 Exporting data to {output_dir + '/' if partition_by_state else ''}{output_file}...")
+        return self._export(lambda path: _ParquetSink(path, compression), output_file, where, params,
+                            partition_by_state, output_dir, batch_size)
     
     def close(self):
         """Close connection"""
@@ -261,13 +447,34 @@ def main():
     print("DLC PORTAL DATA QUERY TOOL")
     print("="*80)
     
-    db_path = sys.argv[1] if len(sys.argv) > 1 else 'dlc_portal_database.db'
+    parser = argparse.ArgumentParser(description="Query and export DLC portal pensioner data")
+    parser.add_argument("db_path", nargs="?", default="dlc_portal_database.db")
+    parser.add_argument("--export", metavar="FILE", help="Export non-interactively (e.g. dlc_export.csv.gz) and exit")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--compression", help="csv: gzip or zstd; parquet: zstd, snappy, gzip or none")
+    parser.add_argument("--where", help="SQL filter on dlc_pensioner_data, e.g. \"pensioner_state = 'ASSAM'\"")
+    parser.add_argument("--partition-by-state", action="store_true", help="One file per state")
+    parser.add_argument("--output-dir", default="csv_exports", help="Directory for partitioned files")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
     
-    query = DLCDataQuery(db_path)
+    query = DLCDataQuery(args.db_path)
     
     if not query.connect():
         return
     
+    if args.export:
+        try:
+            options = dict(where=args.where, partition_by_state=args.partition_by_state,
+                           output_dir=args.output_dir, batch_size=args.batch_size)
+            if args.format == 'parquet':
+                query.export_to_parquet(args.export, compression=args.compression or 'zstd', **options)
+            else:
+                query.export_to_csv(args.export, compression=args.compression, **options)
+        finally:
+            query.close()
+        return
+    
     try:
         print("\n" + "="*80)
         print("INTERACTIVE QUERY MODE")
@@ -4,13 +4,42 @@ Comprehensive Pincode Processor
 Extracts pincode data from ALL Excel files and database tables
 """
 
+import argparse
 import sqlite3
 import pandas as pd
 import os
 import re
+import time
 from datetime import datetime
 import traceback
 
+from pensioner_rollup import detect_table_change
+from pincode_statistics import refresh_pincode_statistics
+
+# How each database table feeds the pincode layer: one entry per derived
+# data_source. Missing attribute columns are NULL, a missing 'total' counts
+# rows, missing age columns are 0. 'skip_same_as' drops rows whose cleaned
+# pincode equals that column's (the pincode was already counted).
+PINCODE_DB_SOURCES = [
+    {'table': 'bank_pensioner_data', 'data_source': 'bank_pensioner_data', 'pincode': 'branch_pin_code',
+     'state': 'bank_state', 'city': 'bank_city', 'bank_name': 'bank_name', 'bank_ifsc': 'bank_ifsc',
+     'total': 'grand_total', 'age_less_than_80': 'age_less_than_80', 'age_more_than_80': 'age_more_than_80',
+     'age_not_available': 'age_not_available'},
+    {'table': 'doppw_pensioner_data', 'data_source': 'doppw_pensioner_data_branch', 'pincode': 'branch_pincode',
+     'state': 'branch_state'},
+    {'table': 'doppw_pensioner_data', 'data_source': 'doppw_pensioner_data_pensioner', 'pincode': 'pensioner_pincode',
+     'state': 'pensioner_state', 'district': 'pensioner_district'},
+    {'table': 'dot_pensioner_data', 'data_source': 'dot_pensioner_data', 'pincode': 'pensioner_pincode'},
+    {'table': 'dot_pensioner_data', 'data_source': 'dot_pensioner_data_pda', 'pincode': 'pda_pincode',
+     'skip_same_as': 'pensioner_pincode'},
+    {'table': 'ubi1_pensioner_data', 'data_source': 'ubi1_pensioner_data', 'pincode': 'pensioner_pincode',
+     'state': 'pensioner_state', 'city': 'pensioner_city'},
+    {'table': 'ubi3_pensioner_data', 'data_source': 'ubi3_pensioner_data_branch', 'pincode': 'branch_pincode',
+     'state': 'pensioner_state', 'city': 'pensioner_city'},
+    {'table': 'ubi3_pensioner_data', 'data_source': 'ubi3_pensioner_data_pensioner', 'pincode': 'pensioner_pincode',
+     'state': 'pensioner_state', 'city': 'pensioner_city', 'skip_same_as': 'branch_pincode'},
+]
+
 class ComprehensivePincodeProcessor:
     def __init__(self, db_path='database.db', excel_dir='Excel Files'):
         self.db_path = db_path
@@ -267,210 +296,137 @@ class ComprehensivePincodeProcessor:
                     file_path = os.path.join(oct_dir, file)
                     self.process_excel_file(file_path)
     
-    def process_database_tables(self):
-        """Extract pincode data from existing database tables"""
+    def process_database_tables(self, rebuild=False):
+        """
+        Fold the database tables into pincode_master / pensioner_pincode_data
+
+        Each source is aggregated in SQL (raw values grouped first, so
+        clean_pincode runs once per distinct raw pincode) and written with one
+        INSERT ... SELECT per target table. Only rows above the table's rowid
+        watermark are folded in; a table whose old rows were deleted or replaced
+        has its derived rows dropped and is folded in again.
+
+        Args:
+            rebuild (bool): Ignore the watermarks and refold every table
+        """
         print("\n" + "="*80)
         print("📊 PROCESSING DATABASE TABLES")
         print("="*80)
         
-        cursor = self.conn.cursor()
-        
-        # 1. bank_pensioner_data
-        print("\n📋 bank_pensioner_data")
-        try:
-            cursor.execute('''
-                SELECT branch_pin_code, bank_state, bank_city, bank_name, bank_ifsc,
-                       SUM(age_less_than_80), SUM(age_more_than_80), SUM(age_not_available), SUM(grand_total)
-                FROM bank_pensioner_data
-                WHERE branch_pin_code IS NOT NULL AND branch_pin_code != ''
-                GROUP BY branch_pin_code, bank_state, bank_city, bank_name, bank_ifsc
-            ''')
-            
-            count = 0
-            for row in cursor.fetchall():
-                pincode = self.clean_pincode(row[0])
-                if pincode:
-                    self.update_pincode_tables(
-                        pincode, row[1], None, row[2], row[3], row[4],
-                        row[8], row[5], row[6], row[7],
-                        'bank_pensioner_data', '', ''
-                    )
-                    count += 1
-            
-            self.conn.commit()
-            print(f"  ✓ {count} records processed")
-            self.stats['db_records'] += count
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-        
-        # 2. doppw_pensioner_data
-        print("\n📋 doppw_pensioner_data")
-        try:
-            cursor.execute('''
-                SELECT branch_pincode, branch_state, pensioner_pincode, pensioner_state, pensioner_district,
-                       COUNT(*) as count
-                FROM doppw_pensioner_data
-                WHERE branch_pincode IS NOT NULL OR pensioner_pincode IS NOT NULL
-                GROUP BY branch_pincode, branch_state, pensioner_pincode, pensioner_state, pensioner_district
-            ''')
-            
-            count = 0
-            for row in cursor.fetchall():
-                # Branch pincode
-                branch_pin = self.clean_pincode(row[0])
-                if branch_pin:
-                    self.update_pincode_tables(
-                        branch_pin, row[1], None, None, None, None,
-                        row[5], 0, 0, 0,
-                        'doppw_pensioner_data_branch', '', ''
-                    )
-                    count += 1
-                
-                # Pensioner pincode
-                pensioner_pin = self.clean_pincode(row[2])
-                if pensioner_pin:
-                    self.update_pincode_tables(
-                        pensioner_pin, row[3], row[4], None, None, None,
-                        row[5], 0, 0, 0,
-                        'doppw_pensioner_data_pensioner', '', ''
-                    )
-                    count += 1
-            
-            self.conn.commit()
-            print(f"  ✓ {count} records processed")
-            self.stats['db_records'] += count
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-        
-        # 3. dot_pensioner_data
-        print("\n📋 dot_pensioner_data")
-        try:
-            cursor.execute('''
-                SELECT pensioner_pincode, pda_pincode, COUNT(*) as count
-                FROM dot_pensioner_data
-                WHERE pensioner_pincode IS NOT NULL OR pda_pincode IS NOT NULL
-                GROUP BY pensioner_pincode, pda_pincode
-            ''')
-            
-            count = 0
-            for row in cursor.fetchall():
-                pensioner_pin = self.clean_pincode(row[0])
-                if pensioner_pin:
-                    self.update_pincode_tables(
-                        pensioner_pin, None, None, None, None, None,
-                        row[2], 0, 0, 0,
-                        'dot_pensioner_data', '', ''
-                    )
-                    count += 1
+        self.conn.create_function('clean_pincode', 1, self.clean_pincode, deterministic=True)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS pincode_source_watermarks (
+                source_table TEXT PRIMARY KEY,
+                max_rowid INTEGER NOT NULL,
+                row_count INTEGER NOT NULL,
+                refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+        
+        for table in dict.fromkeys(source['table'] for source in PINCODE_DB_SOURCES):
+            print(f"\n📋 {table}")
+            if table not in tables:
+                print("  - table not found, skipped")
+                continue
+            derivations = [source for source in PINCODE_DB_SOURCES if source['table'] == table]
+            try:
+                watermark = None if rebuild else self.conn.execute(
+                    "SELECT max_rowid, row_count FROM pincode_source_watermarks WHERE source_table = ?", (table,)
+                ).fetchone()
+                action, max_rowid, row_count = detect_table_change(self.conn, table, watermark)
+                if action == 'unchanged':
+                    print("  ✓ unchanged since last run")
+                    continue
+                low = watermark[0] if action == 'appended' else 0
                 
-                pda_pin = self.clean_pincode(row[1])
-                if pda_pin and pda_pin != pensioner_pin:
-                    self.update_pincode_tables(
-                        pda_pin, None, None, None, None, None,
-                        row[2], 0, 0, 0,
-                        'dot_pensioner_data_pda', '', ''
-                    )
-                    count += 1
-            
-            self.conn.commit()
-            print(f"  ✓ {count} records processed")
-            self.stats['db_records'] += count
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-        
-        # 4. ubi1_pensioner_data
-        print("\n📋 ubi1_pensioner_data")
-        try:
-            cursor.execute('''
-                SELECT pensioner_pincode, pensioner_state, pensioner_city, COUNT(*) as count
-                FROM ubi1_pensioner_data
-                WHERE pensioner_pincode IS NOT NULL
-                GROUP BY pensioner_pincode, pensioner_state, pensioner_city
-            ''')
-            
-            count = 0
-            for row in cursor.fetchall():
-                pincode = self.clean_pincode(row[0])
-                if pincode:
-                    self.update_pincode_tables(
-                        pincode, row[1], None, row[2], None, None,
-                        row[3], 0, 0, 0,
-                        'ubi1_pensioner_data', '', ''
-                    )
-                    count += 1
-            
-            self.conn.commit()
-            print(f"  ✓ {count} records processed")
-            self.stats['db_records'] += count
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-        
-        # 5. ubi3_pensioner_data
-        print("\n📋 ubi3_pensioner_data")
-        try:
-            cursor.execute('''
-                SELECT branch_pincode, pensioner_pincode, pensioner_state, pensioner_city, COUNT(*) as count
-                FROM ubi3_pensioner_data
-                WHERE branch_pincode IS NOT NULL OR pensioner_pincode IS NOT NULL
-                GROUP BY branch_pincode, pensioner_pincode, pensioner_state, pensioner_city
-            ''')
-            
-            count = 0
-            for row in cursor.fetchall():
-                branch_pin = self.clean_pincode(row[0])
-                if branch_pin:
-                    self.update_pincode_tables(
-                        branch_pin, row[2], None, row[3], None, None,
-                        row[4], 0, 0, 0,
-                        'ubi3_pensioner_data_branch', '', ''
-                    )
-                    count += 1
+                started = time.time()
+                count = 0
+                with self.conn:
+                    if action == 'rebuild':
+                        labels = [source['data_source'] for source in derivations]
+                        self.conn.execute(
+                            f"DELETE FROM pensioner_pincode_data WHERE data_source IN ({', '.join('?' for _ in labels)})",
+                            labels
+                        )
+                    for source in derivations:
+                        count += self._fold_source(source, low, max_rowid)
+                    self.conn.execute('''
+                        INSERT OR REPLACE INTO pincode_source_watermarks (source_table, max_rowid, row_count, refreshed_at)
+                        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                    ''', (table, max_rowid, row_count))
                 
-                pensioner_pin = self.clean_pincode(row[1])
-                if pensioner_pin and pensioner_pin != branch_pin:
-                    self.update_pincode_tables(
-                        pensioner_pin, row[2], None, row[3], None, None,
-                        row[4], 0, 0, 0,
-                        'ubi3_pensioner_data_pensioner', '', ''
-                    )
-                    count += 1
-            
-            self.conn.commit()
-            print(f"  ✓ {count} records processed")
-            self.stats['db_records'] += count
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
+                mode = 'rebuilt' if action == 'rebuild' else f'{row_count - watermark[1]:,} new rows'
+                print(f"  ✓ {count} records processed ({mode}, {time.time() - started:.1f}s)")
+                self.stats['db_records'] += count
+            except Exception as e:
+                print(f"  ✗ Error: {e}")
+    
+    def _fold_source(self, source, low, high):
+        """Aggregate one derivation over rowid (low, high] and bulk-insert it; returns the rows written"""
+        def column(name):
+            return source.get(name) or 'NULL'
+        
+        attributes = ['state', 'district', 'city', 'bank_name', 'bank_ifsc']
+        total = f"SUM({source['total']})" if source.get('total') else 'COUNT(*)'
+        ages = [f"SUM({source[name]})" if source.get(name) else '0'
+                for name in ('age_less_than_80', 'age_more_than_80', 'age_not_available')]
+        skip = source.get('skip_same_as')
+        inner_keys = [source['pincode']] + [source[name] for name in attributes if source.get(name)] + ([skip] if skip else [])
+        
+        self.conn.execute("DROP TABLE IF EXISTS temp.pincode_delta")
+        self.conn.execute(f'''
+            CREATE TEMP TABLE pincode_delta AS
+            SELECT clean_pincode(raw_pincode) AS pincode, state, district, city, bank_name, bank_ifsc,
+                   SUM(total) AS total, SUM(less_80) AS less_80, SUM(more_80) AS more_80, SUM(na) AS na
+            FROM (
+                SELECT {source['pincode']} AS raw_pincode, {column('state')} AS state, {column('district')} AS district,
+                       {column('city')} AS city, {column('bank_name')} AS bank_name, {column('bank_ifsc')} AS bank_ifsc,
+                       {skip or 'NULL'} AS raw_skip,
+                       {total} AS total, {ages[0]} AS less_80, {ages[1]} AS more_80, {ages[2]} AS na
+                FROM {source['table']}
+                WHERE rowid > ? AND rowid <= ? AND {source['pincode']} IS NOT NULL AND {source['pincode']} != ''
+                GROUP BY {', '.join(inner_keys)}
+            )
+            WHERE clean_pincode(raw_skip) IS NOT clean_pincode(raw_pincode)
+            GROUP BY 1, state, district, city, bank_name, bank_ifsc
+            HAVING pincode IS NOT NULL
+        ''', (low, high))
+        
+        self.conn.execute('''
+            INSERT INTO pincode_master (pincode, district, state, city, data_source)
+            SELECT pincode, MAX(district), MAX(state), MAX(city), ?
+            FROM pincode_delta
+            GROUP BY pincode
+            ON CONFLICT(pincode) DO UPDATE SET
+                district = COALESCE(excluded.district, district),
+                state = COALESCE(excluded.state, state),
+                city = COALESCE(excluded.city, city),
+                updated_at = CURRENT_TIMESTAMP
+        ''', (source['data_source'],))
+        
+        written = self.conn.execute('''
+            INSERT INTO pensioner_pincode_data
+            (pincode, district, state, city, bank_name, bank_ifsc,
+             total_pensioners, age_less_than_80, age_more_than_80, age_not_available,
+             data_source, file_name, sheet_name)
+            SELECT pincode, district, state, city, bank_name, bank_ifsc,
+                   total, less_80, more_80, na, ?, '', ''
+            FROM pincode_delta
+        ''', (source['data_source'],)).rowcount
+        self.conn.execute("DROP TABLE temp.pincode_delta")
+        return written
     
-    def update_statistics(self):
-        """Update pincode statistics table"""
+    def update_statistics(self, full=False):
+        """Refresh pincode_statistics for the pincodes touched since the last run"""
         print("\n" + "="*80)
         print("📊 UPDATING STATISTICS")
         print("="*80)
         
-        cursor = self.conn.cursor()
-        
-        cursor.execute('DELETE FROM pincode_statistics')
+        refresh_pincode_statistics(self.conn, full=full)
         
-        cursor.execute('''
-            INSERT INTO pincode_statistics 
-            (pincode, state, district, total_pensioners, total_banks, total_branches)
-            SELECT 
-                p.pincode,
-                pm.state,
-                pm.district,
-                SUM(p.total_pensioners) as total_pensioners,
-                COUNT(DISTINCT p.bank_name) as total_banks,
-                COUNT(DISTINCT p.bank_ifsc) as total_branches
-            FROM pensioner_pincode_data p
-            LEFT JOIN pincode_master pm ON p.pincode = pm.pincode
-            GROUP BY p.pincode, pm.state, pm.district
-        ''')
-        
-        self.conn.commit()
-        
-        cursor.execute('SELECT COUNT(*) FROM pincode_statistics')
-        count = cursor.fetchone()[0]
-        print(f"✓ Statistics updated for {count} pincodes")
+        count = self.conn.execute('SELECT COUNT(*) FROM pincode_statistics').fetchone()[0]
+        print(f"✓ Statistics cover {count} pincodes")
         self.stats['unique_pincodes'] = count
     
     def generate_report(self):
@@ -539,7 +495,7 @@ class ComprehensivePincodeProcessor:
             self.conn.close()
             print("\n✓ Database connection closed")
     
-    def run(self):
+    def run(self, rebuild=False):
         """Main execution"""
         try:
             print("="*80)
@@ -548,8 +504,8 @@ class ComprehensivePincodeProcessor:
             
             self.connect_db()
             self.process_all_excel_files()
-            self.process_database_tables()
-            self.update_statistics()
+            self.process_database_tables(rebuild)
+            self.update_statistics(rebuild)
             self.generate_report()
             
             print("\n✅ Processing completed successfully!")
@@ -561,5 +517,11 @@ class ComprehensivePincodeProcessor:
             self.close()
 
 if __name__ == "__main__":
-    processor = ComprehensivePincodeProcessor()
-    processor.run()
+    parser = argparse.ArgumentParser(description="Build the pincode layer from Excel files and database tables")
+    parser.add_argument("--db", default="database.db", help="SQLite database file")
+    parser.add_argument("--excel-dir", default="Excel Files", help="Directory of Excel files")
+    parser.add_argument("--rebuild", action="store_true", help="Refold every database table, ignoring the watermarks")
+    args = parser.parse_args()
+    
+    processor = ComprehensivePincodeProcessor(args.db, args.excel_dir)
+    processor.run(args.rebuild)
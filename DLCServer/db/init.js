@@ -50,9 +50,21 @@ function initializeDatabase() {
             });
         });
 
-        // Create indices for better performance
-        db.run(`CREATE INDEX IF NOT EXISTS idx_pensioner_state ON pensioner_data(state)`);
-        db.run(`CREATE INDEX IF NOT EXISTS idx_bank_state ON bank_pensioner_data(bank_state)`);
+        // Create indices for better performance. A table moved into pensioner_fact
+        // (pensioner_facts.py) is a view, which cannot be indexed; its indexes live
+        // on pensioner_fact instead
+        const indices = [
+            ['idx_pensioner_state', 'pensioner_data', 'state'],
+            ['idx_bank_state', 'bank_pensioner_data', 'bank_state']
+        ];
+        indices.forEach(([name, table, column]) => {
+            db.get(`SELECT type FROM sqlite_master WHERE name = ?`, [table], (err, row) => {
+                if (err || !row || row.type !== 'table') {
+                    return;
+                }
+                db.run(`CREATE INDEX IF NOT EXISTS ${name} ON ${table}(${column})`);
+            });
+        });
     });
 
     return db;
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Dictionary-Encoded Pensioner Tables
+Optional normalized storage mode: repeated free-text columns (bank, state,
+district/city, branch, PSA, PDA) move into dimension tables with integer
+surrogate keys and canonical spellings, and the pensioner rows keep only the
+integer keys and typed INTEGER counts.
+
+    dim_bank / dim_state / dim_district / dim_branch / dim_psa / dim_pda
+        (id INTEGER PRIMARY KEY, name TEXT UNIQUE)
+    dim_state_alias (alias TEXT PRIMARY KEY, state_id)   raw spelling -> state
+    <table>_fact                                         encoded rows
+    <table>                                              compatibility view
+
+The view keeps the old table name and column names (plus a `rowid` column,
+so rowid watermarks keep working), and INSTEAD OF triggers encode inserts,
+updates and deletes, so existing readers and writers (Python and the Node
+API) keep working unchanged.
+
+The view joins every dimension for every row, so a GROUP BY on it is slower
+than on the plain table. Reports grouping a normalized table go through
+grouped_counts_sql(), which groups <table>_fact by the *_id columns and joins
+the names onto the (small) grouped result; pensioner_rollup.py and
+data_import_summary.py do.
+
+Canonical spelling is UPPER(TRIM(value)); states additionally go through
+state_names (GUJRAT -> GUJARAT). Writes through the view are encoded in SQL,
+which only knows the exact spellings in dim_state_alias: any other spelling
+('Jammu & Kashmir') gets its own dim_state row. --canonicalize-states merges
+such rows onto their canonical state; run it after imports through the views.
+
+Usage:
+    python dimension_store.py database.db --table pensioner_bank_master
+    python dimension_store.py database.db --all --vacuum
+    python dimension_store.py database.db --canonicalize-states
+    python dimension_store.py database.db --status
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from state_names import CANONICAL_STATES, STATE_ALIASES, normalize_state
+
+DIMENSIONS = ['bank', 'state', 'district', 'branch', 'psa', 'pda']
+NORMALIZE_BATCH_SIZE = 50000
+
+# Table -> encoded dimension columns and columns stored as typed INTEGER counts.
+# Tables whose writers create indexes on them (views cannot be indexed) are not
+# listed: bank_pensioner_data (db/init.js) and pensioner_data (excel-analyzer-api.js).
+NORMALIZED_TABLES = {
+    'pensioner_bank_master': {
+        'dimensions': {'bank_name': 'bank', 'branch_name': 'branch', 'pensioner_city': 'district',
+                       'state': 'state', 'PSA': 'psa', 'PDA': 'pda'},
+        'counts': [],
+    },
+    'ubi1_pensioner_data': {
+        'dimensions': {'bank_name': 'bank', 'branch_name': 'branch', 'pensioner_city': 'district',
+                       'pensioner_state': 'state', 'psa_name': 'psa', 'pda_name': 'pda'},
+        'counts': ['age'],
+    },
+    'ubi3_pensioner_data': {
+        'dimensions': {'bank_name': 'bank', 'branch_name': 'branch', 'pensioner_city': 'district',
+                       'pensioner_state': 'state', 'psa_name': 'psa', 'pda_name': 'pda'},
+        'counts': ['age'],
+    },
+}
+
+
+def canonical_text(value):
+    """Python twin of the SQL canonical form NULLIF(UPPER(TRIM(value)), '')"""
+    if value is None or value != value:
+        return None
+    text = str(value).strip(' ').upper()
+    return text or None
+
+
+def typed_count(value):
+    """Count stored as INTEGER ('12', '12.0', 12.0 -> 12; '', 'NA' -> NULL)"""
+    if value is None or value == '':
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _sql_canonical(expr):
+    return f"NULLIF(UPPER(TRIM(CAST({expr} AS TEXT))), '')"
+
+
+def _sql_count(expr):
+    return f"CASE WHEN TRIM({expr}) GLOB '*[0-9]*' THEN CAST(CAST({expr} AS REAL) AS INTEGER) END"
+
+
+def _sql_dimension_id(dimension, expr):
+    canonical = _sql_canonical(expr)
+    if dimension == 'state':
+        return (f"COALESCE((SELECT state_id FROM dim_state_alias WHERE alias = {canonical}), "
+                f"(SELECT id FROM dim_state WHERE name = {canonical}))")
+    return f"(SELECT id FROM dim_{dimension} WHERE name = {canonical})"
+
+
+def create_dimension_tables(conn):
+    """Create the dimension tables and seed the state aliases"""
+    for dimension in DIMENSIONS:
+        conn.execute(f"CREATE TABLE IF NOT EXISTS dim_{dimension} (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS dim_state_alias (
+            alias TEXT PRIMARY KEY,
+            state_id INTEGER NOT NULL REFERENCES dim_state(id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS normalized_tables (
+            table_name TEXT PRIMARY KEY,
+            fact_table TEXT NOT NULL,
+            rows INTEGER,
+            normalized_at TEXT
+        )
+    """)
+    conn.executemany("INSERT OR IGNORE INTO dim_state (name) VALUES (?)", [(state,) for state in CANONICAL_STATES])
+    conn.executemany(
+        "INSERT OR IGNORE INTO dim_state_alias (alias, state_id) SELECT ?, id FROM dim_state WHERE name = ?",
+        [(alias, state) for alias, state in STATE_ALIASES.items()]
+    )
+
+
+def is_normalized(conn, table):
+    """True when `table` is served by a compatibility view over <table>_fact"""
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (table,)).fetchone()
+    return bool(row) and row[0] == 'view' and conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (f"{table}_fact",)
+    ).fetchone() is not None
+
+
+class DimensionEncoder:
+    """Canonical value -> surrogate key, creating dimension rows on first sight"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.ids = {dimension: dict(conn.execute(f"SELECT name, id FROM dim_{dimension}"))
+                    for dimension in DIMENSIONS}
+        self.state_aliases = dict(conn.execute("SELECT alias, state_id FROM dim_state_alias"))
+
+    def encode(self, dimension, value):
+        canonical = canonical_text(value)
+        if canonical is None:
+            return None
+        if dimension == 'state':
+            state_id = self.state_aliases.get(canonical)
+            if state_id is None:
+                state_id = self._id('state', normalize_state(canonical))
+                # Remember the raw spelling so the INSTEAD OF triggers resolve it in SQL too
+                self.conn.execute("INSERT OR IGNORE INTO dim_state_alias (alias, state_id) VALUES (?, ?)",
+                                  (canonical, state_id))
+                self.state_aliases[canonical] = state_id
+            return state_id
+        return self._id(dimension, canonical)
+
+    def _id(self, dimension, name):
+        ids = self.ids[dimension]
+        if name not in ids:
+            ids[name] = self.conn.execute(f"INSERT INTO dim_{dimension} (name) VALUES (?)", (name,)).lastrowid
+        return ids[name]
+
+
+def _fact_layout(conn, table, spec):
+    """
+    Column layout of the fact table
+
+    Returns:
+        tuple: (key column, [(column, kind, declared type, default)]) with kind
+        'dimension', 'count' or 'plain'
+    """
+    info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    primary_keys = [row for row in info if row[5]]
+    # An INTEGER PRIMARY KEY column is the rowid; reuse it as the fact key
+    if len(primary_keys) == 1 and primary_keys[0][2].upper() == 'INTEGER':
+        key = primary_keys[0][1]
+    else:
+        key = None
+    columns = []
+    for _, name, declared_type, _, default, _ in info:
+        if name == key:
+            continue
+        if name in spec['dimensions']:
+            kind = 'dimension'
+        elif name in spec['counts']:
+            kind = 'count'
+        else:
+            kind = 'plain'
+        columns.append((name, kind, declared_type, default))
+    return key, columns
+
+
+def _fact_column(name, kind):
+    return f"{name}_id" if kind == 'dimension' else name
+
+
+def grouped_counts_sql(table, columns, where=None):
+    """
+    SELECT counting the rows of a normalized table per combination of `columns`
+
+    Groups <table>_fact by the integer *_id columns and joins the dimension
+    names onto the grouped result only, instead of joining every row through
+    the compatibility view.
+
+    Args:
+        table (str): Compatibility view name, e.g. pensioner_bank_master
+        columns (list): View column names to group by
+        where (str): Optional filter on fact columns (rowid, plain columns, *_id)
+
+    Returns:
+        str: SELECT yielding `columns` under their view names plus a `rows` count
+    """
+    spec = NORMALIZED_TABLES[table]
+    group_by = [f"{name}_id" if name in spec['dimensions'] else name for name in columns]
+    select_list, joins = [], []
+    for index, (name, fact_column) in enumerate(zip(columns, group_by)):
+        if name in spec['dimensions']:
+            select_list.append(f"d{index}.name AS {name}")
+            joins.append(f"LEFT JOIN dim_{spec['dimensions'][name]} d{index} ON d{index}.id = g.{fact_column}")
+        else:
+            select_list.append(f"g.{fact_column} AS {name}")
+    return f"""
+            SELECT {', '.join(select_list)}, g.rows AS rows
+            FROM (SELECT {', '.join(group_by)}, COUNT(*) AS rows FROM {table}_fact
+                  {f'WHERE {where}' if where else ''} GROUP BY {', '.join(group_by)}) g
+            {' '.join(joins)}"""
+
+
+def _create_view_and_triggers(conn, table, spec, key, columns):
+    fact = f"{table}_fact"
+    fact_key = key or 'row_id'
+
+    select_list = [f"f.{fact_key} AS rowid"] + ([f"f.{key} AS {key}"] if key else [])
+    joins = []
+    for index, (name, kind, _, _) in enumerate(columns):
+        if kind == 'dimension':
+            alias = f"d{index}"
+            select_list.append(f"{alias}.name AS {name}")
+            joins.append(f"LEFT JOIN dim_{spec['dimensions'][name]} {alias} ON {alias}.id = f.{name}_id")
+        else:
+            select_list.append(f"f.{name} AS {name}")
+    conn.execute(f"CREATE VIEW {table} AS SELECT {', '.join(select_list)} FROM {fact} f {' '.join(joins)}")
+
+    def dimension_inserts():
+        statements = []
+        for name, kind, _, _ in columns:
+            if kind != 'dimension':
+                continue
+            dimension = spec['dimensions'][name]
+            canonical = _sql_canonical(f"NEW.{name}")
+            if dimension == 'state':
+                statements.append(
+                    f"INSERT OR IGNORE INTO dim_state (name) SELECT {canonical} WHERE {canonical} IS NOT NULL "
+                    f"AND NOT EXISTS (SELECT 1 FROM dim_state_alias WHERE alias = {canonical});"
+                )
+            else:
+                statements.append(
+                    f"INSERT OR IGNORE INTO dim_{dimension} (name) SELECT {canonical} WHERE {canonical} IS NOT NULL;"
+                )
+        return '\n'.join(statements)
+
+    def encoded(name, kind, default):
+        value = f"NEW.{name}"
+        if default is not None:
+            # Views have no column defaults; an omitted column arrives as NULL
+            value = f"COALESCE({value}, {default})"
+        if kind == 'dimension':
+            return _sql_dimension_id(spec['dimensions'][name], value)
+        if kind == 'count':
+            return _sql_count(value)
+        return value
+
+    fact_columns = [_fact_column(name, kind) for name, kind, _, _ in columns]
+    values = [encoded(name, kind, default) for name, kind, _, default in columns]
+    key_value = f"NEW.{key}" if key else 'NULL'
+
+    conn.execute(f"""
+        CREATE TRIGGER {table}_insert INSTEAD OF INSERT ON {table}
+        BEGIN
+            {dimension_inserts()}
+            INSERT INTO {fact} ({fact_key}, {', '.join(fact_columns)}) VALUES ({key_value}, {', '.join(values)});
+        END
+    """)
+    assignments = ', '.join(f"{column} = {value}" for column, value in zip(fact_columns, values))
+    conn.execute(f"""
+        CREATE TRIGGER {table}_update INSTEAD OF UPDATE ON {table}
+        BEGIN
+            {dimension_inserts()}
+            UPDATE {fact} SET {assignments} WHERE {fact_key} = OLD.rowid;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER {table}_delete INSTEAD OF DELETE ON {table}
+        BEGIN
+            DELETE FROM {fact} WHERE {fact_key} = OLD.rowid;
+        END
+    """)
+
+
+def normalize_table(conn, table, batch_size=NORMALIZE_BATCH_SIZE):
+    """
+    Move a plain table into dictionary-encoded storage behind a compatibility view
+
+    Runs in one transaction; the original table is dropped at the end.
+
+    Returns:
+        int: Rows moved (0 when the table is missing, already normalized or a view,
+        e.g. unified into pensioner_fact)
+    """
+    spec = NORMALIZED_TABLES[table]
+    exists = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (table,)).fetchone()
+    if not exists or exists[0] != 'table':
+        return 0
+
+    fact = f"{table}_fact"
+    with conn:
+        # DDL does not open a transaction implicitly; make the whole move atomic
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        create_dimension_tables(conn)
+        encoder = DimensionEncoder(conn)
+        key, columns = _fact_layout(conn, table, spec)
+        indexes = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,)
+        ).fetchall()
+        index_columns = {
+            name: [row[2] for row in conn.execute(f"PRAGMA index_info({name})")] for name, _ in indexes
+        }
+
+        definitions = [f"{key or 'row_id'} INTEGER PRIMARY KEY"]
+        for name, kind, declared_type, default in columns:
+            if kind == 'dimension':
+                definitions.append(f"{name}_id INTEGER REFERENCES dim_{spec['dimensions'][name]}(id)")
+            elif kind == 'count':
+                definitions.append(f"{name} INTEGER")
+            else:
+                column_type = f" {declared_type}" if declared_type else ''
+                column_default = f" DEFAULT {default}" if default is not None else ''
+                definitions.append(f"{name}{column_type}{column_default}")
+        conn.execute(f"CREATE TABLE {fact} ({', '.join(definitions)})")
+
+        fact_columns = [key or 'row_id'] + [_fact_column(name, kind) for name, kind, _, _ in columns]
+        insert_sql = f"INSERT INTO {fact} ({', '.join(fact_columns)}) VALUES ({', '.join('?' for _ in fact_columns)})"
+        encoders = []
+        for name, kind, _, _ in columns:
+            if kind == 'dimension':
+                dimension = spec['dimensions'][name]
+                encoders.append(lambda value, dimension=dimension: encoder.encode(dimension, value))
+            elif kind == 'count':
+                encoders.append(typed_count)
+            else:
+                encoders.append(None)
+
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(f"SELECT rowid, {', '.join(name for name, _, _, _ in columns)} FROM {table}")
+        moved = 0
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            conn.executemany(insert_sql, [
+                (row[0],) + tuple(value if encode is None else encode(value)
+                                  for encode, value in zip(encoders, row[1:]))
+                for row in batch
+            ])
+            moved += len(batch)
+
+        conn.execute(f"DROP TABLE {table}")
+        _create_view_and_triggers(conn, table, spec, key, columns)
+
+        # Recreate the old indexes on the encoded columns
+        for name, _ in indexes:
+            mapped = []
+            for column in index_columns[name]:
+                kind = next((kind for column_name, kind, _, _ in columns if column_name == column), None)
+                mapped.append(_fact_column(column, kind) if kind else column)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {fact} ({', '.join(mapped)})")
+
+        conn.execute(
+            "INSERT OR REPLACE INTO normalized_tables (table_name, fact_table, rows, normalized_at) VALUES (?, ?, ?, ?)",
+            (table, fact, moved, datetime.now().isoformat(timespec='seconds'))
+        )
+    return moved
+
+
+def canonicalize_states(conn):
+    """
+    Merge dim_state rows created by writes through the views onto their canonical state
+
+    The INSTEAD OF triggers only resolve exact dim_state_alias spellings, so a
+    new spelling such as 'JAMMU & KASHMIR' becomes a dim_state row of its own.
+    Each such row is repointed in every fact table referencing dim_state,
+    kept as an alias and deleted.
+
+    Returns:
+        int: dim_state rows merged
+    """
+    merged = 0
+    with conn:
+        create_dimension_tables(conn)
+        facts = [row[0] for row in conn.execute("SELECT fact_table FROM normalized_tables")]
+        state_columns = [
+            (fact, row[3]) for fact in facts
+            for row in conn.execute(f"PRAGMA foreign_key_list({fact})") if row[2] == 'dim_state'
+        ]
+        ids = dict(conn.execute("SELECT name, id FROM dim_state"))
+        for name, state_id in sorted(ids.items()):
+            canonical = normalize_state(name)
+            if not canonical or canonical == name:
+                continue
+            target = ids.get(canonical)
+            if target is None:
+                # Known alias of nothing in dim_state yet; rename the row instead
+                conn.execute("UPDATE dim_state SET name = ? WHERE id = ?", (canonical, state_id))
+                ids[canonical] = state_id
+                target = state_id
+            else:
+                for fact, column in state_columns:
+                    conn.execute(f"UPDATE {fact} SET {column} = ? WHERE {column} = ?", (target, state_id))
+                conn.execute("UPDATE dim_state_alias SET state_id = ? WHERE state_id = ?", (target, state_id))
+                conn.execute("DELETE FROM dim_state WHERE id = ?", (state_id,))
+            conn.execute("INSERT OR REPLACE INTO dim_state_alias (alias, state_id) VALUES (?, ?)", (name, target))
+            merged += 1
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dictionary-encode pensioner tables behind compatibility views")
+    parser.add_argument("db_path", help="SQLite database file")
+    parser.add_argument("--table", action="append", dest="tables", choices=sorted(NORMALIZED_TABLES),
+                        help="Table to normalize (repeatable)")
+    parser.add_argument("--all", action="store_true", help="Normalize every supported table present")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM afterwards to return the freed pages")
+    parser.add_argument("--canonicalize-states", action="store_true",
+                        help="Merge state spellings written through the views onto their canonical state")
+    parser.add_argument("--status", action="store_true", help="Show which tables are normalized")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Database file not found: {args.db_path}")
+        return
+
+    conn = sqlite3.connect(args.db_path)
+    try:
+        if args.canonicalize_states and not (args.tables or args.all):
+            print(f"✓ Merged {canonicalize_states(conn):,} state spellings")
+            return
+        if args.status or not (args.tables or args.all):
+            for table in sorted(NORMALIZED_TABLES):
+                state = '✓ normalized' if is_normalized(conn, table) else '- plain'
+                print(f"{table:<24} {state}")
+            return
+
+        size_before = os.path.getsize(args.db_path)
+        for table in (sorted(NORMALIZED_TABLES) if args.all else args.tables):
+            started = time.time()
+            moved = normalize_table(conn, table)
+            if moved:
+                print(f"✓ {table}: {moved:,} rows encoded in {time.time() - started:.1f}s")
+            else:
+                print(f"- {table}: missing, empty or already normalized")
+        if args.canonicalize_states:
+            print(f"✓ Merged {canonicalize_states(conn):,} state spellings")
+        if args.vacuum:
+            print("🧹 Vacuuming...")
+            conn.execute("VACUUM")
+            size_after = os.path.getsize(args.db_path)
+            print(f"📦 {size_before / 1e6:,.1f} MB → {size_after / 1e6:,.1f} MB")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
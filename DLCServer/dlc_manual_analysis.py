@@ -7,18 +7,25 @@ Analyzes all database tables and Excel files to determine total DLC vs Manual su
 import pandas as pd
 import sqlite3
 import os
+import json
 import sys
 from pathlib import Path
 from datetime import datetime
 import re
 import numpy as np
 
+from table_profiler import profile_table
+
+# Submission columns hold a handful of modes; this many counters keeps their counts exact
+SUBMISSION_TOP_K = 1000
+
 class DLCManualAnalyzer:
     def __init__(self, db_path="database.db"):
         self.db_path = db_path
         self.excel_folder = "Excel Files"
         self.results = {
             'database_analysis': {},
+            'table_profiles': {},
             'excel_analysis': {},
             'total_dlc': 0,
             'total_manual': 0,
@@ -58,18 +65,26 @@ class DLCManualAnalyzer:
                 submission_cols = [col for col in columns if any(keyword in col.lower() 
                                  for keyword in ['submission', 'mode', 'type', 'method', 'dlc', 'manual'])]
                 
+                # One scan per table: row count and the value counts of every submission column
+                profile = profile_table(conn, table, columns=submission_cols, top_k=SUBMISSION_TOP_K,
+                                        capacity=SUBMISSION_TOP_K)
+                self.results['table_profiles'][table] = profile
+                table_total = profile['rows']
+                total_records += table_total
+                
                 if submission_cols:
                     print(f"   📋 Found submission columns: {submission_cols}")
                     
                     for col in submission_cols:
-                        # Analyze submission modes
-                        cursor.execute(f"SELECT {col}, COUNT(*) FROM {table} WHERE {col} IS NOT NULL GROUP BY {col};")
-                        results = cursor.fetchall()
+                        column_profile = profile['columns'][col]
+                        if not column_profile['top_values_exact']:
+                            print(f"      ⚠️  {col} has more than {SUBMISSION_TOP_K} distinct values; counts are approximate")
                         
                         table_dlc = 0
                         table_manual = 0
                         
-                        for mode, count in results:
+                        for entry in column_profile['top_values']:
+                            mode, count = entry['value'], entry['count']
                             mode_str = str(mode).upper() if mode else ""
                             
                             if any(keyword in mode_str for keyword in ['DLC', 'DIGITAL', 'ONLINE', 'PORTAL']):
@@ -90,11 +105,6 @@ class DLCManualAnalyzer:
                         total_dlc += table_dlc
                         total_manual += table_manual
                 
-                # Get total records in table
-                cursor.execute(f"SELECT COUNT(*) FROM {table};")
-                table_total = cursor.fetchone()[0]
-                total_records += table_total
-                
                 print(f"   📈 Total records in {table}: {table_total:,}")
                 
             except Exception as e:
@@ -347,6 +357,11 @@ class DLCManualAnalyzer:
                     f.write(f"- Total: {data['total']:,}\n\n")
         
         print(f"\n💾 Detailed report saved to: {report_file}")
+        
+        profile_file = f"DLC_MANUAL_PROFILES_{timestamp}.json"
+        with open(profile_file, 'w') as f:
+            json.dump(self.results['table_profiles'], f, indent=2, default=str)
+        print(f"💾 Table profiles saved to: {profile_file}")
 
 def main():
     analyzer = DLCManualAnalyzer()
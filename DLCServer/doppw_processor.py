@@ -11,6 +11,8 @@ import sys
 from datetime import datetime
 import logging
 
+from pensioner_rollup import refresh_rollup
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -279,6 +281,7 @@ class DoPPWProcessor:
             
             # Generate summary statistics
             self.generate_doppw_summary()
+            refresh_rollup(self.conn)
             
             logger.info("DoPPW Excel file processing completed successfully")
             return True
@@ -10,6 +10,7 @@ import os
 import sys
 from datetime import datetime
 import logging
+from ppo_registry import PPORegistry
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -72,6 +73,7 @@ class DoTPensionerProcessor:
             cursor.execute(create_summary_sql)
             
             self.conn.commit()
+            self.ppo_registry = PPORegistry(self.conn)
             logger.info("DoT pensioner tables created successfully")
             return True
             
@@ -178,6 +180,10 @@ class DoTPensionerProcessor:
                 cursor.execute(insert_sql, values)
             
             self.conn.commit()
+            duplicates = self.ppo_registry.sync('dot_pensioner_data')
+            if duplicates['cross_source']:
+                logger.warning(f"{duplicates['cross_source']} PPO numbers in sheet {sheet_name} were already loaded "
+                               f"from another source (see ppo_duplicates)")
             logger.info(f"Successfully processed DoT sheet: {sheet_name}")
             return True
             
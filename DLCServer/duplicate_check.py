@@ -2,11 +2,17 @@
 """
 Duplicate Data Checker
 Checks for duplicate file imports and pensioner records
+
+Cross-source PPO duplicates come from the global PPO registry (ppo_registry.py),
+which the processors keep up to date at ingest; this report only syncs rows
+loaded since then.
 """
 
 import sqlite3
 import pandas as pd
 
+from ppo_registry import PPORegistry
+
 # Connect to database
 conn = sqlite3.connect('database.db')
 
@@ -79,4 +85,21 @@ for table in ppo_tables:
     except pd.errors.DatabaseError as e:
         print(f"  Error querying table: {e}")
 
+print('\n3. DUPLICATE PPOS ACROSS SOURCES (global PPO registry):')
+print('-'*60)
+
+registry = PPORegistry(conn)
+for table, stats in registry.sync_all().items():
+    if stats['rows']:
+        print(f"  Registered {stats['rows']:,} new rows from {table}")
+summary = registry.duplicate_summary()
+cross_source = [row for row in summary if row[0] != row[1]]
+if cross_source:
+    print(f"\n  {'Source':<28} {'Already loaded from':<28} {'Rows':>10} {'PPOs':>10}")
+    for source, first_source, rows, ppos in cross_source:
+        print(f"  {source:<28} {first_source:<28} {rows:>10,} {ppos:>10,}")
+else:
+    print('  No PPO number found in more than one source')
+print(f"  PPOs in registry: {registry.keys:,}")
+
 conn.close()
@@ -12,6 +12,8 @@ from pathlib import Path
 import logging
 import re
 
+from pensioner_rollup import refresh_rollup
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -453,6 +455,7 @@ class FlexibleExcelProcessor:
                 logger.warning(f"Unknown format type: {format_type}")
                 return False
             
+            refresh_rollup(self.conn)
             logger.info("Excel file processing completed successfully")
             return True
             
@@ -516,7 +519,7 @@ class FlexibleExcelProcessor:
                     print(f"  {psa}: {count}")
             
             # Check for Bank data
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='bank_pensioner_data'")
+            cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view') AND name='bank_pensioner_data'")
             if cursor.fetchone():
                 cursor.execute("SELECT COUNT(*) FROM bank_pensioner_data")
                 bank_records = cursor.fetchone()[0]
@@ -7,6 +7,11 @@ import sqlite3
 import json
 from datetime import datetime
 
+from pensioner_rollup import refresh_rollup
+from pincode_statistics import refresh_pincode_statistics
+
+ROLLUP_SOURCE = 'pensioner_pincode_data'
+
 def generate_report():
     conn = sqlite3.connect('database.db')
     cursor = conn.cursor()
@@ -21,15 +26,20 @@ def generate_report():
         'age_distribution': {}
     }
     
+    # Dashboard figures come from the rollup cube, not from pensioner_pincode_data
+    refresh_rollup(conn, verbose=False)
+    # Branch counts come from pincode_statistics; only touched pincodes are re-aggregated
+    refresh_pincode_statistics(conn, verbose=False)
+    
     # Overall summary
     cursor.execute('SELECT COUNT(DISTINCT pincode) FROM pincode_master')
     report['summary']['total_unique_pincodes'] = cursor.fetchone()[0]
     
-    cursor.execute('SELECT COUNT(*) FROM pensioner_pincode_data')
-    report['summary']['total_records'] = cursor.fetchone()[0]
-    
-    cursor.execute('SELECT SUM(total_pensioners) FROM pincode_statistics')
-    report['summary']['total_pensioners'] = cursor.fetchone()[0] or 0
+    cursor.execute('''
+        SELECT COALESCE(SUM(records), 0), COALESCE(SUM(pensioners), 0)
+        FROM pensioner_rollup WHERE source_table = ?
+    ''', (ROLLUP_SOURCE,))
+    report['summary']['total_records'], report['summary']['total_pensioners'] = cursor.fetchone()
     
     cursor.execute('SELECT COUNT(DISTINCT state) FROM pincode_master WHERE state IS NOT NULL')
     report['summary']['total_states'] = cursor.fetchone()[0]
@@ -37,17 +47,17 @@ def generate_report():
     cursor.execute('SELECT COUNT(DISTINCT district) FROM pincode_master WHERE district IS NOT NULL')
     report['summary']['total_districts'] = cursor.fetchone()[0]
     
-    # Top 20 states
+    # Top 20 states (banks = bank/pincode pairs, as summed from pincode_statistics before)
     cursor.execute('''
         SELECT state, COUNT(DISTINCT pincode) as pincode_count,
-               SUM(total_pensioners) as pensioner_count,
-               SUM(total_banks) as bank_count
-        FROM pincode_statistics
-        WHERE state IS NOT NULL AND state != 'nan'
+               SUM(pensioners) as pensioner_count,
+               COUNT(DISTINCT CASE WHEN bank_name != '' THEN pincode || '|' || bank_name END) as bank_count
+        FROM pensioner_rollup
+        WHERE source_table = ? AND state != ''
         GROUP BY state
         ORDER BY pensioner_count DESC
         LIMIT 20
-    ''')
+    ''', (ROLLUP_SOURCE,))
     
     for row in cursor.fetchall():
         report['top_states'].append({
@@ -60,13 +70,13 @@ def generate_report():
     # Top 30 districts
     cursor.execute('''
         SELECT state, district, COUNT(DISTINCT pincode) as pincode_count,
-               SUM(total_pensioners) as pensioner_count
-        FROM pincode_statistics
-        WHERE district IS NOT NULL AND district != 'nan'
+               SUM(pensioners) as pensioner_count
+        FROM pensioner_rollup
+        WHERE source_table = ? AND district != ''
         GROUP BY state, district
         ORDER BY pensioner_count DESC
         LIMIT 30
-    ''')
+    ''', (ROLLUP_SOURCE,))
     
     for row in cursor.fetchall():
         report['top_districts'].append({
@@ -76,37 +86,46 @@ def generate_report():
             'pensioners': row[3]
         })
     
-    # Top 50 pincodes
+    # Top 50 pincodes (branch counts are per pincode in pincode_statistics)
     cursor.execute('''
-        SELECT ps.pincode, ps.state, ps.district, pm.city,
-               ps.total_pensioners, ps.total_banks, ps.total_branches
-        FROM pincode_statistics ps
-        LEFT JOIN pincode_master pm ON ps.pincode = pm.pincode
-        ORDER BY ps.total_pensioners DESC
-        LIMIT 50
-    ''')
+        SELECT t.pincode, t.state, t.district, pm.city,
+               t.pensioner_count, t.bank_count,
+               (SELECT MAX(total_branches) FROM pincode_statistics ps WHERE ps.pincode = t.pincode)
+        FROM (
+            SELECT pincode, MAX(state) as state, MAX(district) as district,
+                   SUM(pensioners) as pensioner_count,
+                   COUNT(DISTINCT NULLIF(bank_name, '')) as bank_count
+            FROM pensioner_rollup
+            WHERE source_table = ?
+            GROUP BY pincode
+            ORDER BY pensioner_count DESC
+            LIMIT 50
+        ) t
+        LEFT JOIN pincode_master pm ON t.pincode = pm.pincode
+        ORDER BY t.pensioner_count DESC
+    ''', (ROLLUP_SOURCE,))
     
     for row in cursor.fetchall():
         report['top_pincodes'].append({
             'pincode': row[0],
-            'state': row[1],
-            'district': row[2],
+            'state': row[1] or None,
+            'district': row[2] or None,
             'city': row[3],
             'pensioners': row[4],
             'banks': row[5],
-            'branches': row[6]
+            'branches': row[6] or 0
         })
     
     # Bank distribution
     cursor.execute('''
         SELECT bank_name, COUNT(DISTINCT pincode) as pincode_count,
-               SUM(total_pensioners) as pensioner_count
-        FROM pensioner_pincode_data
-        WHERE bank_name IS NOT NULL AND bank_name != ''
+               SUM(pensioners) as pensioner_count
+        FROM pensioner_rollup
+        WHERE source_table = ? AND bank_name != ''
         GROUP BY bank_name
         ORDER BY pensioner_count DESC
         LIMIT 20
-    ''')
+    ''', (ROLLUP_SOURCE,))
     
     for row in cursor.fetchall():
         report['bank_distribution'].append({
@@ -118,11 +137,12 @@ def generate_report():
     # Age distribution
     cursor.execute('''
         SELECT 
-            SUM(age_less_than_80) as less_than_80,
-            SUM(age_more_than_80) as more_than_80,
-            SUM(age_not_available) as not_available
-        FROM pensioner_pincode_data
-    ''')
+            SUM(CASE WHEN age_bucket = '<80' THEN pensioners END) as less_than_80,
+            SUM(CASE WHEN age_bucket = '>80' THEN pensioners END) as more_than_80,
+            SUM(CASE WHEN age_bucket = 'N/A' THEN pensioners END) as not_available
+        FROM pensioner_rollup
+        WHERE source_table = ?
+    ''', (ROLLUP_SOURCE,))
     
     age_data = cursor.fetchone()
     report['age_distribution'] = {
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Unified Pensioner Fact Table
+One canonical, typed, indexed table for every per-source pensioner table
+
+    pensioner_fact          one row per source row; `source` is the old table
+                            name and leads every index, so each source is a
+                            contiguous index partition
+    pensioner_fact_sources  registry of the unified sources
+    <old table name>        compatibility view over pensioner_fact
+
+Each source maps its columns onto the canonical columns (FACT_SOURCES); the
+columns that have no canonical counterpart (file_name, sheet_name, created_at,
+...) are kept in the `extra` JSON column and reappear in the view under their
+old names. Only the canonical columns are typed (trimmed text, INTEGER counts,
+digit-only pincodes) for aggregation. The view returns a mapped column as its
+canonical pensioner_fact column, so filters and GROUP BYs on the old name use
+the pensioner_fact indexes; a value the typing changed is kept in `extra` and
+shown as raw_<column> (NULL when the value was stored as written). The view
+exposes `rowid` (and the old INTEGER PRIMARY KEY), so rowid watermarks keep
+working, and INSTEAD OF triggers route every INSERT, UPDATE and DELETE on the
+old name into pensioner_fact, enforcing the old NOT NULL constraints.
+
+Unifying is an explicit migration run from this CLI; the processors do not
+write pensioner_fact themselves and never unify on their own. After it, they
+and the Node API keep loading through the views. Views cannot be indexed, so
+index DDL on a unified name must be skipped (db/init.js and
+dlc_portal_processor.py check the table type first).
+
+Cross-source totals are a single indexed query:
+    SELECT source, COUNT(*), SUM(pensioners) FROM pensioner_fact GROUP BY source
+
+Usage:
+    python pensioner_facts.py database.db --all
+    python pensioner_facts.py ../DLC_Database.db --table pensioner_bank_master --vacuum
+    python pensioner_facts.py database.db --status
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+FACT_TABLE = 'pensioner_fact'
+
+# Canonical columns: (column, kind) - 'int' is stored as INTEGER, 'code' as
+# digit text (pincodes read from Excel as 110001.0 become '110001'), 'str' as
+# trimmed text
+FACT_COLUMNS = [
+    ('ppo_number', 'str'),
+    ('data_source', 'str'),
+    ('category', 'str'),            # LEVEL1 / GCODE / LC category
+    ('escroll_category', 'str'),
+    ('pension_type', 'str'),
+    ('bank_name', 'str'),
+    ('bank_ifsc', 'str'),
+    ('branch_code', 'str'),
+    ('branch_name', 'str'),
+    ('branch_pincode', 'code'),
+    ('branch_state', 'str'),
+    ('state', 'str'),               # pensioner state (bank state for branch summary rows)
+    ('district', 'str'),
+    ('pincode', 'code'),            # pensioner pincode
+    ('city', 'str'),
+    ('birth_year', 'int'),
+    ('age', 'int'),
+    ('psa', 'str'),
+    ('pda', 'str'),
+    ('submission_status', 'str'),
+    ('submission_mode', 'str'),
+    ('verification_type', 'str'),
+    ('submission_date', 'str'),
+    ('pensioners', 'int'),          # 1 per pensioner row, the total for summary rows
+    ('age_less_than_80', 'int'),
+    ('age_more_than_80', 'int'),
+    ('age_not_available', 'int'),
+]
+FACT_KINDS = dict(FACT_COLUMNS)
+
+# Source table -> {old column: canonical column}; every other column goes to `extra`
+FACT_SOURCES = {
+    'bank_pensioner_data': {
+        'bank_state': 'state', 'bank_city': 'city', 'bank_name': 'bank_name', 'bank_ifsc': 'bank_ifsc',
+        'branch_pin_code': 'branch_pincode', 'age_less_than_80': 'age_less_than_80',
+        'age_more_than_80': 'age_more_than_80', 'age_not_available': 'age_not_available',
+        'grand_total': 'pensioners',
+    },
+    'psa_pensioner_data': {
+        'psa_name': 'psa', 'total_pensioners': 'pensioners',
+    },
+    'doppw_pensioner_data': {
+        'gcode': 'category', 'escroll_cat': 'escroll_category', 'pension_type': 'pension_type',
+        'branch_code': 'branch_code', 'branch_name': 'branch_name', 'branch_pincode': 'branch_pincode',
+        'branch_state': 'branch_state', 'birth_year': 'birth_year', 'submitted_status': 'submission_status',
+        'submission_mode': 'submission_mode', 'verification_type': 'verification_type',
+        'certificate_submission_date': 'submission_date', 'pensioner_pincode': 'pincode',
+        'pensioner_district': 'district', 'pensioner_state': 'state', 'age': 'age',
+    },
+    'dot_pensioner_data': {
+        'lc_category': 'category', 'ppo_number': 'ppo_number', 'birth_year': 'birth_year', 'age': 'age',
+        'pensioner_pincode': 'pincode',
+    },
+    'ubi1_pensioner_data': {
+        'ppo_number': 'ppo_number', 'psa_name': 'psa', 'pda_name': 'pda', 'bank_name': 'bank_name',
+        'branch_name': 'branch_name', 'pensioner_city': 'city', 'pensioner_state': 'state',
+        'pensioner_pincode': 'pincode', 'age': 'age',
+    },
+    'ubi3_pensioner_data': {
+        'ppo_number': 'ppo_number', 'psa_name': 'psa', 'pda_name': 'pda', 'bank_name': 'bank_name',
+        'branch_name': 'branch_name', 'branch_pincode': 'branch_pincode', 'pensioner_city': 'city',
+        'pensioner_state': 'state', 'pensioner_pincode': 'pincode', 'age': 'age',
+    },
+    'pensioner_bank_master': {
+        'bank_name': 'bank_name', 'branch_name': 'branch_name', 'branch_postcode': 'branch_pincode',
+        'pensioner_city': 'city', 'state': 'state', 'pensioner_postcode': 'pincode', 'PDA': 'pda',
+        'ppo_number': 'ppo_number', 'PSA': 'psa', 'data_source': 'data_source',
+    },
+    'dlc_pensioner_data': {
+        'ppo_number': 'ppo_number', 'birth_year': 'birth_year', 'age': 'age', 'psa_full': 'psa',
+        'branch_pincode_clean': 'branch_pincode', 'pensioner_pincode_clean': 'pincode',
+        'pensioner_district': 'district', 'pensioner_state': 'state', 'branch_state': 'branch_state',
+    },
+    'TBL_DOPPW_DLCDATA_MST': {
+        'PPO_UNIQUE_ID': 'ppo_number', 'LEVEL1': 'category', 'ESCROLL_CATEGORY': 'escroll_category',
+        'PENSION_TYPE': 'pension_type', 'BRANCH_CODE': 'branch_code', 'BRANCH_NAME': 'branch_name',
+        'BRANCH_PINCODE': 'branch_pincode', 'BRANCH_STATE_NAME': 'branch_state',
+        'PENSIONER_STATE_NAME': 'state', 'PENSIONER_DISTRICT_NAME': 'district',
+        'PENSIONER_PINCODE': 'pincode', 'YEAR_OF_BIRTH': 'birth_year', 'AGE': 'age',
+        'SUBMISSION_STATUS': 'submission_status', 'SUBMISSION_MODE': 'submission_mode',
+        'VERIFICATION_TYPE': 'verification_type',
+    },
+}
+
+FACT_SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS {FACT_TABLE} (
+        fact_id INTEGER PRIMARY KEY,
+        source TEXT NOT NULL,
+        source_rowid INTEGER NOT NULL,
+        {', '.join(f"{name} {'INTEGER' if kind == 'int' else 'TEXT'}" for name, kind in FACT_COLUMNS)},
+        extra TEXT
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_pensioner_fact_source_row ON {FACT_TABLE}(source, source_rowid);
+    CREATE INDEX IF NOT EXISTS idx_pensioner_fact_source_state ON {FACT_TABLE}(source, state, district, pensioners);
+    CREATE INDEX IF NOT EXISTS idx_pensioner_fact_state ON {FACT_TABLE}(state, district);
+    CREATE INDEX IF NOT EXISTS idx_pensioner_fact_pincode ON {FACT_TABLE}(pincode);
+    CREATE INDEX IF NOT EXISTS idx_pensioner_fact_bank ON {FACT_TABLE}(bank_name, state);
+    CREATE INDEX IF NOT EXISTS idx_pensioner_fact_ppo ON {FACT_TABLE}(ppo_number);
+    CREATE TABLE IF NOT EXISTS pensioner_fact_sources (
+        source TEXT PRIMARY KEY,
+        key_column TEXT,
+        rows INTEGER,
+        unified_at TEXT
+    );
+"""
+
+
+def _typed_sql(expr, kind):
+    """Canonical SQLite value of a loosely typed source value"""
+    if kind == 'int':
+        return f"CASE WHEN TRIM({expr}) GLOB '[0-9]*' THEN CAST(CAST({expr} AS REAL) AS INTEGER) END"
+    if kind == 'code':
+        return (f"CASE WHEN typeof({expr}) IN ('integer', 'real') THEN CAST(CAST({expr} AS INTEGER) AS TEXT) "
+                f"WHEN TRIM({expr}) GLOB '[0-9]*.0' THEN CAST(CAST({expr} AS INTEGER) AS TEXT) "
+                f"ELSE NULLIF(TRIM({expr}), '') END")
+    return f"NULLIF(NULLIF(TRIM(CAST({expr} AS TEXT)), ''), 'nan')"
+
+
+def _json_path(column):
+    return f"'$.\"{column}\"'"
+
+
+def create_fact_table(conn):
+    # executescript() would commit an open transaction; run the statements one by one
+    for statement in FACT_SCHEMA.split(';'):
+        if statement.strip():
+            conn.execute(statement)
+
+
+def is_unified(conn, table):
+    """True when `table` is a compatibility view over pensioner_fact"""
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (table,)).fetchone()
+    if not row or row[0] != 'view':
+        return False
+    registry = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pensioner_fact_sources'"
+    ).fetchone()
+    return bool(registry) and conn.execute(
+        "SELECT 1 FROM pensioner_fact_sources WHERE source = ?", (table,)
+    ).fetchone() is not None
+
+
+def _is_encoded(conn, table):
+    """True when `table` is a dictionary-encoded view (dimension_store.py)"""
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (table,)).fetchone()
+    return bool(row) and row[0] == 'view' and conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (f"{table}_fact",)
+    ).fetchone() is not None
+
+
+def _source_layout(conn, table):
+    """
+    Column layout of a source table (or dictionary-encoded view)
+
+    Returns:
+        tuple: (key column or None, [(column, canonical column or None, default, not null)])
+    """
+    mapping = FACT_SOURCES[table]
+    info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    # A dictionary-encoded view keeps its INTEGER PRIMARY KEY on <table>_fact ('row_id' when it had none)
+    keyed_table = f"{table}_fact" if _is_encoded(conn, table) else table
+    primary_keys = [row for row in conn.execute(f"PRAGMA table_info({keyed_table})") if row[5]]
+    key = None
+    if len(primary_keys) == 1 and (primary_keys[0][2] or '').upper() == 'INTEGER' and primary_keys[0][1] != 'row_id':
+        key = primary_keys[0][1]
+    # Views report no NOT NULL; an encoded view's plain columns keep theirs on <table>_fact
+    not_null = {row[1] for row in conn.execute(f"PRAGMA table_info({keyed_table})") if row[3]}
+    columns = [(name, mapping.get(name), default, name in not_null)
+               for _, name, _, _, default, _ in info if name not in ('rowid', key)]
+    return key, columns
+
+
+def _value_sql(columns, prefix, update=False):
+    """Canonical column -> SQL expression and the `extra` JSON expression for one source row"""
+    values = {}
+    extras = []
+    for name, canonical, default, _ in columns:
+        expr = _column_sql(name, default, prefix, update and canonical)
+        if canonical:
+            typed = _typed_sql(expr, FACT_KINDS[canonical])
+            values[canonical] = typed
+            # Keep the raw value when typing changed it ('110001.0', ' Delhi', 'nan', 70.0)
+            extras.append(f"'{name}', CASE WHEN typeof({expr}) != typeof({typed}) "
+                          f"OR {expr} IS NOT {typed} THEN {expr} END")
+        else:
+            extras.append(f"'{name}', {expr}")
+    values.setdefault('pensioners', '1')
+    # json_patch drops the NULL members, so sparse rows stay small
+    values['extra'] = f"NULLIF(json_patch('{{}}', json_object({', '.join(extras)})), '{{}}')" if extras else 'NULL'
+    return values
+
+
+def _column_sql(name, default, prefix, keep_raw=False):
+    expr = f"{prefix}{name}"
+    if default is not None:
+        # Views have no column defaults; an omitted column arrives as NULL
+        expr = f"COALESCE({expr}, {default})"
+    if keep_raw:
+        # An UPDATE leaving a mapped column alone sees its canonical value; keep the raw one
+        expr = f"CASE WHEN NEW.{name} IS OLD.{name} THEN COALESCE(OLD.raw_{name}, OLD.{name}) ELSE {expr} END"
+    return expr
+
+
+def _not_null_checks(table, columns, update=False):
+    """Trigger statements raising the old NOT NULL constraint errors"""
+    return '\n'.join(
+        f"SELECT RAISE(ABORT, 'NOT NULL constraint failed: {table}.{name}') "
+        f"WHERE {_column_sql(name, default, 'NEW.', update and canonical)} IS NULL;"
+        for name, canonical, default, not_null in columns if not_null
+    )
+
+
+def _create_view_and_triggers(conn, table, key, columns):
+    select_list = ["f.source_rowid AS rowid"] + ([f"f.source_rowid AS {key}"] if key else [])
+    for name, canonical, _, _ in columns:
+        if canonical:
+            # The bare column, so predicates on it can use the pensioner_fact indexes
+            select_list.append(f"f.{canonical} AS {name}")
+        else:
+            select_list.append(f"json_extract(f.extra, {_json_path(name)}) AS {name}")
+    # Raw values last, so the old columns keep their positions
+    select_list += [f"json_extract(f.extra, {_json_path(name)}) AS raw_{name}"
+                    for name, canonical, _, _ in columns if canonical]
+    conn.execute(f"CREATE VIEW {table} AS SELECT {', '.join(select_list)} "
+                 f"FROM {FACT_TABLE} f WHERE f.source = '{table}'")
+
+    values = _value_sql(columns, 'NEW.')
+    next_rowid = (f"(SELECT COALESCE(MAX(source_rowid), 0) + 1 FROM {FACT_TABLE} WHERE source = '{table}')")
+    new_rowid = f"COALESCE(NEW.{key}, {next_rowid})" if key else next_rowid
+    conn.execute(f"""
+        CREATE TRIGGER {table}_insert INSTEAD OF INSERT ON {table}
+        BEGIN
+            {_not_null_checks(table, columns)}
+            INSERT INTO {FACT_TABLE} (source, source_rowid, {', '.join(values)})
+            VALUES ('{table}', {new_rowid}, {', '.join(values.values())});
+        END
+    """)
+    values = _value_sql(columns, 'NEW.', update=True)
+    assignments = ', '.join(f"{column} = {value}" for column, value in values.items())
+    key_assignment = f"source_rowid = COALESCE(NEW.{key}, OLD.rowid), " if key else ''
+    conn.execute(f"""
+        CREATE TRIGGER {table}_update INSTEAD OF UPDATE ON {table}
+        BEGIN
+            {_not_null_checks(table, columns, update=True)}
+            UPDATE {FACT_TABLE} SET {key_assignment}{assignments}
+            WHERE source = '{table}' AND source_rowid = OLD.rowid;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER {table}_delete INSTEAD OF DELETE ON {table}
+        BEGIN
+            DELETE FROM {FACT_TABLE} WHERE source = '{table}' AND source_rowid = OLD.rowid;
+        END
+    """)
+
+
+def _source_indexes(conn, table):
+    """[(name, unique, [columns])] of the source's indexes, UNIQUE constraints included"""
+    indexes = []
+    for _, name, unique, origin, _ in conn.execute(f"PRAGMA index_list({table})").fetchall():
+        if origin == 'pk':
+            continue
+        columns = [row[2] for row in conn.execute(f"PRAGMA index_info({name})")]
+        if name.startswith('sqlite_autoindex_'):
+            name = f"idx_{table}_{'_'.join(columns)}_unique"
+        indexes.append((name, bool(unique), columns))
+    return indexes
+
+
+def unify_table(conn, table):
+    """
+    Move a per-source table into pensioner_fact behind a compatibility view
+
+    Runs in one transaction; the old table (or the dictionary-encoded view and
+    its <table>_fact) is dropped at the end and its indexes are recreated as
+    partial indexes on pensioner_fact.
+
+    Returns:
+        int: Rows moved (0 when the table is missing or already unified)
+    """
+    exists = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (table,)).fetchone()
+    if not exists or is_unified(conn, table):
+        return 0
+
+    with conn:
+        # DDL does not open a transaction implicitly; make the whole move atomic
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        create_fact_table(conn)
+        key, columns = _source_layout(conn, table)
+        encoded = _is_encoded(conn, table)
+        if encoded:
+            indexes = _source_indexes(conn, f"{table}_fact")
+        else:
+            indexes = _source_indexes(conn, table) if exists[0] == 'table' else []
+
+        values = _value_sql(columns, '')
+        moved = conn.execute(f"""
+            INSERT INTO {FACT_TABLE} (source, source_rowid, {', '.join(values)})
+            SELECT '{table}', rowid, {', '.join(values.values())} FROM {table}
+        """).rowcount
+
+        if exists[0] == 'view':
+            conn.execute(f"DROP VIEW {table}")
+            if encoded:
+                conn.execute(f"DROP TABLE {table}_fact")
+                conn.execute("DELETE FROM normalized_tables WHERE table_name = ?", (table,))
+        else:
+            conn.execute(f"DROP TABLE {table}")
+        _create_view_and_triggers(conn, table, key, columns)
+
+        # Old indexes become partial indexes over this source's partition
+        canonical = {name: mapped for name, mapped, _, _ in columns}
+        for name, unique, index_columns in indexes:
+            mapped = []
+            for column in index_columns:
+                if encoded and column.endswith('_id') and column[:-3] in canonical:
+                    column = column[:-3]
+                if column == key:
+                    mapped.append('source_rowid')
+                elif canonical.get(column):
+                    mapped.append(canonical[column])
+                elif column in canonical:
+                    mapped.append(f"json_extract(extra, {_json_path(column)})")
+            if len(mapped) < len(index_columns):
+                continue
+            conn.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} "
+                         f"ON {FACT_TABLE} ({', '.join(mapped)}) WHERE source = '{table}'")
+
+        conn.execute(
+            "INSERT OR REPLACE INTO pensioner_fact_sources (source, key_column, rows, unified_at) VALUES (?, ?, ?, ?)",
+            (table, key, moved, datetime.now().isoformat(timespec='seconds'))
+        )
+    return moved
+
+
+def source_totals(conn):
+    """
+    Rows and pensioners per source in one indexed GROUP BY
+
+    Returns:
+        dict: {source: {'records': rows, 'pensioners': sum of pensioners}} ({} before any unify)
+    """
+    if not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FACT_TABLE,)
+    ).fetchone():
+        return {}
+    return {
+        source: {'records': records, 'pensioners': pensioners or 0}
+        for source, records, pensioners in conn.execute(
+            f"SELECT source, COUNT(*), SUM(pensioners) FROM {FACT_TABLE} GROUP BY source"
+        )
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move per-source pensioner tables into one fact table")
+    parser.add_argument("db_path", help="SQLite database file")
+    parser.add_argument("--table", action="append", dest="tables", choices=sorted(FACT_SOURCES),
+                        help="Table to unify (repeatable)")
+    parser.add_argument("--all", action="store_true", help="Unify every supported table present")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM afterwards to return the freed pages")
+    parser.add_argument("--status", action="store_true", help="Show which tables are unified and their totals")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Database file not found: {args.db_path}")
+        return
+
+    conn = sqlite3.connect(args.db_path)
+    try:
+        if args.status or not (args.tables or args.all):
+            totals = source_totals(conn)
+            for table in sorted(FACT_SOURCES):
+                if is_unified(conn, table):
+                    total = totals.get(table, {'records': 0, 'pensioners': 0})
+                    print(f"{table:<24} ✓ unified  {total['records']:>12,} rows {total['pensioners']:>14,} pensioners")
+                else:
+                    print(f"{table:<24} - separate")
+            return
+
+        size_before = os.path.getsize(args.db_path)
+        for table in (sorted(FACT_SOURCES) if args.all else args.tables):
+            started = time.time()
+            moved = unify_table(conn, table)
+            if moved:
+                print(f"✓ {table}: {moved:,} rows moved in {time.time() - started:.1f}s")
+            else:
+                print(f"- {table}: missing, empty or already unified")
+        if args.vacuum:
+            print("🧹 Vacuuming...")
+            conn.execute("VACUUM")
+            size_after = os.path.getsize(args.db_path)
+            print(f"📦 {size_before / 1e6:,.1f} MB → {size_after / 1e6:,.1f} MB")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Pensioner Parquet Lake
+Columnar copy of the per-source SQLite pensioner tables for heavy analytics
+
+Layout (hive partitioned, readable by DuckDB/pyarrow/pandas):
+    pensioner_lake/source=<table>/state_key=<STATE>/part-<generation>-<batch>-<n>.parquet
+    pensioner_lake/_manifest.json   per-source watermark (db, max rowid, row count)
+
+Every source is mapped onto one unified schema (LAKE_COLUMNS). Values are
+copied as SQLite's own text (no trimming or pincode clean-up), so a report
+gives the same numbers from the lake as from its SQLite fallback. The export is
+incremental: rows above the last exported rowid are written as new part files,
+and a source whose old rows were deleted or replaced is rewritten. Readers
+call fresh_lake_connection(), which only hands out a DuckDB connection when
+the lake matches the SQLite tables, so analytics never scan the live file.
+
+Usage:
+    python pensioner_lake.py --db database.db --db ../DLC_Database.db
+    python pensioner_lake.py --db database.db --rebuild
+    python pensioner_lake.py --status
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+
+from pensioner_rollup import detect_table_change
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = ds = None
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+LAKE_DIR = os.getenv(
+    'PENSIONER_LAKE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'pensioner_lake')
+)
+MANIFEST_NAME = '_manifest.json'
+# Bumped when the exported values change; sources written by another format are rebuilt
+LAKE_FORMAT = 2
+EXPORT_BATCH_SIZE = 200000
+
+# Unified schema: (column, type) - 'int' measures are exported as int64, the rest as raw text
+LAKE_COLUMNS = [
+    ('ppo_number', 'str'),
+    ('data_source', 'str'),
+    ('category', 'str'),            # LEVEL1 / GCODE / LC category
+    ('escroll_category', 'str'),
+    ('pension_type', 'str'),
+    ('bank_name', 'str'),
+    ('branch_code', 'str'),
+    ('branch_name', 'str'),
+    ('branch_pincode', 'str'),
+    ('branch_state', 'str'),
+    ('state', 'str'),               # pensioner state
+    ('district', 'str'),
+    ('pincode', 'str'),             # pensioner pincode
+    ('city', 'str'),
+    ('birth_year', 'str'),
+    ('age', 'str'),
+    ('psa', 'str'),
+    ('pda', 'str'),
+    ('submission_status', 'str'),
+    ('submission_mode', 'str'),
+    ('verification_type', 'str'),
+    ('pensioners', 'int'),          # 1 per pensioner row, grand_total for branch summary rows
+    ('age_less_than_80', 'int'),
+    ('age_more_than_80', 'int'),
+    ('age_not_available', 'int'),
+    ('source_rowid', 'int'),
+]
+
+# Source table -> SQLite expression per unified column (missing columns are NULL)
+LAKE_SOURCES = {
+    'bank_pensioner_data': {
+        'bank_name': 'bank_name', 'branch_pincode': 'branch_pin_code', 'branch_state': 'bank_state',
+        'state': 'bank_state', 'city': 'bank_city',
+        'pensioners': 'grand_total', 'age_less_than_80': 'age_less_than_80',
+        'age_more_than_80': 'age_more_than_80', 'age_not_available': 'age_not_available',
+    },
+    'doppw_pensioner_data': {
+        'category': 'gcode', 'escroll_category': 'escroll_cat', 'pension_type': 'pension_type',
+        'branch_code': 'branch_code', 'branch_name': 'branch_name', 'branch_pincode': 'branch_pincode', 'branch_state': 'branch_state',
+        'state': 'pensioner_state',
+        'district': 'pensioner_district', 'pincode': 'pensioner_pincode',
+        'birth_year': 'birth_year', 'age': 'age', 'submission_status': 'submitted_status',
+        'submission_mode': 'submission_mode', 'verification_type': 'verification_type',
+    },
+    'dot_pensioner_data': {
+        'ppo_number': 'ppo_number', 'category': 'lc_category', 'pincode': 'pensioner_pincode',
+        'birth_year': 'birth_year', 'age': 'age',
+    },
+    'ubi1_pensioner_data': {
+        'ppo_number': 'ppo_number', 'bank_name': 'bank_name', 'branch_name': 'branch_name',
+        'state': 'pensioner_state', 'pincode': 'pensioner_pincode', 'city': 'pensioner_city',
+        'age': 'age', 'psa': 'psa_name', 'pda': 'pda_name',
+    },
+    'ubi3_pensioner_data': {
+        'ppo_number': 'ppo_number', 'bank_name': 'bank_name', 'branch_name': 'branch_name',
+        'branch_pincode': 'branch_pincode', 'state': 'pensioner_state', 'pincode': 'pensioner_pincode',
+        'city': 'pensioner_city', 'age': 'age', 'psa': 'psa_name', 'pda': 'pda_name',
+    },
+    'pensioner_bank_master': {
+        'ppo_number': 'ppo_number', 'data_source': 'data_source', 'bank_name': 'bank_name',
+        'branch_name': 'branch_name', 'branch_pincode': 'branch_postcode', 'state': 'state',
+        'pincode': 'pensioner_postcode', 'city': 'pensioner_city', 'psa': 'PSA', 'pda': 'PDA',
+    },
+    'TBL_DOPPW_DLCDATA_MST': {
+        'ppo_number': 'PPO_UNIQUE_ID', 'category': 'LEVEL1', 'escroll_category': 'ESCROLL_CATEGORY',
+        'pension_type': 'PENSION_TYPE', 'branch_code': 'BRANCH_CODE', 'branch_name': 'BRANCH_NAME', 'branch_pincode': 'BRANCH_PINCODE',
+        'branch_state': 'BRANCH_STATE_NAME',
+        'state': 'PENSIONER_STATE_NAME',
+        'district': 'PENSIONER_DISTRICT_NAME', 'pincode': 'PENSIONER_PINCODE',
+        'birth_year': 'YEAR_OF_BIRTH', 'age': 'AGE', 'submission_status': 'SUBMISSION_STATUS',
+        'submission_mode': 'SUBMISSION_MODE', 'verification_type': 'VERIFICATION_TYPE',
+    },
+}
+
+
+def _column_sql(expr, kind):
+    """
+    SQLite value for the unified schema: measures as integers, everything else
+    as the text SQLite itself gives (what the SQLite fallbacks group and filter on)
+    """
+    if expr is None:
+        return 'NULL'
+    if kind == 'int':
+        return f"CASE WHEN TRIM({expr}) GLOB '[0-9]*' THEN CAST({expr} AS INTEGER) END"
+    return f"CAST({expr} AS TEXT)"
+
+
+def _source_query(table, mapping):
+    columns = []
+    for column, kind in LAKE_COLUMNS:
+        if column == 'source_rowid':
+            columns.append('rowid')
+        elif column == 'pensioners' and 'pensioners' not in mapping:
+            columns.append('1')
+        else:
+            columns.append(_column_sql(mapping.get(column), kind))
+    return f"SELECT {', '.join(columns)} FROM {table} WHERE rowid > ? ORDER BY rowid"
+
+
+def _state_key(state):
+    """Partition directory value: upper-case state with non-alphanumerics collapsed to '_'"""
+    return re.sub(r'[^A-Z0-9]+', '_', (state or '').upper()).strip('_') or 'UNKNOWN'
+
+
+def _arrow_schema():
+    return pa.schema(
+        [(column, pa.int64() if kind == 'int' else pa.string()) for column, kind in LAKE_COLUMNS]
+        + [('state_key', pa.string())]
+    )
+
+
+def load_manifest(lake_dir=LAKE_DIR):
+    """
+    Returns:
+        dict: source table -> {db_path, max_rowid, row_count, generation, exported_at}
+    """
+    path = os.path.join(lake_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest, lake_dir):
+    path = os.path.join(lake_dir, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _write_source(conn, table, after_rowid, generation, lake_dir, batch_size):
+    """Export rows of one source above after_rowid as new part files; returns rows written"""
+    schema = _arrow_schema()
+    names = [column for column, _ in LAKE_COLUMNS]
+    state_index, branch_state_index = names.index('state'), names.index('branch_state')
+    partitioning = ds.partitioning(pa.schema([('state_key', pa.string())]), flavor='hive')
+    file_options = ds.ParquetFileFormat().make_write_options(compression='zstd')
+    base_dir = os.path.join(lake_dir, f"source={table}")
+
+    cursor = conn.cursor()
+    cursor.execute(_source_query(table, LAKE_SOURCES[table]), (after_rowid,))
+    rows = 0
+    batch_number = 0
+    state_keys = {}
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        columns = [list(values) for values in zip(*batch)]
+        # Partition by pensioner state, falling back to the branch state
+        partition_states = [
+            state or branch_state for state, branch_state in zip(columns[state_index], columns[branch_state_index])
+        ]
+        columns.append([state_keys.setdefault(state, _state_key(state)) for state in partition_states])
+        ds.write_dataset(
+            pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+            ),
+            base_dir,
+            format='parquet',
+            partitioning=partitioning,
+            basename_template=f"part-{generation:05d}-{batch_number:05d}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+            file_options=file_options,
+        )
+        rows += len(batch)
+        batch_number += 1
+    return rows
+
+
+def export_to_lake(db_path, lake_dir=LAKE_DIR, rebuild=False, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Sync every lake source table found in a SQLite database into the Parquet lake
+
+    Args:
+        db_path (str): SQLite database to read
+        lake_dir (str): Lake root directory
+        rebuild (bool): Rewrite the sources of this database from scratch
+        batch_size (int): Rows per fetchmany batch / part file
+
+    Returns:
+        dict: source table -> {'action': ..., 'rows': ...}
+    """
+    if pa is None:
+        raise RuntimeError("The Parquet lake needs pyarrow (pip install pyarrow)")
+
+    db_path = os.path.abspath(db_path)
+    os.makedirs(lake_dir, exist_ok=True)
+    manifest = load_manifest(lake_dir)
+    results = {}
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+        for table in LAKE_SOURCES:
+            if table not in tables:
+                continue
+            entry = manifest.get(table)
+            if entry and entry['db_path'] != db_path:
+                print(f"⚠️  {table} is already exported from {entry['db_path']}; skipping the copy in {db_path}")
+                continue
+
+            started = time.time()
+            current = entry and entry.get('format') == LAKE_FORMAT
+            watermark = (entry['max_rowid'], entry['row_count']) if current and not rebuild else None
+            action, max_rowid, row_count = detect_table_change(conn, table, watermark)
+            if action == 'unchanged':
+                results[table] = {'action': 'unchanged', 'rows': 0}
+                continue
+
+            generation = (entry['generation'] + 1) if entry else 1
+            if action == 'appended':
+                after_rowid = entry['max_rowid']
+            else:
+                shutil.rmtree(os.path.join(lake_dir, f"source={table}"), ignore_errors=True)
+                after_rowid = 0
+            rows = _write_source(conn, table, after_rowid, generation, lake_dir, batch_size)
+
+            manifest[table] = {
+                'db_path': db_path,
+                'max_rowid': max_rowid,
+                'row_count': row_count,
+                'generation': generation,
+                'format': LAKE_FORMAT,
+                'exported_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            _save_manifest(manifest, lake_dir)
+            results[table] = {'action': 'appended' if action == 'appended' else 'rebuilt', 'rows': rows}
+            print(f"✓ Lake {results[table]['action']} {table}: {rows:,} rows in {time.time() - started:.1f}s")
+    finally:
+        conn.close()
+
+    return results
+
+
+def is_lake_fresh(db_path, tables, lake_dir=LAKE_DIR):
+    """
+    True when every table was exported from db_path, in the current LAKE_FORMAT,
+    and is unchanged since
+
+    MAX(rowid) and COUNT(*) are compared with the manifest watermark, so
+    appended, deleted and replaced rows all make the lake stale. Rows updated
+    in place are not detected; re-export with --rebuild after such fixes.
+    """
+    manifest = load_manifest(lake_dir)
+    db_path = os.path.abspath(db_path)
+    if not os.path.exists(db_path):
+        return False
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        for table in tables:
+            entry = manifest.get(table)
+            if not entry or entry['db_path'] != db_path or entry.get('format') != LAKE_FORMAT:
+                return False
+            watermark = (entry['max_rowid'], entry['row_count'])
+            if detect_table_change(conn, table, watermark)[0] != 'unchanged':
+                return False
+        return True
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+
+
+def connect_lake(lake_dir=LAKE_DIR):
+    """
+    DuckDB connection with the lake exposed as the `pensioner_lake` view
+
+    `source` and `state_key` come from the partition directories, so filters
+    on them skip whole files.
+    """
+    con = duckdb.connect()
+    pattern = os.path.join(lake_dir, '*', '*', '*.parquet').replace("'", "''")
+    con.execute(f"""
+        CREATE VIEW pensioner_lake AS
+        SELECT * FROM read_parquet('{pattern}', hive_partitioning = true, union_by_name = true)
+    """)
+    return con
+
+
+def fresh_lake_connection(db_path, tables, lake_dir=LAKE_DIR):
+    """
+    Lake connection for analytics over `tables`, or None when the lake is
+    missing, stale or DuckDB is not installed (callers then use SQLite)
+    """
+    if duckdb is None or not is_lake_fresh(db_path, tables, lake_dir):
+        return None
+    print(f"🗄️  Using Parquet lake at {lake_dir}")
+    return connect_lake(lake_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export SQLite pensioner tables into the Parquet lake")
+    parser.add_argument("--db", action="append", default=[], help="SQLite database to export (repeatable)")
+    parser.add_argument("--lake", default=LAKE_DIR, help="Lake root directory")
+    parser.add_argument("--rebuild", action="store_true", help="Rewrite the sources of the given databases")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    parser.add_argument("--status", action="store_true", help="Show the manifest and exit")
+    args = parser.parse_args()
+
+    if args.status or not args.db:
+        manifest = load_manifest(args.lake)
+        if not manifest:
+            print(f"⚠️  No lake at {args.lake}")
+        for table, entry in sorted(manifest.items()):
+            print(f"{table:<28} {entry['row_count']:>12,} rows  gen {entry['generation']:<4} "
+                  f"{entry['exported_at']}  {entry['db_path']}")
+        return
+
+    for db_path in args.db:
+        if not os.path.exists(db_path):
+            print(f"❌ Database file not found: {db_path}")
+            continue
+        print(f"📦 Exporting {db_path} → {args.lake}")
+        export_to_lake(db_path, args.lake, rebuild=args.rebuild, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
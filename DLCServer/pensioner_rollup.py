@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Pensioner Rollup Cube
+Persisted pre-aggregate of the raw pensioner tables for dashboards and reports
+
+➢ pensioner_rollup         : one row per source × state × district × pincode ×
+                             bank × age bucket × submission status
+➢ pensioner_rollup_sources : per-table watermark (max rowid, row count, generation)
+
+refresh_rollup() runs after each import. Rows appended since the last refresh
+(rowid above the watermark) are folded into the cube with an UPSERT; a table
+whose old rows were deleted or replaced is rebuilt on its own. An unchanged
+table costs one MAX(rowid)/COUNT(*) probe, so report scripts call it too.
+
+Rows updated in place are not detected - run with --rebuild after such fixes:
+    python pensioner_rollup.py database.db
+    python pensioner_rollup.py database.db --rebuild
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+
+from dimension_store import grouped_counts_sql, is_normalized
+
+# Numeric ages bucketed with the same boundaries as analyze_pensioner_data.py
+AGE_BUCKET_SQL = """CASE
+            WHEN age IS NULL OR age = '' THEN 'Unknown'
+            WHEN age < 60 THEN 'Below 60'
+            WHEN age < 70 THEN '60-70'
+            WHEN age < 80 THEN '70-80'
+            WHEN age < 90 THEN '80-90'
+            ELSE 'Above 90'
+        END"""
+
+# How each raw table maps onto the cube dimensions. Tables holding one row per
+# bank/branch with age columns ('counts') get one cell per age column, with
+# 'N/A' taking the remainder so the buckets always add up to the total; tables
+# holding one row per pensioner ('age_bucket') count each row once.
+ROLLUP_SOURCES = [
+    {
+        'table': 'bank_pensioner_data',
+        'state': 'bank_state',
+        'pincode': 'branch_pin_code',
+        'bank_name': 'bank_name',
+        'where': 'grand_total > 0',
+        'counts': ('grand_total', [('<80', 'age_less_than_80'), ('>80', 'age_more_than_80')]),
+    },
+    {
+        'table': 'pensioner_pincode_data',
+        'state': 'state',
+        'district': 'district',
+        'pincode': 'pincode',
+        'bank_name': 'bank_name',
+        'counts': ('total_pensioners', [('<80', 'age_less_than_80'), ('>80', 'age_more_than_80')]),
+    },
+    {
+        # newdatabase.db: counts stored as text and no district column, city is used
+        'table': 'pensioner_data',
+        'state': 'state',
+        'district': 'city',
+        'pincode': 'pincode',
+        'bank_name': 'bank_name',
+        'counts': ('CAST(grand_total AS INTEGER)', [('<80', 'CAST(age_less_than_80 AS INTEGER)'),
+                                                    ('>80', 'CAST(age_more_than_80 AS INTEGER)')]),
+    },
+    {
+        'table': 'doppw_pensioner_data',
+        'state': 'pensioner_state',
+        'district': 'pensioner_district',
+        'pincode': 'pensioner_pincode',
+        'status': 'submitted_status',
+        'age_bucket': AGE_BUCKET_SQL,
+        'age': 'age',
+    },
+    {
+        'table': 'dlc_pensioner_data',
+        'state': 'pensioner_state',
+        'district': 'pensioner_district',
+        'pincode': 'pensioner_pincode_clean',
+        'age_bucket': 'age_category',
+        'age': 'age',
+    },
+    {
+        # source is the import's data_source; SPARSH imports store the age group
+        # in PSA (DEFENCE_<age>), other imports a real PSA
+        'table': 'pensioner_bank_master',
+        'source': 'data_source',
+        'state': 'state',
+        'pincode': 'branch_postcode',
+        'bank_name': 'bank_name',
+        'age_bucket': "CASE WHEN PSA LIKE 'DEFENCE%' THEN PSA END",
+        # Raw columns the expressions above read; when the table is normalized
+        # (dimension_store.py) the rows are pre-counted on the encoded ids
+        'grouped': ['data_source', 'state', 'branch_postcode', 'bank_name', 'PSA'],
+    },
+]
+
+DIMENSIONS = ['source', 'state', 'district', 'pincode', 'bank_name', 'age_bucket', 'status']
+
+
+def create_rollup_tables(conn):
+    """Create the cube and its watermark table if missing"""
+    conn.executescript("""
+    CREATE TABLE IF NOT EXISTS pensioner_rollup (
+        source_table TEXT NOT NULL,
+        source TEXT NOT NULL,
+        state TEXT NOT NULL,
+        district TEXT NOT NULL,
+        pincode TEXT NOT NULL,
+        bank_name TEXT NOT NULL,
+        age_bucket TEXT NOT NULL,
+        status TEXT NOT NULL,
+        pensioners INTEGER NOT NULL DEFAULT 0,
+        records INTEGER NOT NULL DEFAULT 0,
+        age_sum INTEGER NOT NULL DEFAULT 0,
+        age_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (source_table, source, state, district, pincode, bank_name, age_bucket, status)
+    ) WITHOUT ROWID;
+
+    CREATE INDEX IF NOT EXISTS idx_pensioner_rollup_state ON pensioner_rollup(state, district);
+    CREATE INDEX IF NOT EXISTS idx_pensioner_rollup_pincode ON pensioner_rollup(pincode);
+    CREATE INDEX IF NOT EXISTS idx_pensioner_rollup_bank ON pensioner_rollup(bank_name, state);
+
+    CREATE TABLE IF NOT EXISTS pensioner_rollup_sources (
+        source_table TEXT PRIMARY KEY,
+        max_rowid INTEGER NOT NULL,
+        row_count INTEGER NOT NULL,
+        generation INTEGER NOT NULL DEFAULT 0,
+        refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """)
+    conn.commit()
+
+
+def _dimension(expr):
+    """Cube dimensions are never NULL: missing, blank and pandas 'nan' values become ''"""
+    return f"COALESCE(NULLIF(NULLIF(TRIM({expr}), ''), 'nan'), '')"
+
+
+def _source_rows_sql(spec, after_rowid, normalized=False):
+    """
+    SELECT producing one cube contribution per raw row (or per age column) above after_rowid
+
+    A normalized table with a 'grouped' column list contributes one pre-counted
+    row per combination of those columns instead.
+    """
+    table = spec['table']
+    source = f"COALESCE(NULLIF(TRIM({spec['source']}), ''), '{table}')" if 'source' in spec else f"'{table}'"
+    dims = ", ".join(
+        [f"{source} AS source"]
+        + [f"{_dimension(spec.get(dim, 'NULL'))} AS {dim}" for dim in ('state', 'district', 'pincode', 'bank_name', 'status')]
+    )
+    where = f"rowid > {int(after_rowid)}" + (f" AND ({spec['where']})" if 'where' in spec else '')
+
+    if normalized and 'grouped' in spec:
+        return f"""
+            SELECT {dims}, {_dimension(spec.get('age_bucket', 'NULL'))} AS age_bucket,
+                   rows AS pensioners, rows AS records, NULL AS age
+            FROM ({grouped_counts_sql(table, spec['grouped'], f'rowid > {int(after_rowid)}')})"""
+
+    if 'counts' not in spec:
+        age = spec.get('age', 'NULL')
+        return f"""
+            SELECT {dims}, {_dimension(spec.get('age_bucket', 'NULL'))} AS age_bucket,
+                   1 AS pensioners, 1 AS records, {age} AS age
+            FROM {table} WHERE {where}"""
+
+    total, age_columns = spec['counts']
+    remainder = f"COALESCE({total}, 0)" + "".join(f" - COALESCE({column}, 0)" for _, column in age_columns)
+    buckets = [(label, f"COALESCE({column}, 0)") for label, column in age_columns] + [('N/A', remainder)]
+    parts = []
+    for index, (label, value) in enumerate(buckets):
+        # The first bucket carries the row count; empty buckets add no cells
+        parts.append(f"""
+            SELECT {dims}, '{label}' AS age_bucket, {value} AS pensioners,
+                   {1 if index == 0 else 0} AS records, NULL AS age
+            FROM {table} WHERE {where}{'' if index == 0 else f' AND {value} <> 0'}""")
+    return "\nUNION ALL".join(parts)
+
+
+def _fold_into_cube(conn, spec, after_rowid, normalized=False):
+    """Aggregate the raw rows above after_rowid and add them to the cube"""
+    dims = ", ".join(DIMENSIONS)
+    conn.execute(f"""
+        INSERT INTO pensioner_rollup
+            (source_table, {dims}, pensioners, records, age_sum, age_count)
+        SELECT ?, {dims}, SUM(pensioners), SUM(records), COALESCE(SUM(age), 0), COUNT(age)
+        FROM ({_source_rows_sql(spec, after_rowid, normalized)})
+        WHERE 1
+        GROUP BY {dims}
+        ON CONFLICT(source_table, {dims}) DO UPDATE SET
+            pensioners = pensioners + excluded.pensioners,
+            records = records + excluded.records,
+            age_sum = age_sum + excluded.age_sum,
+            age_count = age_count + excluded.age_count
+    """, (spec['table'],))
+
+
+def detect_table_change(conn, table, watermark):
+    """
+    Compare a rowid table with the (max_rowid, row_count) recorded at the last sync
+
+    Args:
+        conn (sqlite3.Connection): Database holding the table
+        table (str): Table name
+        watermark (tuple): (max_rowid, row_count) from the last sync, or None
+
+    Returns:
+        tuple: (action, max_rowid, row_count) where action is 'unchanged',
+        'appended' (only rows above the old max rowid are new) or 'rebuild'
+    """
+    max_rowid, row_count = conn.execute(
+        f"SELECT COALESCE(MAX(rowid), 0), COUNT(*) FROM {table}"
+    ).fetchone()
+    if watermark is None:
+        return 'rebuild', max_rowid, row_count
+    old_max_rowid, old_row_count = watermark
+    if (max_rowid, row_count) == (old_max_rowid, old_row_count):
+        return 'unchanged', max_rowid, row_count
+    if max_rowid >= old_max_rowid:
+        new_rows = conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE rowid > ?", (old_max_rowid,)
+        ).fetchone()[0]
+        # No old row went away, so only the new ones need to be synced
+        if row_count == old_row_count + new_rows:
+            return 'appended', max_rowid, row_count
+    return 'rebuild', max_rowid, row_count
+
+
+def _existing_tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+
+
+def refresh_rollup(conn, rebuild=False, verbose=True):
+    """
+    Bring pensioner_rollup up to date with every source table in the database
+
+    Args:
+        conn (sqlite3.Connection): Database holding the raw tables
+        rebuild (bool): Recompute every source, e.g. after rows were updated in place
+        verbose (bool): Print one line per source that changed
+
+    Returns:
+        dict: source table -> 'unchanged', 'appended', 'rebuilt' or 'error'
+    """
+    create_rollup_tables(conn)
+    tables = _existing_tables(conn)
+    results = {}
+
+    for spec in ROLLUP_SOURCES:
+        table = spec['table']
+        if table not in tables:
+            continue
+        started = time.time()
+        try:
+            watermark = conn.execute(
+                "SELECT max_rowid, row_count FROM pensioner_rollup_sources WHERE source_table = ?", (table,)
+            ).fetchone()
+            # A normalized table's view shares its rowids with <table>_fact; probe the
+            # fact table so COUNT(*)/MAX(rowid) skip the view's dimension joins
+            normalized = is_normalized(conn, table)
+            probe = f"{table}_fact" if normalized else table
+            action, max_rowid, row_count = detect_table_change(conn, probe, None if rebuild else watermark)
+            if action == 'unchanged':
+                results[table] = 'unchanged'
+                continue
+
+            with conn:
+                if action == 'appended':
+                    _fold_into_cube(conn, spec, watermark[0], normalized)
+                    results[table] = 'appended'
+                else:
+                    conn.execute("DELETE FROM pensioner_rollup WHERE source_table = ?", (table,))
+                    _fold_into_cube(conn, spec, 0, normalized)
+                    results[table] = 'rebuilt'
+
+                conn.execute("""
+                    INSERT INTO pensioner_rollup_sources (source_table, max_rowid, row_count, generation)
+                    VALUES (?, ?, ?, 1)
+                    ON CONFLICT(source_table) DO UPDATE SET
+                        max_rowid = excluded.max_rowid,
+                        row_count = excluded.row_count,
+                        generation = generation + 1,
+                        refreshed_at = CURRENT_TIMESTAMP
+                """, (table, max_rowid, row_count))
+
+            if verbose:
+                print(f"✓ Rollup {results[table]} for {table} ({row_count:,} rows, {time.time() - started:.2f}s)")
+        except sqlite3.Error as e:
+            results[table] = 'error'
+            print(f"⚠️  Skipping {table} in rollup: {e}")
+
+    return results
+
+
+def rollup_generation(conn, tables=None):
+    """
+    Sum of the source generations; changes whenever one of the sources is refreshed
+
+    Args:
+        tables (list): Only count these source tables (default: all)
+
+    Returns:
+        int: 0 if the cube has never been built
+    """
+    if 'pensioner_rollup_sources' not in _existing_tables(conn):
+        return 0
+    if tables is None:
+        return conn.execute("SELECT COALESCE(SUM(generation), 0) FROM pensioner_rollup_sources").fetchone()[0]
+    placeholders = ', '.join('?' for _ in tables)
+    return conn.execute(
+        f"SELECT COALESCE(SUM(generation), 0) FROM pensioner_rollup_sources WHERE source_table IN ({placeholders})",
+        list(tables)
+    ).fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the pensioner rollup cube")
+    parser.add_argument("db_path", nargs="?", default="database.db", help="SQLite database to refresh")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute every source from scratch")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    try:
+        results = refresh_rollup(conn, rebuild=args.rebuild)
+        if not results:
+            print(f"⚠️  No rollup source tables found in {args.db_path}")
+            sys.exit(1)
+        cells, pensioners = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(pensioners), 0) FROM pensioner_rollup"
+        ).fetchone()
+        print(f"📊 pensioner_rollup: {cells:,} cells covering {pensioners:,} pensioners")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,9 @@ import re
 from datetime import datetime
 import json
 
+from pensioner_rollup import refresh_rollup
+from pincode_statistics import refresh_pincode_statistics
+
 class PincodeDataProcessor:
     def __init__(self, db_path='database.db', excel_dir='Excel Files'):
         self.db_path = db_path
@@ -340,34 +343,14 @@ class PincodeDataProcessor:
         
         return bank_records + dot_records + doppw_records
     
-    def update_pincode_statistics(self):
-        """Update pincode statistics table"""
+    def update_pincode_statistics(self, full=False):
+        """Refresh pincode_statistics for the pincodes touched since the last run"""
         print("\n📊 Updating Pincode Statistics...")
         
-        cursor = self.conn.cursor()
-        
-        cursor.execute('DELETE FROM pincode_statistics')
-        
-        cursor.execute('''
-            INSERT INTO pincode_statistics 
-            (pincode, state, district, total_pensioners, total_banks, total_branches)
-            SELECT 
-                p.pincode,
-                pm.state,
-                pm.district,
-                SUM(p.total_pensioners) as total_pensioners,
-                COUNT(DISTINCT p.bank_name) as total_banks,
-                COUNT(DISTINCT p.bank_ifsc) as total_branches
-            FROM pensioner_pincode_data p
-            LEFT JOIN pincode_master pm ON p.pincode = pm.pincode
-            GROUP BY p.pincode, pm.state, pm.district
-        ''')
-        
-        self.conn.commit()
+        refresh_pincode_statistics(self.conn, full=full)
         
-        cursor.execute('SELECT COUNT(*) FROM pincode_statistics')
-        count = cursor.fetchone()[0]
-        print(f"✓ Statistics updated for {count} pincodes")
+        count = self.conn.execute('SELECT COUNT(*) FROM pincode_statistics').fetchone()[0]
+        print(f"✓ Statistics cover {count} pincodes")
         
     def generate_report(self):
         """Generate comprehensive pincode report"""
@@ -445,6 +428,7 @@ class PincodeDataProcessor:
             
             # Update statistics
             self.update_pincode_statistics()
+            refresh_rollup(self.conn)
             
             # Generate report
             self.generate_report()
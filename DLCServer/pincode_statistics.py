@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Pincode Statistics Refresh
+Keeps pincode_statistics in step with pensioner_pincode_data without full rebuilds
+
+➢ pincode_statistics         : one row per pincode (pensioners, banks, branches)
+➢ pincode_statistics_sources : per-source watermark - max rowid and row count of
+                               pensioner_pincode_data, row count and latest
+                               updated_at of pincode_master
+
+refresh_pincode_statistics() only re-aggregates the pincodes touched since the
+watermarks: pincodes of rows appended to pensioner_pincode_data, and pincodes
+whose pincode_master entry was inserted or updated (state/district feed the
+statistics). Deleted or replaced rows cannot be traced to their pincodes, so
+they trigger a full rebuild. --check compares the table with a from-scratch
+aggregate and --repair re-aggregates whatever differs:
+    python pincode_statistics.py database.db
+    python pincode_statistics.py database.db --check --repair
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+
+from pensioner_rollup import detect_table_change
+
+DATA_TABLE = 'pensioner_pincode_data'
+MASTER_TABLE = 'pincode_master'
+
+# One row per pincode; pincode_master.pincode is unique so the join adds no rows
+STATISTICS_SELECT = '''
+    SELECT
+        p.pincode,
+        pm.state,
+        pm.district,
+        SUM(p.total_pensioners) as total_pensioners,
+        COUNT(DISTINCT p.bank_name) as total_banks,
+        COUNT(DISTINCT p.bank_ifsc) as total_branches
+    FROM pensioner_pincode_data p
+    LEFT JOIN pincode_master pm ON p.pincode = pm.pincode
+    {where}
+    GROUP BY p.pincode, pm.state, pm.district
+'''
+
+STATISTICS_COLUMNS = 'pincode, state, district, total_pensioners, total_banks, total_branches'
+
+
+def create_statistics_tables(conn):
+    """Create the watermark table and the pincode index used by partial refreshes"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pincode_statistics_sources (
+            source_table TEXT PRIMARY KEY,
+            max_rowid INTEGER NOT NULL DEFAULT 0,
+            row_count INTEGER NOT NULL,
+            max_updated_at TEXT,
+            refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_pincode_statistics_pincode ON pincode_statistics(pincode)')
+    conn.commit()
+
+
+def _watermarks(conn):
+    return {
+        row[0]: row[1:]
+        for row in conn.execute(
+            'SELECT source_table, max_rowid, row_count, max_updated_at FROM pincode_statistics_sources'
+        )
+    }
+
+
+def _aggregate_pincodes(conn):
+    """Replace the statistics of the pincodes listed in temp.touched_pincodes"""
+    conn.execute('DELETE FROM pincode_statistics WHERE pincode IN (SELECT pincode FROM temp.touched_pincodes)')
+    conn.execute(
+        f'INSERT INTO pincode_statistics ({STATISTICS_COLUMNS}) '
+        + STATISTICS_SELECT.format(where='WHERE p.pincode IN (SELECT pincode FROM temp.touched_pincodes)')
+    )
+
+
+def refresh_pincode_statistics(conn, full=False, verbose=True):
+    """
+    Bring pincode_statistics up to date with pensioner_pincode_data and pincode_master
+
+    Args:
+        conn (sqlite3.Connection): Database holding the pincode tables
+        full (bool): Recompute every pincode, e.g. after rows were updated in place
+        verbose (bool): Print a summary line
+
+    Returns:
+        dict: {'mode': 'unchanged' | 'incremental' | 'full', 'pincodes': pincodes re-aggregated}
+    """
+    started = time.time()
+    create_statistics_tables(conn)
+    marks = _watermarks(conn)
+
+    data_mark = marks.get(DATA_TABLE)
+    action, max_rowid, row_count = detect_table_change(
+        conn, DATA_TABLE, None if full or data_mark is None else data_mark[:2]
+    )
+    master_count, master_updated = conn.execute(
+        f'SELECT COUNT(*), MAX(updated_at) FROM {MASTER_TABLE}'
+    ).fetchone()
+    master_mark = marks.get(MASTER_TABLE)
+
+    if action == 'rebuild' or master_mark is None or master_count < master_mark[1]:
+        mode = 'full'
+    elif action == 'unchanged' and (master_count, master_updated) == tuple(master_mark[1:]):
+        if verbose:
+            print('✓ Pincode statistics unchanged')
+        return {'mode': 'unchanged', 'pincodes': 0}
+    else:
+        mode = 'incremental'
+
+    with conn:
+        if mode == 'full':
+            conn.execute('DELETE FROM pincode_statistics')
+            conn.execute(f'INSERT INTO pincode_statistics ({STATISTICS_COLUMNS}) ' + STATISTICS_SELECT.format(where=''))
+            pincodes = conn.execute('SELECT COUNT(*) FROM pincode_statistics').fetchone()[0]
+        else:
+            conn.execute('DROP TABLE IF EXISTS temp.touched_pincodes')
+            conn.execute('CREATE TEMP TABLE touched_pincodes (pincode TEXT PRIMARY KEY)')
+            conn.execute(f'''
+                INSERT OR IGNORE INTO temp.touched_pincodes
+                SELECT pincode FROM {DATA_TABLE} WHERE rowid > ?
+            ''', (data_mark[0],))
+            # updated_at has one-second resolution, so the boundary second is re-read
+            conn.execute(f'''
+                INSERT OR IGNORE INTO temp.touched_pincodes
+                SELECT pincode FROM {MASTER_TABLE} WHERE updated_at >= ?
+            ''', (master_mark[2] or '',))
+            _aggregate_pincodes(conn)
+            pincodes = conn.execute('SELECT COUNT(*) FROM temp.touched_pincodes').fetchone()[0]
+            conn.execute('DROP TABLE temp.touched_pincodes')
+
+        conn.executemany('''
+            INSERT OR REPLACE INTO pincode_statistics_sources
+            (source_table, max_rowid, row_count, max_updated_at, refreshed_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', [(DATA_TABLE, max_rowid, row_count, None),
+              (MASTER_TABLE, 0, master_count, master_updated)])
+
+    if verbose:
+        print(f"✓ Statistics {mode} refresh for {pincodes:,} pincodes ({time.time() - started:.2f}s)")
+    return {'mode': mode, 'pincodes': pincodes}
+
+
+def check_pincode_statistics(conn, repair=False, verbose=True):
+    """
+    Compare pincode_statistics with a from-scratch aggregate
+
+    Args:
+        conn (sqlite3.Connection): Database holding the pincode tables
+        repair (bool): Re-aggregate the pincodes that differ
+        verbose (bool): Print the findings
+
+    Returns:
+        dict: {'pincodes': expected pincode count, 'mismatched': [pincodes that
+        are missing, stale, extra or duplicated]}
+    """
+    conn.execute('DROP TABLE IF EXISTS temp.expected_statistics')
+    conn.execute('CREATE TEMP TABLE expected_statistics AS ' + STATISTICS_SELECT.format(where=''))
+    expected = conn.execute('SELECT COUNT(*) FROM temp.expected_statistics').fetchone()[0]
+
+    mismatched = [row[0] for row in conn.execute(f'''
+        SELECT pincode FROM (
+            SELECT {STATISTICS_COLUMNS} FROM temp.expected_statistics
+            EXCEPT
+            SELECT {STATISTICS_COLUMNS} FROM pincode_statistics
+        )
+        UNION
+        SELECT pincode FROM (
+            SELECT {STATISTICS_COLUMNS} FROM pincode_statistics
+            EXCEPT
+            SELECT {STATISTICS_COLUMNS} FROM temp.expected_statistics
+        )
+        UNION
+        SELECT pincode FROM pincode_statistics GROUP BY pincode HAVING COUNT(*) > 1
+        ORDER BY pincode
+    ''')]
+    conn.execute('DROP TABLE temp.expected_statistics')
+
+    if verbose:
+        if mismatched:
+            print(f"❌ {len(mismatched):,} of {expected:,} pincodes differ from pensioner_pincode_data")
+            print(f"   e.g. {', '.join(str(p) for p in mismatched[:10])}")
+        else:
+            print(f"✅ pincode_statistics consistent ({expected:,} pincodes)")
+
+    if repair and mismatched:
+        with conn:
+            conn.execute('DROP TABLE IF EXISTS temp.touched_pincodes')
+            conn.execute('CREATE TEMP TABLE touched_pincodes (pincode TEXT PRIMARY KEY)')
+            conn.executemany('INSERT OR IGNORE INTO temp.touched_pincodes VALUES (?)', [(p,) for p in mismatched])
+            _aggregate_pincodes(conn)
+            conn.execute('DROP TABLE temp.touched_pincodes')
+        if verbose:
+            print(f"✓ Re-aggregated {len(mismatched):,} pincodes")
+
+    return {'pincodes': expected, 'mismatched': mismatched}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh or check the pincode_statistics table")
+    parser.add_argument("db_path", nargs="?", default="database.db", help="SQLite database holding the pincode tables")
+    parser.add_argument("--full", action="store_true", help="Recompute every pincode")
+    parser.add_argument("--check", action="store_true", help="Compare with a from-scratch aggregate instead of refreshing")
+    parser.add_argument("--repair", action="store_true", help="With --check, re-aggregate the pincodes that differ")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path, timeout=30)
+    try:
+        if args.check:
+            result = check_pincode_statistics(conn, repair=args.repair)
+            return 1 if result['mismatched'] and not args.repair else 0
+        refresh_pincode_statistics(conn, full=args.full)
+        return 0
+    except sqlite3.Error as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Global PPO Registry
+One row per normalized PPO number across every pensioner source, kept up to
+date at ingest so cross-source duplicates (a pensioner in both DoPPW and UBI
+data) are flagged while loading instead of never.
+
+    ppo_registry          ppo_key -> first source, source rowid, first seen
+    ppo_duplicates        every later row carrying a registered PPO
+    ppo_registry_sources  per-source rowid watermark
+    ppo_registry_bloom    persisted Bloom filter bits
+    ppo_registry_meta     key format version (PPO_KEY_VERSION)
+
+Each processor calls PPORegistry.sync(<table>) after loading a sheet. Rows
+above the source's watermark are checked against an in-memory Bloom filter
+first: a negative answer means the PPO is certainly new and is registered
+without touching the index, and only the (rare) positives are looked up.
+A registry built with another normalize_ppo key format is cleared on open,
+and every source registers again from scratch on its next sync.
+
+Usage:
+    python ppo_registry.py database.db                 # sync every source
+    python ppo_registry.py database.db --report        # duplicate summary
+    python ppo_registry.py database.db --rebuild
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+from pensioner_facts import FACT_SOURCES
+from pensioner_rollup import detect_table_change
+from table_profiler import BLANK_VALUES
+
+# Bump whenever normalize_ppo() changes the keys it produces
+PPO_KEY_VERSION = 2
+SYNC_BATCH_SIZE = 50000
+BLOOM_ERROR_RATE = 0.01
+BLOOM_MIN_CAPACITY = 1000000
+
+# Source table -> its PPO column
+PPO_SOURCES = {
+    table: next(column for column, canonical in mapping.items() if canonical == 'ppo_number')
+    for table, mapping in FACT_SOURCES.items()
+    if 'ppo_number' in mapping.values()
+}
+
+REGISTRY_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS ppo_registry (
+        ppo_key TEXT PRIMARY KEY,
+        source TEXT NOT NULL,
+        source_rowid INTEGER NOT NULL,
+        first_seen TEXT NOT NULL
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS ppo_duplicates (
+        id INTEGER PRIMARY KEY,
+        ppo_key TEXT NOT NULL,
+        source TEXT NOT NULL,
+        source_rowid INTEGER NOT NULL,
+        first_source TEXT NOT NULL,
+        first_rowid INTEGER NOT NULL,
+        cross_source INTEGER NOT NULL,
+        seen_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_ppo_duplicates_key ON ppo_duplicates(ppo_key);
+    CREATE INDEX IF NOT EXISTS idx_ppo_duplicates_source ON ppo_duplicates(source, first_source);
+    CREATE TABLE IF NOT EXISTS ppo_registry_sources (
+        source TEXT PRIMARY KEY,
+        max_rowid INTEGER NOT NULL,
+        rows INTEGER NOT NULL,
+        synced_at TEXT
+    );
+    CREATE TABLE IF NOT EXISTS ppo_registry_meta (
+        name TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS ppo_registry_bloom (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        capacity INTEGER NOT NULL,
+        hashes INTEGER NOT NULL,
+        keys INTEGER NOT NULL,
+        bits BLOB NOT NULL
+    );
+"""
+
+
+# Label words that some banks export in front of the number ('PPO No. 12345')
+PPO_LABEL_TOKENS = {'PPO', 'NO', 'NUM', 'NUMBER'}
+# Synthetic PPOs generated at import (scripts/import_dlc_to_pensioner_master.py)
+SYNTHETIC_PPO = re.compile(r'^DLC\d{6}$')
+
+
+def normalize_ppo(value):
+    """
+    Registry key of a PPO number
+
+    Upper-cases, drops leading 'PPO No.' style labels and strips the zero
+    padding of every digit run. The remaining letter and digit runs are joined
+    with '/', whatever separated them, so 'PPO No. 000123', 'ppo-123' and 123.0
+    all give '123' and 'CPAO-0123/2010' gives 'CPAO/123/2010', while '1/23',
+    '12/3' and '123' stay distinct.
+
+    Returns:
+        str: Normalized PPO, None for empty/NaN/all-zero values and synthetic DLC numbers
+    """
+    if value is None or value != value:  # None / NaN
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip().upper()
+    if text in BLANK_VALUES or SYNTHETIC_PPO.match(text):
+        return None
+    tokens = re.findall(r'[A-Z]+|[0-9]+', text)
+    while len(tokens) > 1 and tokens[0] in PPO_LABEL_TOKENS:
+        tokens.pop(0)
+    key = '/'.join(token.lstrip('0') or '0' if token.isdigit() else token for token in tokens)
+    return key if key.strip('0/') else None
+
+
+class BloomFilter:
+    """Bloom filter over strings using double hashing of one blake2b digest"""
+
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE, hashes=None, bits=None):
+        self.capacity = capacity
+        size = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.bits = bytearray(bits) if bits is not None else bytearray((size + 7) // 8)
+        self.size = len(self.bits) * 8
+        self.hashes = hashes or max(1, int(round(self.size / capacity * math.log(2))))
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class PPORegistry:
+    """Registry handle holding the Bloom filter for one connection"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        with conn:
+            for statement in REGISTRY_SCHEMA.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+        self._check_key_version()
+        self.keys = conn.execute("SELECT COUNT(*) FROM ppo_registry").fetchone()[0]
+        self.bloom = self._load_bloom()
+
+    def _check_key_version(self):
+        """Clear a registry whose keys were made by another normalize_ppo format"""
+        row = self.conn.execute("SELECT value FROM ppo_registry_meta WHERE name = 'key_version'").fetchone()
+        if row and int(row[0]) == PPO_KEY_VERSION:
+            return
+        with self.conn:
+            if row or self.conn.execute("SELECT 1 FROM ppo_registry LIMIT 1").fetchone():
+                print(f"⚠️  PPO registry keys are format v{row[0] if row else 1}, now v{PPO_KEY_VERSION}: "
+                      f"every source is registered again")
+                for table in ('ppo_registry', 'ppo_duplicates', 'ppo_registry_sources', 'ppo_registry_bloom'):
+                    self.conn.execute(f"DELETE FROM {table}")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO ppo_registry_meta (name, value) VALUES ('key_version', ?)",
+                (str(PPO_KEY_VERSION),)
+            )
+
+    def _load_bloom(self):
+        row = self.conn.execute("SELECT capacity, hashes, keys, bits FROM ppo_registry_bloom WHERE id = 1").fetchone()
+        if row and row[2] == self.keys and self.keys <= row[0]:
+            capacity, hashes, _, bits = row
+            return BloomFilter(capacity, hashes=hashes, bits=bits)
+        return self._rebuild_bloom()
+
+    def _rebuild_bloom(self):
+        """Size the filter for twice the current keys and fill it from the registry"""
+        bloom = BloomFilter(max(BLOOM_MIN_CAPACITY, 2 * self.keys))
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute("SELECT ppo_key FROM ppo_registry")
+        while True:
+            batch = cursor.fetchmany(SYNC_BATCH_SIZE)
+            if not batch:
+                break
+            for (key,) in batch:
+                bloom.add(key)
+        self.bloom = bloom
+        self._save_bloom()
+        return bloom
+
+    def _save_bloom(self):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO ppo_registry_bloom (id, capacity, hashes, keys, bits) VALUES (1, ?, ?, ?, ?)",
+                (self.bloom.capacity, self.bloom.hashes, self.keys, bytes(self.bloom.bits))
+            )
+
+    def might_contain(self, ppo):
+        """False when the PPO is certainly unregistered"""
+        key = normalize_ppo(ppo)
+        return key is not None and key in self.bloom
+
+    def lookup(self, ppo):
+        """
+        First registration of a PPO
+
+        Returns:
+            tuple: (source, source_rowid, first_seen), None when unregistered
+        """
+        key = normalize_ppo(ppo)
+        if key is None or key not in self.bloom:
+            return None
+        return self.conn.execute(
+            "SELECT source, source_rowid, first_seen FROM ppo_registry WHERE ppo_key = ?", (key,)
+        ).fetchone()
+
+    def _register(self, source, rows, now):
+        """Register (rowid, ppo) rows; returns the duplicate rows recorded"""
+        new = {}
+        maybe = []
+        for rowid, ppo in rows:
+            key = normalize_ppo(ppo)
+            if key is None:
+                continue
+            if key in new or key in self.bloom:
+                maybe.append((key, rowid))
+            else:
+                new[key] = rowid
+
+        # Only Bloom positives need the index; most of them are real duplicates
+        first = {}
+        keys = list({key for key, _ in maybe if key not in new})
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            first.update({
+                key: (first_source, first_rowid)
+                for key, first_source, first_rowid in self.conn.execute(
+                    f"SELECT ppo_key, source, source_rowid FROM ppo_registry "
+                    f"WHERE ppo_key IN ({', '.join('?' for _ in chunk)})", chunk
+                )
+            })
+        duplicates = []
+        for key, rowid in maybe:
+            if key in first:
+                first_source, first_rowid = first[key]
+            elif key in new:
+                first_source, first_rowid = source, new[key]
+            else:
+                # Bloom false positive
+                new[key] = rowid
+                continue
+            duplicates.append((key, source, rowid, first_source, first_rowid, int(first_source != source), now))
+
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO ppo_registry (ppo_key, source, source_rowid, first_seen) VALUES (?, ?, ?, ?)",
+            [(key, source, rowid, now) for key, rowid in new.items()]
+        )
+        self.conn.executemany(
+            "INSERT INTO ppo_duplicates (ppo_key, source, source_rowid, first_source, first_rowid, cross_source, seen_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", duplicates
+        )
+        for key in new:
+            self.bloom.add(key)
+        self.keys += len(new)
+        return duplicates
+
+    def _forget_source(self, source):
+        """
+        Drop a source whose rows were deleted or replaced; its keys leave the Bloom filter on rebuild
+
+        Sources holding duplicates of its PPOs are dropped too (their rows may now
+        be the first sighting) and are registered again on their next sync.
+        """
+        with self.conn:
+            forget = [source]
+            while forget:
+                table = forget.pop()
+                forget.extend(dependent for (dependent,) in self.conn.execute(
+                    "SELECT DISTINCT source FROM ppo_duplicates WHERE first_source = ? AND source != ?", (table, table)
+                ))
+                self.conn.execute("DELETE FROM ppo_registry WHERE source = ?", (table,))
+                self.conn.execute("DELETE FROM ppo_duplicates WHERE source = ? OR first_source = ?", (table, table))
+                self.conn.execute("DELETE FROM ppo_registry_sources WHERE source = ?", (table,))
+        self.keys = self.conn.execute("SELECT COUNT(*) FROM ppo_registry").fetchone()[0]
+        self._rebuild_bloom()
+
+    def sync(self, source, batch_size=SYNC_BATCH_SIZE):
+        """
+        Register the rows of a source added since its last sync
+
+        Args:
+            source (str): Source table (one of PPO_SOURCES)
+            batch_size (int): Rows per fetchmany batch / transaction
+
+        Returns:
+            dict: {'rows': rows checked, 'new': PPOs registered, 'duplicates', 'cross_source'}
+        """
+        column = PPO_SOURCES[source]
+        stats = {'rows': 0, 'new': 0, 'duplicates': 0, 'cross_source': 0}
+        if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (source,)).fetchone():
+            return stats
+
+        watermark = self.conn.execute(
+            "SELECT max_rowid, rows FROM ppo_registry_sources WHERE source = ?", (source,)
+        ).fetchone()
+        action, _, _ = detect_table_change(self.conn, source, watermark)
+        if action == 'unchanged':
+            return stats
+        if action == 'rebuild' and watermark:
+            self._forget_source(source)
+            watermark = None
+        low, rows = watermark if watermark else (0, 0)
+
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(f"SELECT rowid, {column} FROM {source} WHERE rowid > ? ORDER BY rowid", (low,))
+        now = datetime.now().isoformat(timespec='seconds')
+        keys_before = self.keys
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            with self.conn:
+                duplicates = self._register(source, batch, now)
+                low = batch[-1][0]
+                rows += len(batch)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO ppo_registry_sources (source, max_rowid, rows, synced_at) VALUES (?, ?, ?, ?)",
+                    (source, low, rows, now)
+                )
+            stats['rows'] += len(batch)
+            stats['duplicates'] += len(duplicates)
+            stats['cross_source'] += sum(duplicate[5] for duplicate in duplicates)
+        stats['new'] = self.keys - keys_before
+
+        if self.keys > self.bloom.capacity:
+            self._rebuild_bloom()
+        elif stats['new']:
+            self._save_bloom()
+        return stats
+
+    def sync_all(self):
+        return {source: self.sync(source) for source in PPO_SOURCES}
+
+    def rebuild(self):
+        with self.conn:
+            for table in ('ppo_registry', 'ppo_duplicates', 'ppo_registry_sources', 'ppo_registry_bloom'):
+                self.conn.execute(f"DELETE FROM {table}")
+        self.keys = 0
+        self._rebuild_bloom()
+        return self.sync_all()
+
+    def duplicate_summary(self):
+        """
+        Duplicate rows per (source, first source) pair
+
+        Returns:
+            list: [(source, first_source, rows, distinct PPOs)] largest first
+        """
+        return self.conn.execute("""
+            SELECT source, first_source, COUNT(*), COUNT(DISTINCT ppo_key)
+            FROM ppo_duplicates
+            GROUP BY source, first_source
+            ORDER BY COUNT(*) DESC
+        """).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the global PPO registry")
+    parser.add_argument("db_path", help="SQLite database file")
+    parser.add_argument("--rebuild", action="store_true", help="Drop the registry and register every source again")
+    parser.add_argument("--report", action="store_true", help="Only print the duplicate summary")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Database file not found: {args.db_path}")
+        return
+
+    conn = sqlite3.connect(args.db_path)
+    try:
+        registry = PPORegistry(conn)
+        if not args.report:
+            started = time.time()
+            results = registry.rebuild() if args.rebuild else registry.sync_all()
+            for source, stats in results.items():
+                if stats['rows']:
+                    print(f"✓ {source}: {stats['rows']:,} rows, {stats['new']:,} new PPOs, "
+                          f"{stats['duplicates']:,} duplicates ({stats['cross_source']:,} cross-source)")
+            print(f"📇 Registry: {registry.keys:,} PPOs ({time.time() - started:.1f}s)")
+
+        print(f"\n{'Source':<28} {'First seen in':<28} {'Rows':>12} {'PPOs':>12}")
+        print("-" * 84)
+        for source, first_source, rows, ppos in registry.duplicate_summary():
+            print(f"{source:<28} {first_source:<28} {rows:>12,} {ppos:>12,}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
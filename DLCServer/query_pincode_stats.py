@@ -8,6 +8,10 @@ import sqlite3
 import sys
 from datetime import datetime
 
+from pensioner_rollup import refresh_rollup
+
+ROLLUP_SOURCE = 'pensioner_data'
+
 class PincodeStatsQuery:
     def __init__(self, db_path='newdatabase.db'):
         self.db_path = db_path
@@ -19,6 +23,8 @@ class PincodeStatsQuery:
             self.conn = sqlite3.connect(self.db_path)
             self.conn.row_factory = sqlite3.Row
             print(f"✓ Connected to {self.db_path}")
+            # Summaries read the rollup cube (city is stored as its district)
+            refresh_rollup(self.conn, verbose=False)
             return True
         except Exception as e:
             print(f"✗ Error connecting to database: {e}")
@@ -64,19 +70,19 @@ class PincodeStatsQuery:
         query = """
             SELECT 
                 pincode,
-                COUNT(DISTINCT bank_name) as bank_count,
-                SUM(CAST(age_less_than_80 AS INTEGER)) as total_age_less_80,
-                SUM(CAST(age_more_than_80 AS INTEGER)) as total_age_more_80,
-                SUM(CAST(grand_total AS INTEGER)) as total_pensioners
-            FROM pensioner_data
-            WHERE pincode IS NOT NULL AND pincode != ''
+                COUNT(DISTINCT NULLIF(bank_name, '')) as bank_count,
+                SUM(CASE WHEN age_bucket = '<80' THEN pensioners ELSE 0 END) as total_age_less_80,
+                SUM(CASE WHEN age_bucket = '>80' THEN pensioners ELSE 0 END) as total_age_more_80,
+                SUM(pensioners) as total_pensioners
+            FROM pensioner_rollup
+            WHERE source_table = ? AND pincode != ''
             GROUP BY pincode
             ORDER BY total_pensioners DESC
             LIMIT 50
         """
         
         try:
-            cursor.execute(query)
+            cursor.execute(query, (ROLLUP_SOURCE,))
             results = cursor.fetchall()
             
             print(f"\n🏆 Top 50 Pincodes by Pensioner Count:\n")
@@ -91,14 +97,14 @@ class PincodeStatsQuery:
             # Overall statistics
             cursor.execute("""
                 SELECT 
-                    COUNT(DISTINCT pincode) as unique_pincodes,
-                    COUNT(DISTINCT bank_name) as unique_banks,
-                    SUM(CAST(age_less_than_80 AS INTEGER)) as total_age_less_80,
-                    SUM(CAST(age_more_than_80 AS INTEGER)) as total_age_more_80,
-                    SUM(CAST(grand_total AS INTEGER)) as total_pensioners
-                FROM pensioner_data
-                WHERE pincode IS NOT NULL
-            """)
+                    COUNT(DISTINCT NULLIF(pincode, '')) as unique_pincodes,
+                    COUNT(DISTINCT NULLIF(bank_name, '')) as unique_banks,
+                    COALESCE(SUM(CASE WHEN age_bucket = '<80' THEN pensioners ELSE 0 END), 0) as total_age_less_80,
+                    COALESCE(SUM(CASE WHEN age_bucket = '>80' THEN pensioners ELSE 0 END), 0) as total_age_more_80,
+                    COALESCE(SUM(pensioners), 0) as total_pensioners
+                FROM pensioner_rollup
+                WHERE source_table = ? AND pincode != ''
+            """, (ROLLUP_SOURCE,))
             
             stats = cursor.fetchone()
             
@@ -183,19 +189,19 @@ class PincodeStatsQuery:
             SELECT 
                 pincode,
                 state,
-                city,
-                SUM(CAST(age_less_than_80 AS INTEGER)) as age_less_80,
-                SUM(CAST(age_more_than_80 AS INTEGER)) as age_more_80,
-                SUM(CAST(grand_total AS INTEGER)) as total
-            FROM pensioner_data
-            WHERE bank_name LIKE ?
-            GROUP BY pincode, state, city
+                district as city,
+                SUM(CASE WHEN age_bucket = '<80' THEN pensioners ELSE 0 END) as age_less_80,
+                SUM(CASE WHEN age_bucket = '>80' THEN pensioners ELSE 0 END) as age_more_80,
+                SUM(pensioners) as total
+            FROM pensioner_rollup
+            WHERE source_table = ? AND bank_name LIKE ?
+            GROUP BY pincode, state, district
             ORDER BY total DESC
             LIMIT 50
         """
         
         try:
-            cursor.execute(query, (f'%{bank_name}%',))
+            cursor.execute(query, (ROLLUP_SOURCE, f'%{bank_name}%'))
             results = cursor.fetchall()
             
             if not results:
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Pensioner Record Linkage
+Maps every pensioner-level row of every source onto one pensioner identity,
+so deduplicated all-India counts are a COUNT(DISTINCT identity_id).
+
+    pensioner_linkage (database, source, source_rowid, ppo_key, identity_id)
+
+Steps:
+1. Every row gets a record id and up to two blocking keys:
+   'P:<normalized PPO>' and 'Y:<year of birth>:<pincode>'. PPOs are
+   normalized with ppo_registry.normalize_ppo (labels and zero padding
+   removed, separators unified to '/'; synthetic DLC numbers dropped).
+2. Blocks are hash-partitioned (crc32 of the key) into a staging table, and
+   the partitions are compared in parallel worker processes:
+   - rows sharing a normalized PPO are linked when their year of birth and
+     pincode agree (a value missing on one side does not disagree); blocks
+     larger than --max-ppo-block are placeholder PPOs and are skipped;
+   - within a year-of-birth + pincode block, distinct PPOs are linked when
+     they differ only by a non-digit prefix ('SBI12345' / '12345') or their
+     digits agree ('CPAO12345' / 'DOT12345'), which catches bank prefixes the
+     normalization cannot know. '112345' and '12345' are different PPOs.
+3. The links are merged with union-find; the smallest record id of each
+   component is the identity.
+
+Rows without a usable PPO stay identities of their own. Branch/PSA summary
+tables (one row per branch, not per pensioner) are not linked.
+
+Usage:
+    python record_linkage.py --db database.db --db ../DLC_Database.db
+    python record_linkage.py --db database.db --partitions 32 --workers 8
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import time
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from pensioner_facts import FACT_SOURCES
+from ppo_registry import normalize_ppo
+
+LINKAGE_PARTITIONS = 16
+LINKAGE_BATCH_SIZE = 50000
+MAX_PPO_BLOCK = 20
+MIN_SUFFIX_LENGTH = 5
+
+# Per-pensioner sources -> {'ppo_number', 'birth_year', 'age', 'pincode'} source column (None when absent)
+LINKAGE_SOURCES = {
+    table: {
+        field: next((column for column, canonical in mapping.items() if canonical == field), None)
+        for field in ('ppo_number', 'birth_year', 'age', 'pincode')
+    }
+    for table, mapping in FACT_SOURCES.items()
+    if 'pensioners' not in mapping.values()
+}
+
+
+def pincode_key(value):
+    """6-digit pincode text, None when the value is not a pincode"""
+    if value is None or value != value:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    match = re.search(r'\b([1-9]\d{5})\b', str(value))
+    return match.group(1) if match else None
+
+
+def birth_year_key(birth_year, age, current_year):
+    for value, from_age in ((birth_year, False), (age, True)):
+        try:
+            year = int(float(value))
+        except (TypeError, ValueError):
+            continue
+        year = current_year - year if from_age else year
+        if 1900 <= year <= current_year:
+            return year
+    return None
+
+
+def partition_of(block_key, partitions):
+    return zlib.crc32(block_key.encode('utf-8')) % partitions
+
+
+def _stage_records(conn, databases, partitions, batch_size):
+    """Load every source row into linkage_records / linkage_blocks; returns the record count"""
+    conn.executescript("""
+        DROP TABLE IF EXISTS linkage_records;
+        DROP TABLE IF EXISTS linkage_blocks;
+        CREATE TABLE linkage_records (
+            rid INTEGER PRIMARY KEY,
+            database TEXT NOT NULL,
+            source TEXT NOT NULL,
+            source_rowid INTEGER NOT NULL,
+            ppo_key TEXT
+        );
+        CREATE TABLE linkage_blocks (
+            part INTEGER NOT NULL,
+            block_key TEXT NOT NULL,
+            rid INTEGER NOT NULL,
+            ppo_key TEXT,
+            birth_year INTEGER,
+            pincode TEXT
+        );
+    """)
+    current_year = datetime.now().year
+    rid = 0
+    for schema, database in databases:
+        tables = {row[0] for row in conn.execute(
+            f"SELECT name FROM {schema}.sqlite_master WHERE type IN ('table', 'view')"
+        )}
+        for source, columns in LINKAGE_SOURCES.items():
+            if source not in tables:
+                continue
+            available = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({source})")}
+            select_list = ', '.join(columns[field] if columns[field] in available else 'NULL'
+                                    for field in ('ppo_number', 'birth_year', 'age', 'pincode'))
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(f"SELECT rowid, {select_list} FROM {schema}.{source}")
+            started, staged = time.time(), 0
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                records, blocks = [], []
+                for rowid, ppo, birth_year, age, pincode in batch:
+                    rid += 1
+                    ppo_key = normalize_ppo(ppo)
+                    records.append((rid, database, source, rowid, ppo_key))
+                    year, pin = birth_year_key(birth_year, age, current_year), pincode_key(pincode)
+                    if ppo_key:
+                        block_key = f"P:{ppo_key}"
+                        blocks.append((partition_of(block_key, partitions), block_key, rid, ppo_key, year, pin))
+                    if year and pin:
+                        block_key = f"Y:{year}:{pin}"
+                        blocks.append((partition_of(block_key, partitions), block_key, rid, ppo_key, year, pin))
+                with conn:
+                    conn.executemany("INSERT INTO linkage_records VALUES (?, ?, ?, ?, ?)", records)
+                    conn.executemany("INSERT INTO linkage_blocks VALUES (?, ?, ?, ?, ?, ?)", blocks)
+                staged += len(batch)
+            if staged:
+                print(f"✓ Staged {database}:{source}: {staged:,} rows in {time.time() - started:.1f}s")
+    conn.execute("CREATE INDEX idx_linkage_blocks_part ON linkage_blocks(part, block_key)")
+    conn.commit()
+    return rid
+
+
+def ppo_variant_edges(representatives):
+    """
+    Links between different normalized PPOs of one YOB+pincode block
+
+    Two PPOs match when one is the other behind a prefix without digits
+    ('SBI12345' / '12345') or their digits agree ('CPAO12345' / 'DOT12345').
+    A digit prefix is part of the number, so '112345' and '12345' never
+    match. Both checks are hash lookups, so a block costs linear time instead
+    of all pairs.
+
+    Args:
+        representatives (dict): normalized PPO -> record id
+
+    Returns:
+        list: [(rid, rid)]
+    """
+    edges = []
+    by_digits = {}
+    for key, rid in representatives.items():
+        for start in range(1, len(key) - MIN_SUFFIX_LENGTH + 1):
+            suffix_rid = representatives.get(key[start:])
+            if suffix_rid is not None and not any(char.isdigit() for char in key[:start]):
+                edges.append((suffix_rid, rid))
+        runs = re.findall(r'[0-9]+', key)
+        digits = '/'.join(runs)
+        if sum(len(run) for run in runs) >= MIN_SUFFIX_LENGTH:
+            by_digits.setdefault(digits, []).append(rid)
+    for rids in by_digits.values():
+        edges.extend((rids[0], rid) for rid in rids[1:])
+    return edges
+
+
+def ppo_block_edges(members):
+    """
+    Links between the rows of one normalized-PPO block
+
+    Rows are grouped by year of birth and pincode; a value missing on one side
+    does not disagree. Complete rows are placed first, and a partial row joins
+    a group only when exactly one group fits it, so a row without a pincode
+    cannot bridge two pensioners who happen to share a PPO.
+
+    Args:
+        members (list): [(rid, ppo_key, birth_year, pincode)]
+
+    Returns:
+        list: [(rid, rid)]
+    """
+    edges = []
+    groups = []  # [first rid, birth year, pincode]
+    for rid, _, year, pin in sorted(members, key=lambda m: ((m[2] is None) + (m[3] is None), m[0])):
+        fits = [group for group in groups
+                if year in (None, group[1]) or group[1] is None
+                if pin in (None, group[2]) or group[2] is None]
+        if not fits:
+            groups.append([rid, year, pin])
+        elif len(fits) == 1:
+            group = fits[0]
+            edges.append((group[0], rid))
+            group[1] = year if group[1] is None else group[1]
+            group[2] = pin if group[2] is None else group[2]
+    return edges
+
+
+def _link_block(block_key, members, max_ppo_block):
+    """Edges (rid, rid) for one block of [(rid, ppo_key, birth_year, pincode)]; None when the block is skipped"""
+    if block_key.startswith('P:'):
+        if len(members) > max_ppo_block:
+            return None
+        return ppo_block_edges(members)
+
+    # YOB + pincode block: one representative per distinct PPO
+    representatives = {}
+    for rid, ppo_key, _, _ in members:
+        if ppo_key:
+            representatives.setdefault(ppo_key, rid)
+    return ppo_variant_edges(representatives) if len(representatives) > 1 else []
+
+
+def link_partition(db_path, part, max_ppo_block=MAX_PPO_BLOCK):
+    """
+    Compare the candidates of one hash partition (runs in a worker process)
+
+    Returns:
+        tuple: (edges [(rid, rid)], skipped block count)
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        edges, skipped = [], 0
+        block_key, members = None, []
+        rows = conn.execute(
+            "SELECT block_key, rid, ppo_key, birth_year, pincode FROM linkage_blocks WHERE part = ? ORDER BY block_key",
+            (part,)
+        )
+        for key, rid, ppo_key, year, pin in rows:
+            if key != block_key:
+                if len(members) > 1:
+                    linked = _link_block(block_key, members, max_ppo_block)
+                    if linked is None:
+                        skipped += 1
+                    else:
+                        edges.extend(linked)
+                block_key, members = key, []
+            members.append((rid, ppo_key, year, pin))
+        if len(members) > 1:
+            linked = _link_block(block_key, members, max_ppo_block)
+            if linked is None:
+                skipped += 1
+            else:
+                edges.extend(linked)
+        return edges, skipped
+    finally:
+        conn.close()
+
+
+def _find(parent, rid):
+    root = rid
+    while parent[root] != root:
+        root = parent[root]
+    while parent[rid] != root:
+        parent[rid], rid = root, parent[rid]
+    return root
+
+
+def link_records(db_paths, partitions=LINKAGE_PARTITIONS, workers=None,
+                 max_ppo_block=MAX_PPO_BLOCK, batch_size=LINKAGE_BATCH_SIZE):
+    """
+    Build pensioner_linkage in the first database from the sources of all databases
+
+    Args:
+        db_paths (list): SQLite databases; the first one holds the staging and linkage tables
+        partitions (int): Hash partitions of the blocking keys
+        workers (int): Worker processes (default: CPU count)
+
+    Returns:
+        dict: {'records', 'identities', 'linked_records', 'skipped_blocks', 'seconds'}
+    """
+    started = time.time()
+    primary = db_paths[0]
+    conn = sqlite3.connect(primary)
+    try:
+        databases = [('main', os.path.basename(primary))]
+        for index, db_path in enumerate(db_paths[1:], 1):
+            conn.execute(f"ATTACH DATABASE ? AS src{index}", (db_path,))
+            databases.append((f"src{index}", os.path.basename(db_path)))
+
+        records = _stage_records(conn, databases, partitions, batch_size)
+        print(f"🔗 Comparing {partitions} partitions of {records:,} records...")
+
+        parent = array('q', range(records + 1))
+        skipped = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            jobs = [executor.submit(link_partition, primary, part, max_ppo_block)
+                    for part in range(partitions)]
+            for job in jobs:
+                edges, skipped_blocks = job.result()
+                skipped += skipped_blocks
+                for a, b in edges:
+                    root_a, root_b = _find(parent, a), _find(parent, b)
+                    if root_a != root_b:
+                        # The smaller record id stays the root, so identities are stable for a given staging order
+                        parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS pensioner_linkage")
+            conn.execute("""
+                CREATE TABLE pensioner_linkage (
+                    database TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    source_rowid INTEGER NOT NULL,
+                    ppo_key TEXT,
+                    identity_id INTEGER NOT NULL,
+                    PRIMARY KEY (database, source, source_rowid)
+                ) WITHOUT ROWID
+            """)
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute("SELECT rid, database, source, source_rowid, ppo_key FROM linkage_records ORDER BY rid")
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                conn.executemany(
+                    "INSERT INTO pensioner_linkage VALUES (?, ?, ?, ?, ?)",
+                    [(database, source, rowid, ppo_key, _find(parent, rid))
+                     for rid, database, source, rowid, ppo_key in batch]
+                )
+            conn.execute("CREATE INDEX idx_pensioner_linkage_identity ON pensioner_linkage(identity_id)")
+            conn.execute("DROP TABLE linkage_blocks")
+            conn.execute("DROP TABLE linkage_records")
+
+        identities = conn.execute("SELECT COUNT(DISTINCT identity_id) FROM pensioner_linkage").fetchone()[0]
+        linked = conn.execute("""
+            SELECT COUNT(*) FROM pensioner_linkage
+            WHERE identity_id IN (SELECT identity_id FROM pensioner_linkage GROUP BY identity_id HAVING COUNT(*) > 1)
+        """).fetchone()[0]
+        return {
+            'records': records,
+            'identities': identities,
+            'linked_records': linked,
+            'skipped_blocks': skipped,
+            'seconds': round(time.time() - started, 1),
+        }
+    finally:
+        conn.close()
+
+
+def linkage_summary(conn):
+    """
+    Distinct pensioners per source and across all sources
+
+    Returns:
+        list: [(source, records, identities)] plus ('ALL', records, identities) last
+    """
+    rows = conn.execute("""
+        SELECT source, COUNT(*), COUNT(DISTINCT identity_id)
+        FROM pensioner_linkage GROUP BY source ORDER BY COUNT(*) DESC
+    """).fetchall()
+    rows.append(('ALL',) + conn.execute(
+        "SELECT COUNT(*), COUNT(DISTINCT identity_id) FROM pensioner_linkage"
+    ).fetchone())
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Link pensioner records across sources into single identities")
+    parser.add_argument("--db", action="append", dest="db_paths", required=True,
+                        help="SQLite database (repeatable; the first one receives pensioner_linkage)")
+    parser.add_argument("--partitions", type=int, default=LINKAGE_PARTITIONS)
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-ppo-block", type=int, default=MAX_PPO_BLOCK,
+                        help="Skip PPO blocks larger than this (placeholder PPOs)")
+    args = parser.parse_args()
+
+    missing = [path for path in args.db_paths if not os.path.exists(path)]
+    if missing:
+        print(f"❌ Database file not found: {', '.join(missing)}")
+        return
+
+    result = link_records(args.db_paths, args.partitions, args.workers, args.max_ppo_block)
+    print(f"\n✅ Linked {result['records']:,} records into {result['identities']:,} pensioners "
+          f"({result['linked_records']:,} records share an identity, {result['skipped_blocks']:,} blocks skipped) "
+          f"in {result['seconds']:.1f}s")
+
+    conn = sqlite3.connect(args.db_paths[0])
+    try:
+        print(f"\n{'Source':<28} {'Records':>14} {'Pensioners':>14}")
+        print("-" * 58)
+        for source, records, identities in linkage_summary(conn):
+            print(f"{source:<28} {records:>14,} {identities:>14,}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
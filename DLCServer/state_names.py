@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+State Name Normalization
+Maps the state spellings found in bank and DLC exports ('GUJRAT', 'NCT OF DELHI',
+'J&K', 'Orissa', ...) onto one upper-case canonical name per state/UT.
+
+Lookups ignore case, spacing and punctuation ('&' counts as 'AND'), so
+'Jammu & Kashmir', 'JAMMU AND KASHMIR' and 'JAMMUANDKASHMIR' all match.
+Unknown names are returned upper-cased with whitespace collapsed.
+
+Usage:
+    from state_names import normalize_state, normalize_state_series
+    normalize_state('Gujrat')                  # 'GUJARAT'
+    df['state'] = normalize_state_series(df['state'])
+"""
+
+import re
+
+CANONICAL_STATES = [
+    'ANDAMAN AND NICOBAR ISLANDS', 'ANDHRA PRADESH', 'ARUNACHAL PRADESH', 'ASSAM', 'BIHAR',
+    'CHANDIGARH', 'CHHATTISGARH', 'DADRA AND NAGAR HAVELI AND DAMAN AND DIU', 'DELHI', 'GOA',
+    'GUJARAT', 'HARYANA', 'HIMACHAL PRADESH', 'JAMMU AND KASHMIR', 'JHARKHAND', 'KARNATAKA',
+    'KERALA', 'LADAKH', 'LAKSHADWEEP', 'MADHYA PRADESH', 'MAHARASHTRA', 'MANIPUR', 'MEGHALAYA',
+    'MIZORAM', 'NAGALAND', 'ODISHA', 'PUDUCHERRY', 'PUNJAB', 'RAJASTHAN', 'SIKKIM', 'TAMIL NADU',
+    'TELANGANA', 'TRIPURA', 'UTTAR PRADESH', 'UTTARAKHAND', 'WEST BENGAL',
+]
+
+# Known variant spellings -> canonical name
+STATE_ALIASES = {
+    'ANDAMAN AND NICOBAR': 'ANDAMAN AND NICOBAR ISLANDS',
+    'ANDAMAN AND NICOBAR ISLAND': 'ANDAMAN AND NICOBAR ISLANDS',
+    'ANDAMAN NICOBAR': 'ANDAMAN AND NICOBAR ISLANDS',
+    'A AND N ISLANDS': 'ANDAMAN AND NICOBAR ISLANDS',
+    'ANDRA PRADESH': 'ANDHRA PRADESH',
+    'AP': 'ANDHRA PRADESH',
+    'CHATTISGARH': 'CHHATTISGARH',
+    'CHHATISGARH': 'CHHATTISGARH',
+    'CHATTISHGARH': 'CHHATTISGARH',
+    'DADRA AND NAGAR HAVELI': 'DADRA AND NAGAR HAVELI AND DAMAN AND DIU',
+    'DAMAN AND DIU': 'DADRA AND NAGAR HAVELI AND DAMAN AND DIU',
+    'DNH AND DD': 'DADRA AND NAGAR HAVELI AND DAMAN AND DIU',
+    'NCT OF DELHI': 'DELHI',
+    'NEW DELHI': 'DELHI',
+    'DELHI NCT': 'DELHI',
+    'GUJRAT': 'GUJARAT',
+    'HARIYANA': 'HARYANA',
+    'HIMACHAL': 'HIMACHAL PRADESH',
+    'HP': 'HIMACHAL PRADESH',
+    'J AND K': 'JAMMU AND KASHMIR',
+    'JK': 'JAMMU AND KASHMIR',
+    'JAMMU KASHMIR': 'JAMMU AND KASHMIR',
+    'JAMMU': 'JAMMU AND KASHMIR',
+    'JHARKAND': 'JHARKHAND',
+    'KARNATKA': 'KARNATAKA',
+    'MP': 'MADHYA PRADESH',
+    'MAHARASTRA': 'MAHARASHTRA',
+    'ORISSA': 'ODISHA',
+    'PONDICHERRY': 'PUDUCHERRY',
+    'PONDICHERY': 'PUDUCHERRY',
+    'RAJSTHAN': 'RAJASTHAN',
+    'TAMILNADU': 'TAMIL NADU',
+    'TN': 'TAMIL NADU',
+    'TELENGANA': 'TELANGANA',
+    'TELANGANA STATE': 'TELANGANA',
+    'UP': 'UTTAR PRADESH',
+    'UTTARANCHAL': 'UTTARAKHAND',
+    'UTTRAKHAND': 'UTTARAKHAND',
+    'UK': 'UTTARAKHAND',
+    'WB': 'WEST BENGAL',
+    'WESTBENGAL': 'WEST BENGAL',
+}
+
+
+def state_key(name):
+    """Comparison key: upper case, '&' as 'AND', only letters and digits"""
+    return re.sub(r'[^A-Z0-9]', '', str(name).upper().replace('&', 'AND'))
+
+
+STATE_LOOKUP = {state_key(state): state for state in CANONICAL_STATES}
+STATE_LOOKUP.update({state_key(alias): state for alias, state in STATE_ALIASES.items()})
+
+
+def canonical_state(name):
+    """Canonical name for a known spelling, None when the name is not recognised"""
+    if name is None or name != name:  # None / NaN
+        return None
+    return STATE_LOOKUP.get(state_key(name))
+
+
+def normalize_state(name):
+    """
+    Canonical state name for any spelling
+
+    Returns:
+        str: Canonical upper-case name, the cleaned input when unknown, '' for empty/NaN
+    """
+    if name is None or name != name:  # None / NaN
+        return ''
+    text = ' '.join(str(name).split()).upper()
+    if not text:
+        return ''
+    return canonical_state(text) or text
+
+
+def normalize_state_series(series):
+    """Vectorized normalize_state for a pandas Series (each distinct value is looked up once)"""
+    mapping = {value: normalize_state(value) for value in series.dropna().unique()}
+    return series.map(mapping).fillna('')
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+One-Pass Table Profiler
+Profiles every column of a SQLite table in a single sequential scan, instead
+of one GROUP BY / COUNT(*) query per column.
+
+Per column:
+- null / blank counts and rates ('', whitespace, 'NA', 'null', 'nan')
+- distinct estimate (HyperLogLog, ~1.6% standard error)
+- top-k values (Space-Saving; exact while the column has fewer distinct
+  values than the summary capacity, otherwise counts carry an error bound)
+- numeric min/max and text min/max
+- pattern classes (6-digit pincode, placeholder pincode, integer, decimal,
+  date, alpha, alphanumeric, other)
+
+Rows are read with fetchmany and counted per batch with collections.Counter,
+so sketches and pattern checks run once per distinct value in a batch, not
+once per cell.
+
+Usage:
+    python table_profiler.py database.db
+    python table_profiler.py ../DLC_Database.db --table pensioner_bank_master --output profile.json
+"""
+
+import argparse
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import re
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime
+
+PROFILE_BATCH_SIZE = 50000
+TOP_K = 10
+HLL_PRECISION = 12
+
+BLANK_VALUES = {'', 'NA', 'N/A', 'NULL', 'NONE', 'NAN', '-'}
+PLACEHOLDER_PINCODES = {'111111', '999999', '000000', '888888', '777777'}
+
+PATTERNS = [
+    ('pincode_placeholder', re.compile(r'^(\d)\1{5}$')),
+    ('pincode_6_digit', re.compile(r'^[1-9]\d{5}$')),
+    ('integer', re.compile(r'^[+-]?\d+$')),
+    ('decimal', re.compile(r'^[+-]?(\d+\.\d*|\.\d+)$')),
+    ('date', re.compile(r'^(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4})([ T][\d:.]+)?$')),
+    ('alpha', re.compile(r"^[A-Za-z][A-Za-z .,&()'/-]*$")),
+    ('alphanumeric', re.compile(r'^[A-Za-z0-9][A-Za-z0-9 .,&()\'/_#-]*$')),
+]
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with 2**precision one-byte registers"""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+        self.alpha = 0.7213 / (1 + 1.079 / self.m)
+
+    def add(self, value):
+        h = int.from_bytes(hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big')
+        index = h & (self.m - 1)
+        rank = (64 - self.precision) - (h >> self.precision).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self):
+        harmonic = sum(2.0 ** -register for register in self.registers)
+        estimate = self.alpha * self.m * self.m / harmonic
+        zeros = self.registers.count(0)
+        # Small-range correction (linear counting)
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters summary over weighted updates
+
+    Keeps at most `capacity` counters; an evicted value's count is inherited
+    by the newcomer and recorded as its error, so count - error is a lower
+    bound and count an upper bound of the true frequency.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+
+    def update(self, counter):
+        """Merge a {value: count} batch"""
+        newcomers = []
+        for value, count in counter.items():
+            if value in self.counts:
+                self.counts[value] += count
+            elif len(self.counts) < self.capacity:
+                self.counts[value] = count
+                self.errors[value] = 0
+            else:
+                newcomers.append((count, value))
+        if not newcomers:
+            return
+
+        # Values of mixed types are not orderable, so the heap ties on an insertion number
+        order = itertools.count()
+        heap = [(count, next(order), value) for value, count in self.counts.items()]
+        heapq.heapify(heap)
+        for count, value in sorted(newcomers, key=lambda item: item[0], reverse=True):
+            floor, _, evicted = heapq.heappop(heap)
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[value] = floor + count
+            self.errors[value] = floor
+            heapq.heappush(heap, (floor + count, next(order), value))
+
+    def exact(self):
+        """True while no value was ever evicted (all counts are exact)"""
+        return not any(self.errors.values())
+
+    def top(self, k):
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [{'value': value, 'count': count, 'error': self.errors[value]} for value, count in ranked]
+
+
+def classify_value(value):
+    """Pattern class of a non-null, non-blank value"""
+    if isinstance(value, bytes):
+        return 'binary'
+    if isinstance(value, float):
+        if not value.is_integer():
+            return 'decimal'
+        value = int(value)
+    text = str(value).strip()
+    for name, pattern in PATTERNS:
+        if pattern.match(text):
+            if name == 'pincode_placeholder' and text not in PLACEHOLDER_PINCODES:
+                continue
+            return name
+    return 'other'
+
+
+class ColumnProfile:
+    def __init__(self, name, top_k=TOP_K, capacity=None):
+        self.name = name
+        self.top_k = top_k
+        self.nulls = 0
+        self.blanks = 0
+        self.hll = HyperLogLog()
+        self.heavy_hitters = SpaceSaving(capacity or max(1000, top_k * 100))
+        self.patterns = Counter()
+        self.numeric_min = self.numeric_max = None
+        self.text_min = self.text_max = None
+
+    def update(self, counter):
+        """Fold one batch of {value: count} for this column"""
+        self.nulls += counter.pop(None, 0)
+        present = Counter()
+        for value, count in counter.items():
+            if isinstance(value, str) and value.strip().upper() in BLANK_VALUES:
+                self.blanks += count
+                continue
+            present[value] = count
+            self.hll.add(value)
+            pattern = classify_value(value)
+            self.patterns[pattern] += count
+
+            if isinstance(value, (int, float)):
+                number = value
+            elif pattern in ('integer', 'decimal', 'pincode_6_digit', 'pincode_placeholder'):
+                number = float(value)
+            else:
+                number = None
+            if number is not None:
+                self.numeric_min = number if self.numeric_min is None else min(self.numeric_min, number)
+                self.numeric_max = number if self.numeric_max is None else max(self.numeric_max, number)
+            elif isinstance(value, str):
+                self.text_min = value if self.text_min is None else min(self.text_min, value)
+                self.text_max = value if self.text_max is None else max(self.text_max, value)
+        self.heavy_hitters.update(present)
+
+    def to_dict(self, rows):
+        present = rows - self.nulls - self.blanks
+        return {
+            'nulls': self.nulls,
+            'blanks': self.blanks,
+            'null_rate': round(self.nulls / rows, 6) if rows else 0.0,
+            'empty_rate': round((self.nulls + self.blanks) / rows, 6) if rows else 0.0,
+            'distinct_estimate': min(self.hll.estimate(), present),
+            'top_values': self.heavy_hitters.top(self.top_k),
+            'top_values_exact': self.heavy_hitters.exact(),
+            'min': self.numeric_min,
+            'max': self.numeric_max,
+            'min_text': self.text_min,
+            'max_text': self.text_max,
+            'patterns': dict(self.patterns.most_common()),
+        }
+
+
+def profile_table(conn, table, columns=None, top_k=TOP_K, capacity=None, batch_size=PROFILE_BATCH_SIZE):
+    """
+    Profile a table (or some of its columns) in one scan
+
+    Args:
+        conn: sqlite3 connection
+        table (str): Table name
+        columns (list): Columns to profile (default: all)
+        top_k (int): Top values reported per column
+        capacity (int): Space-Saving counters per column (default max(1000, 100 * top_k))
+        batch_size (int): Rows per fetchmany batch
+
+    Returns:
+        dict: {'rows', 'scan_seconds', 'columns': {column: profile}}
+    """
+    if columns is None:
+        columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+    started = time.time()
+    profiles = [ColumnProfile(column, top_k, capacity) for column in columns]
+
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    select_list = ', '.join(f'"{column}"' for column in columns) or '1'
+    cursor.execute(f'SELECT {select_list} FROM "{table}"')
+    rows = 0
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        rows += len(batch)
+        for profile, values in zip(profiles, zip(*batch)):
+            profile.update(Counter(values))
+
+    return {
+        'rows': rows,
+        'scan_seconds': round(time.time() - started, 3),
+        'columns': {profile.name: profile.to_dict(rows) for profile in profiles},
+    }
+
+
+def profile_database(db_path, tables=None, top_k=TOP_K, batch_size=PROFILE_BATCH_SIZE, verbose=True):
+    """
+    Profile every table of a SQLite database, one scan per table
+
+    Returns:
+        dict: {'database', 'generated_at', 'tables': {table: profile}}
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        if tables is None:
+            tables = [row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )]
+        report = {
+            'database': db_path,
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'tables': {},
+        }
+        for table in tables:
+            try:
+                report['tables'][table] = profile_table(conn, table, top_k=top_k, batch_size=batch_size)
+            except sqlite3.Error as e:
+                print(f"❌ Error profiling {table}: {e}")
+                report['tables'][table] = {'error': str(e)}
+                continue
+            if verbose:
+                profile = report['tables'][table]
+                print(f"✓ {table}: {profile['rows']:,} rows, {len(profile['columns'])} columns "
+                      f"in {profile['scan_seconds']:.1f}s")
+        return report
+    finally:
+        conn.close()
+
+
+def save_profile(report, output_file):
+    with open(output_file, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"💾 Profile saved to {output_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="One-pass column profiler for SQLite tables")
+    parser.add_argument("db_path", help="SQLite database file")
+    parser.add_argument("--table", action="append", dest="tables", help="Table to profile (repeatable, default all)")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--batch-size", type=int, default=PROFILE_BATCH_SIZE)
+    parser.add_argument("--output", help="JSON output file (default data_profile_<timestamp>.json)")
+    args = parser.parse_args()
+
+    report = profile_database(args.db_path, args.tables, top_k=args.top_k, batch_size=args.batch_size)
+    output_file = args.output or f"data_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    save_profile(report, output_file)
+
+
+if __name__ == "__main__":
+    main()
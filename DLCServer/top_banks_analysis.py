@@ -6,74 +6,169 @@ Top Banks Analysis for Choropleth State Verification
 import sqlite3
 import pandas as pd
 import json
+import os
+from datetime import datetime
 
-def get_top_banks_by_state():
-    """Get top banks by state with pensioner counts"""
-    conn = sqlite3.connect('database.db')
-    
-    # Query to get top banks by state from bank_pensioner_data
-    query = """
+from pensioner_lake import fresh_lake_connection
+from pensioner_rollup import refresh_rollup, rollup_generation
+
+TOP_BANKS_CACHE = 'top_banks_data.json'
+TOP_BANKS_PER_STATE = 5
+TOP_BANKS_OVERALL = 10
+
+# State x bank totals from the rollup cube of bank_pensioner_data
+# (branch rows with grand_total > 0; 'N/A' holds the unknown-age remainder)
+BANK_TOTALS_CTE = """
+WITH bank_totals AS (
     SELECT 
-        bank_state,
+        state as bank_state,
         bank_name,
-        COUNT(*) as branch_count,
-        SUM(grand_total) as total_pensioners,
-        SUM(age_less_than_80) as pensioners_under_80,
-        SUM(age_more_than_80) as pensioners_over_80,
-        SUM(age_not_available) as pensioners_age_unknown
-    FROM bank_pensioner_data 
-    WHERE bank_state IS NOT NULL 
-        AND bank_name IS NOT NULL
-        AND grand_total > 0
-    GROUP BY bank_state, bank_name
-    ORDER BY bank_state, total_pensioners DESC
+        SUM(records) as branch_count,
+        SUM(pensioners) as total_pensioners,
+        SUM(CASE WHEN age_bucket = '<80' THEN pensioners ELSE 0 END) as pensioners_under_80,
+        SUM(CASE WHEN age_bucket = '>80' THEN pensioners ELSE 0 END) as pensioners_over_80,
+        SUM(CASE WHEN age_bucket = 'N/A' THEN pensioners ELSE 0 END) as pensioners_age_unknown
+    FROM pensioner_rollup 
+    WHERE source_table = 'bank_pensioner_data'
+        AND state != ''
+        AND bank_name != ''
+    GROUP BY state, bank_name
+)
+"""
+
+def _fetch_dicts(conn, query, params=()):
+    cursor = conn.execute(query, params)
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def get_top_banks_by_state(conn=None, top_n=TOP_BANKS_PER_STATE):
     """
+    Get top banks by state with pensioner counts
     
-    df = pd.read_sql_query(query, conn)
+    The top-N per state is ranked in SQL with ROW_NUMBER() over the rollup
+    cube, so only the rows that end up in the result leave SQLite.
     
-    # Get top 10 banks overall
-    top_banks_overall = df.groupby('bank_name').agg({
-        'total_pensioners': 'sum',
-        'branch_count': 'sum'
-    }).sort_values('total_pensioners', ascending=False).head(10)
-    
-    # Get top banks by state (top 5 per state)
-    top_banks_by_state = df.groupby('bank_state').apply(
-        lambda x: x.nlargest(5, 'total_pensioners')
-    ).reset_index(drop=True)
+    Args:
+        conn: Open connection to database.db (default: open and close one)
+        top_n (int): Banks kept per state
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect('database.db')
+        refresh_rollup(conn, verbose=False)
+    
+    top_banks_by_state = _fetch_dicts(conn, BANK_TOTALS_CTE + """
+    SELECT bank_state, bank_name, branch_count, total_pensioners,
+           pensioners_under_80, pensioners_over_80, pensioners_age_unknown
+    FROM (
+        SELECT *, ROW_NUMBER() OVER (
+            PARTITION BY bank_state ORDER BY total_pensioners DESC, bank_name
+        ) as state_rank
+        FROM bank_totals
+    )
+    WHERE state_rank <= ?
+    ORDER BY bank_state, state_rank
+    """, (top_n,))
+    
+    top_banks_overall = _fetch_dicts(conn, BANK_TOTALS_CTE + """
+    SELECT bank_name, SUM(total_pensioners) as total_pensioners, SUM(branch_count) as branch_count
+    FROM bank_totals
+    GROUP BY bank_name
+    ORDER BY total_pensioners DESC
+    LIMIT ?
+    """, (TOP_BANKS_OVERALL,))
     
     # State-wise summary
-    state_summary = df.groupby('bank_state').agg({
-        'total_pensioners': 'sum',
-        'branch_count': 'sum',
-        'bank_name': 'nunique'
-    }).rename(columns={'bank_name': 'unique_banks'}).sort_values('total_pensioners', ascending=False)
+    state_summary = _fetch_dicts(conn, BANK_TOTALS_CTE + """
+    SELECT bank_state, SUM(total_pensioners) as total_pensioners, SUM(branch_count) as branch_count,
+           COUNT(*) as unique_banks
+    FROM bank_totals
+    GROUP BY bank_state
+    ORDER BY total_pensioners DESC
+    """)
     
-    conn.close()
+    if own_conn:
+        conn.close()
     
     return {
-        'top_banks_overall': top_banks_overall.to_dict('index'),
-        'top_banks_by_state': top_banks_by_state.to_dict('records'),
-        'state_summary': state_summary.to_dict('index'),
+        'top_banks_overall': {row.pop('bank_name'): row for row in top_banks_overall},
+        'top_banks_by_state': top_banks_by_state,
+        'state_summary': {row.pop('bank_state'): row for row in state_summary},
         'total_states': len(state_summary),
-        'total_pensioners': df['total_pensioners'].sum(),
-        'total_branches': df['branch_count'].sum()
+        'total_pensioners': sum(row['total_pensioners'] for row in state_summary),
+        'total_branches': sum(row['branch_count'] for row in state_summary)
     }
 
+def load_top_banks(cache_file=TOP_BANKS_CACHE, top_n=TOP_BANKS_PER_STATE):
+    """
+    Top banks data, served from the JSON cache while bank_pensioner_data is unchanged
+    
+    The cache records the rollup generation of bank_pensioner_data; it is
+    regenerated (and rewritten atomically) only when an import bumps it.
+    
+    Returns:
+        tuple: (bank_data, from_cache)
+    """
+    conn = sqlite3.connect('database.db')
+    try:
+        refresh_rollup(conn, verbose=False)
+        generation = rollup_generation(conn, ['bank_pensioner_data'])
+        
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file) as f:
+                    cached = json.load(f)
+                if cached.get('rollup_generation') == generation and cached.get('top_n') == top_n:
+                    return cached, True
+            except (OSError, ValueError):
+                pass
+        
+        bank_data = get_top_banks_by_state(conn, top_n)
+    finally:
+        conn.close()
+    
+    bank_data['rollup_generation'] = generation
+    bank_data['top_n'] = top_n
+    bank_data['generated_at'] = datetime.now().isoformat(timespec='seconds')
+    tmp_file = cache_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(bank_data, f, indent=2, default=str)
+    os.replace(tmp_file, cache_file)
+    return bank_data, False
+
 def get_doppw_bank_analysis():
-    """Get bank analysis from DOPPW data"""
+    """Get bank analysis from DOPPW data (Parquet lake when it is up to date)"""
+    lake = fresh_lake_connection('database.db', ['doppw_pensioner_data'])
+    if lake is not None:
+        df = lake.execute("""
+        SELECT 
+            branch_state,
+            branch_name,
+            COUNT(*) as pensioner_count,
+            COUNT(DISTINCT branch_code) as unique_branches
+        FROM pensioner_lake 
+        WHERE source = 'doppw_pensioner_data'
+            AND branch_state IS NOT NULL 
+            AND branch_name IS NOT NULL
+        GROUP BY branch_state, branch_name
+        ORDER BY branch_state, pensioner_count DESC
+        """).df()
+        lake.close()
+        return df.to_dict('records')
+    
     conn = sqlite3.connect('database.db')
     
+    # Compared as text, like the lake copy (branch_code 5 and '5' are one branch)
     query = """
     SELECT 
-        branch_state,
-        branch_name,
+        CAST(branch_state AS TEXT) as branch_state,
+        CAST(branch_name AS TEXT) as branch_name,
         COUNT(*) as pensioner_count,
-        COUNT(DISTINCT branch_code) as unique_branches
+        COUNT(DISTINCT CAST(branch_code AS TEXT)) as unique_branches
     FROM doppw_pensioner_data 
     WHERE branch_state IS NOT NULL 
         AND branch_name IS NOT NULL
-    GROUP BY branch_state, branch_name
+    GROUP BY 1, 2
     ORDER BY branch_state, pensioner_count DESC
     """
     
@@ -86,8 +181,8 @@ if __name__ == "__main__":
     print("TOP BANKS ANALYSIS")
     print("="*60)
     
-    # Get bank analysis
-    bank_data = get_top_banks_by_state()
+    # Get bank analysis (cached in top_banks_data.json until the next import)
+    bank_data, from_cache = load_top_banks()
     
     print(f"Total States: {bank_data['total_states']}")
     print(f"Total Pensioners: {bank_data['total_pensioners']:,}")
@@ -101,8 +196,7 @@ if __name__ == "__main__":
     for state, data in list(bank_data['state_summary'].items())[:5]:
         print(f"  {state}: {data['total_pensioners']:,} pensioners, {data['unique_banks']} banks")
     
-    # Save to JSON for API
-    with open('top_banks_data.json', 'w') as f:
-        json.dump(bank_data, f, indent=2, default=str)
-    
-    print("\nData saved to top_banks_data.json")
\ No newline at end of file
+    if from_cache:
+        print(f"\n{TOP_BANKS_CACHE} is up to date (generation {bank_data['rollup_generation']})")
+    else:
+        print(f"\nData saved to {TOP_BANKS_CACHE}")
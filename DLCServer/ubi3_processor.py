@@ -11,6 +11,7 @@ import sys
 from datetime import datetime
 import logging
 import re
+from ppo_registry import PPORegistry
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -79,6 +80,7 @@ class UBI3Processor:
             cursor.execute(create_summary_sql)
             
             self.conn.commit()
+            self.ppo_registry = PPORegistry(self.conn)
             logger.info("UBI 3 pensioner tables created successfully")
             return True
             
@@ -303,6 +305,10 @@ class UBI3Processor:
                     logger.warning(f"Invalid record skipped: {validation_notes}")
             
             self.conn.commit()
+            duplicates = self.ppo_registry.sync('ubi3_pensioner_data')
+            if duplicates['cross_source']:
+                logger.warning(f"{duplicates['cross_source']} PPO numbers in sheet {sheet_name} were already loaded "
+                               f"from another source (see ppo_duplicates)")
             logger.info(f"Successfully processed sheet: {sheet_name} - {valid_count} valid, {invalid_count} invalid records")
             return True
             
@@ -6,8 +6,17 @@ Analyzes all database files and counts total pensioners across all tables
 
 import sqlite3
 import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'DLCServer'))
+from pensioner_facts import FACT_TABLE, source_totals
+
+# Pre-aggregates, not pensioner records
+ROLLUP_TABLES = ('pensioner_rollup', 'pensioner_rollup_sources')
+# Storage behind the compatibility views; counted through the views instead
+FACT_TABLES = (FACT_TABLE, 'pensioner_fact_sources')
+
 # Database files to analyze
 database_files = [
     '/data1/jainendra/DLC_backend-main/DLC_Database.db',
@@ -36,18 +45,35 @@ def analyze_database(db_path):
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         
-        # Get all tables
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
+        # Get all tables (unified sources are views over pensioner_fact)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%'")
         tables = cursor.fetchall()
         
         table_info = []
         total_records = 0
         
+        # Unified sources are all counted by one GROUP BY over pensioner_fact
+        fact_totals = source_totals(conn)
+        cached_counts = {source: total['records'] for source, total in fact_totals.items()}
+        rollup_pensioners = {}
+        if 'pensioner_rollup' in {name for (name,) in tables}:
+            cursor.execute("SELECT source_table, SUM(pensioners) FROM pensioner_rollup GROUP BY source_table")
+            rollup_pensioners = dict(cursor.fetchall())
+        # Dictionary-encoded tables are counted through their views, not their <table>_fact storage
+        encoded_storage = set()
+        if 'normalized_tables' in {name for (name,) in tables}:
+            cursor.execute("SELECT fact_table FROM normalized_tables")
+            encoded_storage = {name for (name,) in cursor.fetchall()}
+        
         for (table_name,) in tables:
+            if table_name in ROLLUP_TABLES or table_name in FACT_TABLES or table_name in encoded_storage:
+                continue
             try:
                 # Get row count
-                cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-                count = cursor.fetchone()[0]
+                count = cached_counts.get(table_name)
+                if count is None:
+                    cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+                    count = cursor.fetchone()[0]
                 
                 # Get column info
                 cursor.execute(f"PRAGMA table_info({table_name})")
@@ -57,6 +83,8 @@ def analyze_database(db_path):
                 table_info.append({
                     'name': table_name,
                     'records': count,
+                    'pensioners': rollup_pensioners.get(table_name,
+                                                        fact_totals.get(table_name, {}).get('pensioners')),
                     'columns': len(column_names),
                     'column_names': column_names
                 })
@@ -141,6 +169,8 @@ def main():
                 records = table.get('records', 0)
                 columns = table.get('columns', 0)
                 print(f"{table['name']:<40} {records:>15,} {columns:>10}")
+                if table.get('pensioners') is not None:
+                    print(f"  └─ Pensioners (rollup cube): {table['pensioners']:,}")
                 
                 # Show column names for pensioner tables
                 if records > 0 and 'pensioner' in table['name'].lower():
@@ -4,204 +4,265 @@ Analyze Pensioner Data using DuckDB + Pandas
 This script analyzes the pensioner data in the TBL_DOPPW_DLCDATA_MST table
 and generates comprehensive reports by state, district, pincode, age categories,
 and PSA/PDA categories.
+
+DuckDB reads the Parquet lake (DLCServer/pensioner_lake.py) when it is up to
+date with the table, otherwise it scans the SQLite file directly (sqlite
+scanner, read-only ATTACH); only the small aggregated results are ever
+materialized in pandas.
 """
 
 import pandas as pd
 import duckdb
-import sqlite3
 from datetime import datetime
 import os
+import sys
+
+from report_writer import StreamingExcelWriter
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'DLCServer'))
+from pensioner_lake import fresh_lake_connection
+
+DB_PATH = 'DLC_Database.db'
 
-def load_data_from_sqlite():
-    """Load data from SQLite database into a pandas DataFrame"""
-    print("📥 Loading data from SQLite database...")
-    
-    # Connect to SQLite database
-    sqlite_conn = sqlite3.connect('DLC_Database.db')
-    
-    # Load data into pandas DataFrame
-    query = """
-    SELECT 
-        LEVEL1 as GCODE,
-        ESCROLL_CATEGORY,
-        BRANCH_STATE_NAME as STATE,
-        BRANCH_PINCODE as BRANCH_PIN,
-        PENSIONER_STATE_NAME as PENSIONER_STATE,
-        PENSIONER_PINCODE,
-        PENSIONER_DISTRICT_NAME as DISTRICT,
-        YEAR_OF_BIRTH,
-        AGE,
-        SUBMISSION_STATUS,
-        SUBMISSION_MODE,
-        VERIFICATION_TYPE
-    FROM TBL_DOPPW_DLCDATA_MST
-    WHERE LEVEL1 IS NOT NULL
+# Age buckets computed in SQL (same boundaries as the old pandas categorize_age)
+AGE_CATEGORY_SQL = """
+    CASE
+        WHEN TRY_CAST(AGE AS DOUBLE) IS NULL THEN 'Unknown'
+        WHEN TRY_CAST(AGE AS DOUBLE) < 60 THEN 'Below 60'
+        WHEN TRY_CAST(AGE AS DOUBLE) < 70 THEN '60-70'
+        WHEN TRY_CAST(AGE AS DOUBLE) < 80 THEN '70-80'
+        WHEN TRY_CAST(AGE AS DOUBLE) < 90 THEN '80-90'
+        ELSE 'Above 90'
+    END
+"""
+
+def connect_to_sqlite(db_path=DB_PATH):
     """
+    Open DuckDB on top of the SQLite database without copying it into pandas.
     
-    df = pd.read_sql_query(query, sqlite_conn)
-    sqlite_conn.close()
+    The SQLite file is attached read-only through DuckDB's sqlite scanner and
+    exposed as the `pensioner_data` view (with AGE_CATEGORY computed in SQL),
+    so every analysis query streams straight from the SQLite pages.
+    """
+    print("📥 Attaching SQLite database to DuckDB...")
     
-    print(f"✅ Loaded {len(df)} records from database")
-    return df
+    con = duckdb.connect()
+    con.execute("INSTALL sqlite")
+    con.execute("LOAD sqlite")
+    # SQLite columns are loosely typed; read everything as VARCHAR and cast in SQL
+    con.execute("SET sqlite_all_varchar = true")
+    # Row order of intermediate results is irrelevant here; lets DuckDB stream with less memory
+    con.execute("SET preserve_insertion_order = false")
+    escaped_path = db_path.replace("'", "''")
+    con.execute(f"ATTACH '{escaped_path}' AS dlc (TYPE sqlite, READ_ONLY)")
+    
+    con.execute(f"""
+        CREATE VIEW pensioner_data AS
+        SELECT 
+            LEVEL1 as GCODE,
+            ESCROLL_CATEGORY,
+            BRANCH_STATE_NAME as STATE,
+            BRANCH_PINCODE as BRANCH_PIN,
+            PENSIONER_STATE_NAME as PENSIONER_STATE,
+            PENSIONER_PINCODE,
+            PENSIONER_DISTRICT_NAME as DISTRICT,
+            YEAR_OF_BIRTH,
+            AGE,
+            {AGE_CATEGORY_SQL} as AGE_CATEGORY,
+            SUBMISSION_STATUS,
+            SUBMISSION_MODE,
+            VERIFICATION_TYPE
+        FROM dlc.TBL_DOPPW_DLCDATA_MST
+        WHERE LEVEL1 IS NOT NULL
+    """)
+    
+    total = con.execute("SELECT COUNT(*) FROM pensioner_data").fetchone()[0]
+    print(f"✅ {total} records available in TBL_DOPPW_DLCDATA_MST")
+    return con, total
+
+def connect_to_lake(db_path=DB_PATH):
+    """
+    Same `pensioner_data` view as connect_to_sqlite, but over the Parquet lake.
+    
+    Returns:
+        tuple: (con, total), or (None, 0) when the lake is missing or older than the table
+    """
+    con = fresh_lake_connection(db_path, ['TBL_DOPPW_DLCDATA_MST'])
+    if con is None:
+        return None, 0
+    
+    con.execute("SET preserve_insertion_order = false")
+    con.execute(f"""
+        CREATE VIEW pensioner_data AS
+        SELECT 
+            category as GCODE,
+            escroll_category as ESCROLL_CATEGORY,
+            branch_state as STATE,
+            branch_pincode as BRANCH_PIN,
+            state as PENSIONER_STATE,
+            pincode as PENSIONER_PINCODE,
+            district as DISTRICT,
+            birth_year as YEAR_OF_BIRTH,
+            age as AGE,
+            {AGE_CATEGORY_SQL} as AGE_CATEGORY,
+            submission_status as SUBMISSION_STATUS,
+            submission_mode as SUBMISSION_MODE,
+            verification_type as VERIFICATION_TYPE
+        FROM pensioner_lake
+        WHERE source = 'TBL_DOPPW_DLCDATA_MST' AND category IS NOT NULL
+    """)
+    
+    total = con.execute("SELECT COUNT(*) FROM pensioner_data").fetchone()[0]
+    print(f"✅ {total} records available in TBL_DOPPW_DLCDATA_MST (Parquet lake)")
+    return con, total
+
+# Every dimension any breakdown groups by, in GROUPING() argument order
+DIMENSIONS = [
+    'GCODE',
+    'STATE',
+    'DISTRICT',
+    'AGE_CATEGORY',
+    'SUBMISSION_STATUS',
+    'SUBMISSION_MODE',
+    'VERIFICATION_TYPE',
+    'PENSIONER_PINCODE',
+]
+
+# Grouping sets computed in one scan; () is the shared grand total.
+# Adding a breakdown means adding a set here, not another table scan.
+GROUPING_SETS = {
+    'total': (),
+    'gcode': ('GCODE',),
+    'state': ('STATE',),
+    'state_district': ('STATE', 'DISTRICT'),
+    'age_category': ('AGE_CATEGORY',),
+    'submission_status': ('SUBMISSION_STATUS',),
+    'submission_mode': ('SUBMISSION_MODE',),
+    'verification_type': ('VERIFICATION_TYPE',),
+    'pincode': ('PENSIONER_PINCODE',),
+    'state_age': ('STATE', 'AGE_CATEGORY'),
+}
+
+def grouping_id(columns):
+    """Value of GROUPING(<DIMENSIONS>) for a grouping set (bit set = column rolled up)"""
+    width = len(DIMENSIONS)
+    return sum(1 << (width - 1 - i) for i, dim in enumerate(DIMENSIONS) if dim not in columns)
+
+def run_grouping_sets(con):
+    """
+    Compute all grouping sets over pensioner_data in a single scan
+    
+    Returns:
+        dict: grouping set name -> DataFrame(set columns..., total_pensioners)
+    """
+    sets_sql = ",\n            ".join(f"({', '.join(cols)})" for cols in GROUPING_SETS.values())
+    query = f"""
+        SELECT 
+            {', '.join(DIMENSIONS)},
+            GROUPING({', '.join(DIMENSIONS)}) as grouping_id,
+            COUNT(*) as total_pensioners
+        FROM pensioner_data
+        GROUP BY GROUPING SETS (
+            {sets_sql}
+        )
+    """
+    cube = con.execute(query).fetchdf()
+    
+    groups = {}
+    for name, columns in GROUPING_SETS.items():
+        subset = cube[cube['grouping_id'] == grouping_id(columns)]
+        groups[name] = subset[list(columns) + ['total_pensioners']].reset_index(drop=True)
+    return groups
 
-def create_age_categories(df):
-    """Create age categories from birth year"""
-    # Create age categories
-    def categorize_age(age):
-        if pd.isna(age) or age is None:
-            return 'Unknown'
-        elif age < 60:
-            return 'Below 60'
-        elif age < 70:
-            return '60-70'
-        elif age < 80:
-            return '70-80'
-        elif age < 90:
-            return '80-90'
-        else:
-            return 'Above 90'
-    
-    df['AGE_CATEGORY'] = df['AGE'].apply(categorize_age)
+def with_percentage(df, total):
+    """Add the percentage-of-all-pensioners column using the shared total"""
+    df = df.copy()
+    df['percentage'] = (df['total_pensioners'] * 100.0 / total).round(2) if total else 0.0
     return df
 
-def analyze_with_duckdb(df):
-    """Perform comprehensive analysis using DuckDB"""
+def analyze_with_duckdb(con):
+    """
+    Perform comprehensive analysis using DuckDB over the attached SQLite view
+    
+    All breakdowns come from one GROUPING SETS query (one scan of the table);
+    the output sheets are then split out of that result.
+    """
     print("🦆 Performing analysis with DuckDB...")
     
-    # Connect to DuckDB in-memory
-    con = duckdb.connect()
+    try:
+        groups = run_grouping_sets(con)
+    except Exception as e:
+        print(f"❌ Error in grouping sets analysis: {str(e)}")
+        return {}
     
-    # Register the dataframe
-    con.register('pensioner_data', df)
-    
-    # Create analysis tables
-    analysis_queries = {
-        'by_gcode': """
-            SELECT 
-                GCODE,
-                COUNT(*) as total_pensioners,
-                ROUND(COUNT(*) * 100.0 / (SELECT COUNT(*) FROM pensioner_data), 2) as percentage
-            FROM pensioner_data 
-            GROUP BY GCODE
-            ORDER BY total_pensioners DESC
-        """,
-        
-        'by_state': """
-            SELECT 
-                STATE,
-                COUNT(*) as total_pensioners,
-                COUNT(DISTINCT DISTRICT) as districts_covered,
-                ROUND(COUNT(*) * 100.0 / (SELECT COUNT(*) FROM pensioner_data), 2) as percentage
-            FROM pensioner_data 
-            WHERE STATE IS NOT NULL
-            GROUP BY STATE
-            ORDER BY total_pensioners DESC
-        """,
-        
-        'by_age_category': """
-            SELECT 
-                AGE_CATEGORY,
-                COUNT(*) as total_pensioners,
-                ROUND(COUNT(*) * 100.0 / (SELECT COUNT(*) FROM pensioner_data), 2) as percentage
-            FROM pensioner_data 
-            GROUP BY AGE_CATEGORY
-            ORDER BY total_pensioners DESC
-        """,
-        
-        'by_submission_status': """
-            SELECT 
-                SUBMISSION_STATUS,
-                COUNT(*) as total_pensioners,
-                ROUND(COUNT(*) * 100.0 / (SELECT COUNT(*) FROM pensioner_data), 2) as percentage
-            FROM pensioner_data 
-            WHERE SUBMISSION_STATUS IS NOT NULL
-            GROUP BY SUBMISSION_STATUS
-            ORDER BY total_pensioners DESC
-        """,
-        
-        'by_submission_mode': """
-            SELECT 
-                SUBMISSION_MODE,
-                COUNT(*) as total_pensioners,
-                ROUND(COUNT(*) * 100.0 / (SELECT COUNT(*) FROM pensioner_data), 2) as percentage
-            FROM pensioner_data 
-            WHERE SUBMISSION_MODE IS NOT NULL
-            GROUP BY SUBMISSION_MODE
-            ORDER BY total_pensioners DESC
-        """,
-        
-        'by_verification_type': """
-            SELECT 
-                VERIFICATION_TYPE,
-                COUNT(*) as total_pensioners,
-                ROUND(COUNT(*) * 100.0 / (SELECT COUNT(*) FROM pensioner_data), 2) as percentage
-            FROM pensioner_data 
-            WHERE VERIFICATION_TYPE IS NOT NULL
-            GROUP BY VERIFICATION_TYPE
-            ORDER BY total_pensioners DESC
-        """,
-        
-        'top_districts': """
-            SELECT 
-                STATE,
-                DISTRICT,
-                COUNT(*) as total_pensioners
-            FROM pensioner_data 
-            WHERE DISTRICT IS NOT NULL AND STATE IS NOT NULL
-            GROUP BY STATE, DISTRICT
-            ORDER BY total_pensioners DESC
-            LIMIT 20
-        """,
-        
-        'top_pincodes': """
-            SELECT 
-                PENSIONER_PINCODE,
-                COUNT(*) as total_pensioners
-            FROM pensioner_data 
-            WHERE PENSIONER_PINCODE IS NOT NULL
-            GROUP BY PENSIONER_PINCODE
-            ORDER BY total_pensioners DESC
-            LIMIT 20
-        """,
-        
-        'state_age_distribution': """
-            SELECT 
-                STATE,
-                AGE_CATEGORY,
-                COUNT(*) as total_pensioners
-            FROM pensioner_data 
-            WHERE STATE IS NOT NULL AND AGE_CATEGORY IS NOT NULL
-            GROUP BY STATE, AGE_CATEGORY
-            ORDER BY STATE, total_pensioners DESC
-        """
+    total = int(groups['total']['total_pensioners'].sum())
+    
+    def ranked(df):
+        return df.sort_values('total_pensioners', ascending=False).reset_index(drop=True)
+    
+    state_district = groups['state_district']
+    districts_covered = (
+        state_district[state_district['DISTRICT'].notna()]
+        .groupby('STATE').size().rename('districts_covered').reset_index()
+    )
+    by_state = groups['state'][groups['state']['STATE'].notna()]
+    by_state = by_state.merge(districts_covered, on='STATE', how='left')
+    by_state['districts_covered'] = by_state['districts_covered'].fillna(0).astype(int)
+    
+    state_age = groups['state_age']
+    state_age = state_age[state_age['STATE'].notna() & state_age['AGE_CATEGORY'].notna()]
+    
+    results = {
+        'by_gcode': with_percentage(ranked(groups['gcode']), total),
+        'by_state': with_percentage(ranked(by_state), total),
+        'by_age_category': with_percentage(ranked(groups['age_category']), total),
+        'by_submission_status': with_percentage(
+            ranked(groups['submission_status'].dropna(subset=['SUBMISSION_STATUS'])), total),
+        'by_submission_mode': with_percentage(
+            ranked(groups['submission_mode'].dropna(subset=['SUBMISSION_MODE'])), total),
+        'by_verification_type': with_percentage(
+            ranked(groups['verification_type'].dropna(subset=['VERIFICATION_TYPE'])), total),
+        'top_districts': ranked(state_district.dropna(subset=['STATE', 'DISTRICT'])).head(20),
+        'top_pincodes': ranked(groups['pincode'].dropna(subset=['PENSIONER_PINCODE'])).head(20),
+        'state_age_distribution': state_age.sort_values(
+            ['STATE', 'total_pensioners'], ascending=[True, False]).reset_index(drop=True),
     }
     
-    results = {}
-    for name, query in analysis_queries.items():
-        try:
-            result = con.execute(query).fetchdf()
-            results[name] = result
-            print(f"✅ Generated {name} analysis")
-        except Exception as e:
-            print(f"❌ Error in {name} analysis: {str(e)}")
-            results[name] = pd.DataFrame()
-    
-    con.close()
+    for name in results:
+        print(f"✅ Generated {name} analysis")
+    
     return results
 
-def save_analysis_results(analysis_results):
-    """Save analysis results to Excel file"""
+# Full pincode-level breakdown, streamed from DuckDB into its own sheet(s)
+PINCODE_DETAIL_QUERY = """
+    SELECT STATE, DISTRICT, PENSIONER_PINCODE, AGE_CATEGORY, SUBMISSION_STATUS,
+           COUNT(*) as total_pensioners
+    FROM pensioner_data
+    GROUP BY ALL
+    ORDER BY STATE, DISTRICT, PENSIONER_PINCODE, AGE_CATEGORY, SUBMISSION_STATUS
+"""
+
+def save_analysis_results(analysis_results, con=None):
+    """
+    Save analysis results to Excel file
+    
+    Sheets are streamed with constant memory; when a DuckDB connection is
+    given, the pincode_detail sheet is written straight from the query result
+    in batches (continuing on extra sheets past Excel's row limit).
+    """
     print("💾 Saving analysis results...")
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"pensioner_data_analysis_{timestamp}.xlsx"
     
-    with pd.ExcelWriter(filename) as writer:
+    with StreamingExcelWriter(filename) as writer:
         for name, df in analysis_results.items():
             if not df.empty:
-                # Limit sheet name to 31 characters
-                sheet_name = name[:31]
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
+                writer.write_dataframe(name, df)
+        
+        if con is not None:
+            rows = writer.write_cursor('pincode_detail', con.execute(PINCODE_DETAIL_QUERY))
+            print(f"✅ Streamed {rows:,} pincode_detail rows")
     
     print(f"✅ Analysis saved to {filename}")
     return filename
@@ -249,21 +310,22 @@ def main():
     """Main function to analyze pensioner data"""
     print("🚀 Starting pensioner data analysis...")
     
-    # Load data from SQLite
-    df = load_data_from_sqlite()
+    # Prefer the columnar lake; else attach SQLite to DuckDB (no pandas materialization either way)
+    con, total = connect_to_lake()
+    if con is None:
+        con, total = connect_to_sqlite()
     
-    if df.empty:
+    if total == 0:
         print("❌ No data found in database")
+        con.close()
         return
     
-    # Create age categories
-    df = create_age_categories(df)
-    
-    # Perform analysis with DuckDB
-    analysis_results = analyze_with_duckdb(df)
-    
-    # Save results
-    filename = save_analysis_results(analysis_results)
+    # Perform analysis with DuckDB and save results while the view is still attached
+    try:
+        analysis_results = analyze_with_duckdb(con)
+        filename = save_analysis_results(analysis_results, con)
+    finally:
+        con.close()
     
     # Generate summary report
     generate_summary_report(analysis_results)
@@ -15,7 +15,9 @@ from hash_creation import generate_access_token
 USERNAME = "UserJP"
 PLAIN_PASSWORD = "29#@JP25bhaV"
 PWD_SECRET_KEY = "bam5kllfzjzvjv560s5q24fnwbtqs50d"
-AUTH_URL = "https://ipension.nic.in/JPWrapper/api/Auth"
+# Point JP_BASE_URL at mock_jp_server.py (e.g. http://127.0.0.1:5050) to dry-run the diagnostic
+JP_BASE_URL = os.getenv("JP_BASE_URL", "https://ipension.nic.in")
+AUTH_URL = f"{JP_BASE_URL}/JPWrapper/api/Auth"
 
 print("="*80)
 print("JEEVAN PRAMAAN API DIAGNOSTIC")
@@ -27,7 +29,8 @@ print("TEST 1: DNS Resolution")
 print("-" * 40)
 try:
     import socket
-    hostname = "ipension.nic.in"
+    from urllib.parse import urlparse
+    hostname = urlparse(JP_BASE_URL).hostname
     ip_address = socket.gethostbyname(hostname)
     print(f"✅ {hostname} resolves to {ip_address}")
 except Exception as e:
@@ -38,7 +41,7 @@ print()
 print("TEST 2: Base URL Connectivity")
 print("-" * 40)
 try:
-    response = requests.get("https://ipension.nic.in/", timeout=10, verify=True)
+    response = requests.get(f"{JP_BASE_URL}/", timeout=10, verify=True)
     print(f"✅ Base URL accessible - Status: {response.status_code}")
 except requests.exceptions.SSLError as e:
     print(f"⚠️  SSL Error: {e}")
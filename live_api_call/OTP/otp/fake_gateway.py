@@ -0,0 +1,126 @@
+"""
+Local fake SMSGatewayHub for testing send_otp.py and otp_dispatcher.py.
+
+Answers POST/GET /api/mt/SendSMS with the same JSON shape as the real
+gateway ({"ErrorCode": "000", "ErrorMessage": "Done", "JobId": ...}) and
+supports latency, ErrorCode failures, HTTP 5xx failures and its own
+per-second quota (HTTP 429 above it).
+
+    python fake_gateway.py --port 8765 --latency-ms 80 --error-rate 0.02 --quota 50
+    SMS_API_URL=http://127.0.0.1:8765/api/mt/SendSMS python otp_dispatcher.py
+"""
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+CONFIG = {
+    "latency_ms": 50.0,
+    "error_rate": 0.0,
+    "error_code": "013",
+    "http_error_rate": 0.0,
+    "quota": 0,
+}
+
+_job_ids = itertools.count(1)
+_stats = Counter()
+_stats_lock = threading.Lock()
+_window = {"second": 0, "count": 0}
+
+
+def over_quota():
+    """True when more than CONFIG['quota'] requests arrived in the current second."""
+    if not CONFIG["quota"]:
+        return False
+    with _stats_lock:
+        second = int(time.time())
+        if _window["second"] != second:
+            _window["second"] = second
+            _window["count"] = 0
+        _window["count"] += 1
+        return _window["count"] > CONFIG["quota"]
+
+
+class FakeGatewayHandler(BaseHTTPRequestHandler):
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self):
+        url = urlparse(self.path)
+        if url.path == "/stats":
+            with _stats_lock:
+                return self._reply(200, dict(_stats))
+        if url.path != "/api/mt/SendSMS":
+            return self._reply(404, {"ErrorCode": "404", "ErrorMessage": "Not found"})
+
+        params = parse_qs(url.query)
+        time.sleep(CONFIG["latency_ms"] / 1000.0)
+
+        if over_quota():
+            outcome, status, body = "429", 429, {"ErrorCode": "429", "ErrorMessage": "Rate limit exceeded"}
+        elif random.random() < CONFIG["http_error_rate"]:
+            outcome, status, body = "500", 500, {"ErrorCode": "500", "ErrorMessage": "Injected server error"}
+        elif not params.get("number") or not params.get("text"):
+            outcome, status, body = "missing", 200, {"ErrorCode": "001", "ErrorMessage": "Missing number or text"}
+        elif random.random() < CONFIG["error_rate"]:
+            outcome, status, body = CONFIG["error_code"], 200, {
+                "ErrorCode": CONFIG["error_code"], "ErrorMessage": "Injected gateway error"
+            }
+        else:
+            outcome, status, body = "000", 200, {
+                "ErrorCode": "000", "ErrorMessage": "Done", "JobId": str(next(_job_ids))
+            }
+
+        with _stats_lock:
+            _stats[outcome] += 1
+        self._reply(status, body)
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake SMSGatewayHub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=CONFIG["latency_ms"])
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction answered with a non-000 ErrorCode")
+    parser.add_argument("--error-code", default=CONFIG["error_code"], help="ErrorCode used for injected failures")
+    parser.add_argument("--http-error-rate", type=float, default=0.0, help="Fraction answered with HTTP 500")
+    parser.add_argument("--quota", type=int, default=0, help="Requests per second before HTTP 429 (0 = unlimited)")
+    args = parser.parse_args()
+
+    CONFIG.update({
+        "latency_ms": args.latency_ms,
+        "error_rate": args.error_rate,
+        "error_code": args.error_code,
+        "http_error_rate": args.http_error_rate,
+        "quota": args.quota,
+    })
+
+    server = ThreadingHTTPServer((args.host, args.port), FakeGatewayHandler)
+    print(f"Fake SMS gateway on http://{args.host}:{args.port}/api/mt/SendSMS (stats at /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Asynchronous batched OTP dispatcher for SMSGatewayHub.
+
+send_otp.send_sms() sends one SMS per blocking call. During DLC campaign
+login storms this dispatcher is used instead:
+
+- bounded asyncio queue (back-pressure instead of unbounded memory)
+- one pooled aiohttp session shared by all workers
+- token bucket matching the gateway quota (SMS_RATE_PER_SECOND / SMS_RATE_BURST)
+- retries with exponential backoff and full jitter for transport errors,
+  HTTP 429/5xx and any ErrorCode listed in SMS_RETRYABLE_ERROR_CODES
+- metrics: queue depth, send latency percentiles, results by ErrorCode
+
+Try it against the local fake gateway:
+
+    python fake_gateway.py --port 8765 --error-rate 0.05
+    SMS_API_URL=http://127.0.0.1:8765/api/mt/SendSMS python otp_dispatcher.py --count 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter, deque
+
+import aiohttp
+
+from send_otp import SMS_API_URL, SMS_TIMEOUT_SECONDS, build_sms_params, parse_sms_response, generate_otp
+
+SMS_RATE_PER_SECOND = float(os.getenv("SMS_RATE_PER_SECOND", "10"))
+SMS_RATE_BURST = int(os.getenv("SMS_RATE_BURST", "20"))
+SMS_MAX_RETRIES = int(os.getenv("SMS_MAX_RETRIES", "3"))
+SMS_RETRYABLE_ERROR_CODES = {
+    code.strip() for code in os.getenv("SMS_RETRYABLE_ERROR_CODES", "").split(",") if code.strip()
+}
+
+OTP_MESSAGE_TEMPLATE = (
+    "Dear user, your CRS OTP for CRS application is {otp}. Use it to complete authentication. "
+    "Do not share it. --AIRAWAT RESEARCH FOUNDATION"
+)
+
+
+class TokenBucket:
+    """Token bucket rate limiter: `rate` tokens per second, at most `capacity` banked."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until one token is available and take it."""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class DispatchMetrics:
+    """Counters and recent send latencies of an OTPDispatcher."""
+
+    def __init__(self, latency_window=10000):
+        self.submitted = 0
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.rejected = 0
+        self.error_codes = Counter()
+        self.latencies = deque(maxlen=latency_window)
+
+    def snapshot(self, queue_depth):
+        """Current metrics as a dict (latencies in milliseconds)."""
+        latencies = sorted(self.latencies)
+
+        def pct(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p / 100.0 * len(latencies)))] * 1000, 1)
+
+        return {
+            "queue_depth": queue_depth,
+            "submitted": self.submitted,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "latency_ms": {"p50": pct(50), "p95": pct(95), "p99": pct(99)},
+            "error_codes": dict(self.error_codes),
+        }
+
+
+class OTPDispatcher:
+    """
+    Queue-based async SMS sender.
+
+    Usage:
+        dispatcher = OTPDispatcher()
+        await dispatcher.start()
+        result = await dispatcher.send("919876543210", message)
+        await dispatcher.stop()
+    """
+
+    def __init__(self, api_url=SMS_API_URL, rate_per_second=SMS_RATE_PER_SECOND, burst=SMS_RATE_BURST,
+                 queue_size=1000, workers=20, max_retries=SMS_MAX_RETRIES, backoff_base=0.5,
+                 backoff_max=10.0, timeout=SMS_TIMEOUT_SECONDS):
+        self.api_url = api_url
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.worker_count = workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.metrics = DispatchMetrics()
+        self.session = None
+        self.workers = []
+
+    async def start(self):
+        """Open the pooled HTTP session and start the worker tasks."""
+        connector = aiohttp.TCPConnector(limit=self.worker_count, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        """Wait for queued messages to be sent, then shut down."""
+        await self.queue.join()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def submit(self, number, message):
+        """
+        Queue one SMS without waiting for the queue to have room.
+
+        Returns:
+            asyncio.Future | None: Resolves to the send_sms-style result dict,
+            None if the queue is full (caller should answer "try again").
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((number, message, future, time.monotonic()))
+        except asyncio.QueueFull:
+            self.metrics.rejected += 1
+            return None
+        self.metrics.submitted += 1
+        return future
+
+    async def send(self, number, message):
+        """Queue one SMS (waiting for room if the queue is full) and await its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((number, message, future, time.monotonic()))
+        self.metrics.submitted += 1
+        return await future
+
+    def get_metrics(self):
+        """Metrics snapshot including the current queue depth."""
+        return self.metrics.snapshot(self.queue.qsize())
+
+    async def _worker(self):
+        while True:
+            number, message, future, queued_at = await self.queue.get()
+            try:
+                result = await self._send_with_retries(number, message)
+                self.metrics.latencies.append(time.monotonic() - queued_at)
+                self.metrics.error_codes[result.get("error_code") or "NONE"] += 1
+                if result["success"]:
+                    self.metrics.sent += 1
+                else:
+                    self.metrics.failed += 1
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                self.metrics.failed += 1
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def _send_with_retries(self, number, message):
+        params = build_sms_params(number, message)
+        attempt = 0
+        while True:
+            await self.bucket.acquire()
+            result, retryable = await self._send_once(params)
+            if result["success"] or not retryable or attempt >= self.max_retries:
+                result["attempts"] = attempt + 1
+                return result
+            attempt += 1
+            self.metrics.retries += 1
+            # Exponential backoff with full jitter
+            await asyncio.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+
+    async def _send_once(self, params):
+        """
+        Returns:
+            tuple: (send_sms-style result dict, whether the failure is retryable)
+        """
+        try:
+            async with self.session.post(self.api_url, params=params) as response:
+                text = await response.text()
+                if response.status == 429 or response.status >= 500:
+                    return {
+                        "success": False,
+                        "raw_response": text,
+                        "error_code": f"HTTP_{response.status}",
+                        "error_message": f"Gateway returned HTTP {response.status}"
+                    }, True
+                result = parse_sms_response(text)
+                return result, result.get("error_code") in SMS_RETRYABLE_ERROR_CODES
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return {
+                "success": False,
+                "raw_response": "",
+                "error_code": type(e).__name__,
+                "error_message": str(e) or type(e).__name__
+            }, True
+
+
+async def run_demo(count, number_prefix, rate, workers):
+    dispatcher = OTPDispatcher(rate_per_second=rate, burst=max(1, int(rate)), workers=workers)
+    await dispatcher.start()
+    started_at = time.monotonic()
+
+    tasks = []
+    for index in range(count):
+        number = f"{number_prefix}{index:06d}"
+        message = OTP_MESSAGE_TEMPLATE.format(otp=generate_otp())
+        tasks.append(asyncio.create_task(dispatcher.send(number, message)))
+
+    while not all(task.done() for task in tasks):
+        await asyncio.sleep(1)
+        print(f"  {json.dumps(dispatcher.get_metrics())}")
+
+    await dispatcher.stop()
+    duration = time.monotonic() - started_at
+    print(f"\nDispatched {count} OTPs in {duration:.1f}s ({count / duration:.1f}/s)")
+    print(json.dumps(dispatcher.get_metrics(), indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send a burst of OTP SMS through the async dispatcher")
+    parser.add_argument("--count", type=int, default=100, help="Number of OTPs to send")
+    parser.add_argument("--number-prefix", default="919000", help="Prefix for generated test numbers")
+    parser.add_argument("--rate", type=float, default=SMS_RATE_PER_SECOND, help="Messages per second")
+    parser.add_argument("--workers", type=int, default=20, help="Concurrent sender tasks")
+    args = parser.parse_args()
+
+    print(f"Gateway: {SMS_API_URL}")
+    asyncio.run(run_demo(args.count, args.number_prefix, args.rate, args.workers))
+
+
+if __name__ == "__main__":
+    main()
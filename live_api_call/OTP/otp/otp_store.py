@@ -0,0 +1,285 @@
+"""
+In-memory OTP store with TTL eviction and constant-time verification.
+
+- OTPs are kept only as HMAC-SHA256 hashes (keyed by OTP_HASH_SECRET)
+- one entry per contact number: issuing a new OTP replaces the old one
+- expiry is tracked in a min-heap and evicted by a background sweeper, so
+  memory stays flat during large campaigns instead of accumulating
+- per-number attempt counter; the OTP is burned after OTP_MAX_ATTEMPTS misses
+- verify is O(1) and compares hashes with hmac.compare_digest
+- optional SQLite persistence (db_path) so a restart does not invalidate
+  live OTPs; the table is then the only copy, so workers sharing the file
+  always see each other's issues, consumptions and attempt counts
+
+Usage:
+    store = OTPStore(db_path="otp_store.db")
+    otp = store.issue("919876543210")
+    store.verify("919876543210", "123456")  # {"success": True, "reason": "verified", ...}
+"""
+
+import hashlib
+import heapq
+import hmac
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from send_otp import generate_otp
+
+OTP_TTL_SECONDS = int(os.getenv("OTP_TTL_SECONDS", "240"))  # 4 minutes, as in send_otp.py
+OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", "5"))
+OTP_SWEEP_INTERVAL_SECONDS = float(os.getenv("OTP_SWEEP_INTERVAL_SECONDS", "15"))
+
+
+class OTPStore:
+    def __init__(self, ttl_seconds=OTP_TTL_SECONDS, max_attempts=OTP_MAX_ATTEMPTS, db_path=None,
+                 sweep_interval=OTP_SWEEP_INTERVAL_SECONDS, start_sweeper=True):
+        self.ttl_seconds = ttl_seconds
+        self.max_attempts = max_attempts
+        self.sweep_interval = sweep_interval
+        # contact_no -> [otp_hash, expires_at, attempts]; used only without db_path
+        self.entries = {}
+        # (expires_at, contact_no); stale items are skipped lazily
+        self.expiry_heap = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.sweeper = None
+
+        self.conn = None
+        if db_path:
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self._create_tables()
+        self.secret = self._load_secret()
+
+        if start_sweeper:
+            self.start()
+
+    # --- lifecycle -------------------------------------------------------
+
+    def start(self):
+        """Start the background expiry sweeper."""
+        if self.sweeper is not None:
+            return
+        self.stop_event.clear()
+        self.sweeper = threading.Thread(target=self._sweep_loop, name="otp-store-sweeper", daemon=True)
+        self.sweeper.start()
+
+    def stop(self):
+        """Stop the sweeper and close the SQLite connection."""
+        self.stop_event.set()
+        if self.sweeper is not None:
+            self.sweeper.join()
+            self.sweeper = None
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    # --- public API ------------------------------------------------------
+
+    def issue(self, contact_no, otp=None):
+        """
+        Create (or replace) the OTP for a number.
+
+        Returns:
+            str: The plain OTP to send by SMS (only its hash is stored)
+        """
+        otp = otp or generate_otp()
+        expires_at = time.time() + self.ttl_seconds
+        otp_hash = self._hash(contact_no, otp)
+        with self.lock:
+            if self.conn is not None:
+                self._persist(contact_no, otp_hash, expires_at, 0)
+            else:
+                self.entries[contact_no] = [otp_hash, expires_at, 0]
+                heapq.heappush(self.expiry_heap, (expires_at, contact_no))
+        return otp
+
+    def verify(self, contact_no, otp):
+        """
+        Check an OTP. A correct OTP is consumed (single use).
+
+        Returns:
+            dict: success flag, reason ("verified", "not_found", "expired",
+            "mismatch", "too_many_attempts") and attempts_left
+        """
+        candidate = self._hash(contact_no, str(otp))
+        now = time.time()
+        with self.lock:
+            if self.conn is not None:
+                return self._verify_persisted(contact_no, candidate, now)
+
+            entry = self.entries.get(contact_no)
+            if entry is None:
+                return {"success": False, "reason": "not_found", "attempts_left": 0}
+
+            otp_hash, expires_at, attempts = entry
+            if expires_at <= now:
+                self._remove(contact_no)
+                return {"success": False, "reason": "expired", "attempts_left": 0}
+            if attempts >= self.max_attempts:
+                self._remove(contact_no)
+                return {"success": False, "reason": "too_many_attempts", "attempts_left": 0}
+
+            if hmac.compare_digest(otp_hash, candidate):
+                self._remove(contact_no)
+                return {"success": True, "reason": "verified", "attempts_left": self.max_attempts - attempts}
+
+            entry[2] = attempts + 1
+            attempts_left = self.max_attempts - entry[2]
+            if attempts_left <= 0:
+                self._remove(contact_no)
+                return {"success": False, "reason": "too_many_attempts", "attempts_left": 0}
+            return {"success": False, "reason": "mismatch", "attempts_left": attempts_left}
+
+    def evict_expired(self, now=None):
+        """
+        Drop every entry whose TTL has passed.
+
+        Returns:
+            int: Number of entries evicted
+        """
+        now = time.time() if now is None else now
+        evicted = 0
+        with self.lock:
+            if self.conn is not None:
+                evicted = self.conn.execute("DELETE FROM otp_store WHERE expires_at <= ?", (now,)).rowcount
+                self.conn.commit()
+                return evicted
+            while self.expiry_heap and self.expiry_heap[0][0] <= now:
+                expires_at, contact_no = heapq.heappop(self.expiry_heap)
+                entry = self.entries.get(contact_no)
+                # Skip heap items left behind by a re-issued or verified OTP
+                if entry is not None and entry[1] == expires_at:
+                    del self.entries[contact_no]
+                    evicted += 1
+            # Stale heap items of re-issued OTPs would otherwise pile up
+            if len(self.expiry_heap) > 2 * len(self.entries) + 1024:
+                self.expiry_heap = [(entry[1], contact_no) for contact_no, entry in self.entries.items()]
+                heapq.heapify(self.expiry_heap)
+        return evicted
+
+    def stats(self):
+        """Live entry count and heap size (for monitoring memory during campaigns)."""
+        with self.lock:
+            if self.conn is not None:
+                live = self.conn.execute("SELECT COUNT(*) FROM otp_store WHERE expires_at > ?", (time.time(),))
+                return {"live_otps": live.fetchone()[0], "heap_size": 0}
+            return {"live_otps": len(self.entries), "heap_size": len(self.expiry_heap)}
+
+    # --- internals -------------------------------------------------------
+
+    def _hash(self, contact_no, otp):
+        return hmac.new(self.secret, f"{contact_no}:{otp}".encode("utf-8"), hashlib.sha256).digest()
+
+    def _sweep_loop(self):
+        while not self.stop_event.wait(self.sweep_interval):
+            try:
+                self.evict_expired()
+            except sqlite3.Error as e:
+                print(f"OTP store sweep error: {e}")
+
+    def _remove(self, contact_no):
+        self.entries.pop(contact_no, None)
+
+    def _create_tables(self):
+        self.conn.executescript("""
+        CREATE TABLE IF NOT EXISTS otp_store (
+            contact_no TEXT PRIMARY KEY,
+            otp_hash BLOB NOT NULL,
+            expires_at REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_otp_store_expires_at ON otp_store(expires_at);
+        CREATE TABLE IF NOT EXISTS otp_store_meta (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL
+        );
+        """)
+        self.conn.commit()
+
+    def _load_secret(self):
+        """HMAC key: OTP_HASH_SECRET, else one kept in the DB so hashes survive restarts."""
+        env_secret = os.getenv("OTP_HASH_SECRET")
+        if env_secret:
+            return env_secret.encode("utf-8")
+        if self.conn is None:
+            return secrets.token_bytes(32)
+        row = self.conn.execute("SELECT value FROM otp_store_meta WHERE key = 'hash_secret'").fetchone()
+        if row:
+            return bytes(row[0])
+        secret = secrets.token_bytes(32)
+        self.conn.execute("INSERT OR IGNORE INTO otp_store_meta (key, value) VALUES ('hash_secret', ?)", (secret,))
+        self.conn.commit()
+        # Another worker may have won the race; use whatever is stored
+        return bytes(self.conn.execute("SELECT value FROM otp_store_meta WHERE key = 'hash_secret'").fetchone()[0])
+
+    def _verify_persisted(self, contact_no, candidate, now):
+        """
+        verify() against the shared table. Every step is a conditional statement
+        on the stored row, so concurrent workers cannot both consume an OTP,
+        count attempts against a re-issued OTP, or exceed the attempt limit.
+        """
+        while True:
+            row = self.conn.execute(
+                "SELECT otp_hash, expires_at, attempts FROM otp_store WHERE contact_no = ?", (contact_no,)
+            ).fetchone()
+            if row is None:
+                return {"success": False, "reason": "not_found", "attempts_left": 0}
+
+            otp_hash, expires_at, attempts = bytes(row[0]), row[1], row[2]
+            if expires_at <= now:
+                self._delete_persisted(contact_no, otp_hash)
+                return {"success": False, "reason": "expired", "attempts_left": 0}
+            if attempts >= self.max_attempts:
+                self._delete_persisted(contact_no, otp_hash)
+                return {"success": False, "reason": "too_many_attempts", "attempts_left": 0}
+
+            if hmac.compare_digest(otp_hash, candidate):
+                consumed = self.conn.execute(
+                    """DELETE FROM otp_store
+                       WHERE contact_no = ? AND otp_hash = ? AND expires_at > ? AND attempts < ?""",
+                    (contact_no, otp_hash, now, self.max_attempts)
+                ).rowcount
+                self.conn.commit()
+                if consumed:
+                    return {"success": True, "reason": "verified", "attempts_left": self.max_attempts - attempts}
+                # Consumed, re-issued or locked out by another worker meanwhile
+                continue
+
+            counted = self.conn.execute(
+                """UPDATE otp_store SET attempts = attempts + 1
+                   WHERE contact_no = ? AND otp_hash = ? AND attempts < ?""",
+                (contact_no, otp_hash, self.max_attempts)
+            ).rowcount
+            self.conn.commit()
+            if not counted:
+                # Re-issued, consumed or locked out meanwhile; judge against the current row
+                continue
+
+            attempts = self.conn.execute(
+                "SELECT attempts FROM otp_store WHERE contact_no = ? AND otp_hash = ?", (contact_no, otp_hash)
+            ).fetchone()
+            attempts_left = self.max_attempts - (attempts[0] if attempts else self.max_attempts)
+            if attempts_left <= 0:
+                self._delete_persisted(contact_no, otp_hash)
+                return {"success": False, "reason": "too_many_attempts", "attempts_left": 0}
+            return {"success": False, "reason": "mismatch", "attempts_left": attempts_left}
+
+    def _delete_persisted(self, contact_no, otp_hash):
+        # Only the row that was judged; an OTP re-issued meanwhile survives
+        self.conn.execute("DELETE FROM otp_store WHERE contact_no = ? AND otp_hash = ?", (contact_no, otp_hash))
+        self.conn.commit()
+
+    def _persist(self, contact_no, otp_hash, expires_at, attempts):
+        if self.conn is None:
+            return
+        self.conn.execute(
+            """INSERT INTO otp_store (contact_no, otp_hash, expires_at, attempts) VALUES (?, ?, ?, ?)
+               ON CONFLICT(contact_no) DO UPDATE SET
+                   otp_hash = excluded.otp_hash, expires_at = excluded.expires_at, attempts = excluded.attempts""",
+            (contact_no, otp_hash, expires_at, attempts)
+        )
+        self.conn.commit()
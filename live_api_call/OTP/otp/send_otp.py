@@ -1,6 +1,7 @@
 import requests
 import random
 import datetime
+import json
 import os
 from dotenv import load_dotenv
 
@@ -16,15 +17,19 @@ SMS_FLASH = os.getenv("SMS_FLASH", "0")
 SMS_ROUTE = os.getenv("SMS_ROUTE", "1")
 SMS_ENTITY_ID = os.getenv("SMS_ENTITY_ID", "your_entity_id")
 SMS_DLT_TEMPLATE_ID = os.getenv("SMS_DLT_TEMPLATE_ID", "your_dlt_template_id")
+SMS_API_URL = os.getenv("SMS_API_URL", "https://www.smsgatewayhub.com/api/mt/SendSMS")
+SMS_TIMEOUT_SECONDS = float(os.getenv("SMS_TIMEOUT_SECONDS", "10"))
+
+# Reused across calls so the TLS connection to the gateway is kept alive
+_session = requests.Session()
 
 def generate_otp(length=6):
     """Generate a numeric OTP."""
     return ''.join([str(random.randint(0, 9)) for _ in range(length)])
 
-def send_sms(number, message):
-    """Send an SMS using SMSGatewayHub API."""
-    url = "https://www.smsgatewayhub.com/api/mt/SendSMS"
-    params = {
+def build_sms_params(number, message):
+    """Query parameters for one SMSGatewayHub SendSMS call."""
+    return {
         "APIKey": SMS_API_KEY,
         "senderid": SMS_SENDER_ID,
         "channel": SMS_CHANNEL,
@@ -37,27 +42,31 @@ def send_sms(number, message):
         "dlttemplateid": SMS_DLT_TEMPLATE_ID,
     }
 
-    response = requests.post(url, params=params)
-    
-    # Parse the JSON response
+def parse_sms_response(text):
+    """Turn a SMSGatewayHub response body into the send_sms result dict."""
     try:
-        response_data = response.json()
+        response_data = json.loads(text)
         return {
             "success": response_data.get("ErrorCode") == "000",  # "000" typically indicates success
-            "raw_response": response.text,
+            "raw_response": text,
             "error_code": response_data.get("ErrorCode"),
             "error_message": response_data.get("ErrorMessage"),
             "job_id": response_data.get("JobId")
         }
-    except ValueError:
+    except (ValueError, AttributeError):
         # If JSON parsing fails, treat as error
         return {
             "success": False,
-            "raw_response": response.text,
+            "raw_response": text,
             "error_code": None,
             "error_message": "Invalid API response format"
         }
 
+def send_sms(number, message):
+    """Send an SMS using SMSGatewayHub API."""
+    response = _session.post(SMS_API_URL, params=build_sms_params(number, message), timeout=SMS_TIMEOUT_SECONDS)
+    return parse_sms_response(response.text)
+
 def main():
     number = input("Enter phone number: ").strip()
     otp = generate_otp()
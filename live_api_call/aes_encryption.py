@@ -14,11 +14,190 @@ This implementation is based on the C# AES Encryption Logic provided,
 but adapted for Python using the cryptography library.
 """
 
-import base64
+import binascii
 import json
+from functools import lru_cache
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.backends import default_backend
 
+try:
+    # Optional: incremental JSON parser used for multi-MB jP_Response payloads
+    import ijson
+except ImportError:
+    ijson = None
+
+# Characters trimmed from decrypted output (C# TrimEnd("\r\n\0"))
+TRIM_END_BYTES = b'\r\n\0'
+
+# Read size used when feeding decrypted plaintext to the incremental parser
+STREAM_READ_SIZE = 64 * 1024
+
+# GCM Tag Length: 16 Bytes (appended to the ciphertext)
+GCM_TAG_LENGTH = 16
+
+
+class AESCipherContext:
+    """
+    Reusable AES-GCM cipher context for one 32-character key.
+
+    Key bytes, IV and the AESGCM object are derived once and shared by every
+    encrypt/decrypt call made with the same key. Obtain instances through
+    get_cipher_context() so they are cached per key.
+    """
+
+    def __init__(self, key):
+        """
+        Args:
+            key (str): 32-character dynamic key (256 bits)
+        """
+        self.key = key
+        self.secret_key = key.encode('utf-8')
+        self.iv = self.secret_key[:12]
+        self.aesgcm = AESGCM(self.secret_key)
+
+    def encrypt_bytes(self, plain_bytes):
+        """
+        Encrypt raw bytes and return the Base64 encoded ciphertext
+
+        Args:
+            plain_bytes (bytes | memoryview): Plain data to encrypt
+
+        Returns:
+            bytes: Base64 encoded ciphertext (ASCII)
+        """
+        encrypted_bytes = self.aesgcm.encrypt(self.iv, plain_bytes, None)
+        return binascii.b2a_base64(encrypted_bytes, newline=False)
+
+    def decrypt_bytes(self, encrypted_data):
+        """
+        Decrypt Base64 ciphertext without intermediate str copies
+
+        Args:
+            encrypted_data (str | bytes | memoryview): Base64 encoded ciphertext.
+                An ASCII str is accepted directly by binascii, so no encode copy is made.
+
+        Returns:
+            memoryview: Decrypted plaintext with trailing \r\n\0 trimmed
+        """
+        encrypted_bytes = binascii.a2b_base64(encrypted_data)
+        plain_bytes = self.aesgcm.decrypt(self.iv, encrypted_bytes, None)
+        del encrypted_bytes
+
+        end = len(plain_bytes)
+        while end and plain_bytes[end - 1] in TRIM_END_BYTES:
+            end -= 1
+        return memoryview(plain_bytes)[:end]
+
+
+class AESGCMStreamDecryptor:
+    """
+    Incremental AES-GCM decryptor for Base64 ciphertext arriving in chunks
+
+    Feed Base64 chunks to update() and receive plaintext as soon as it is
+    available; the last 16 bytes are held back as the GCM tag and verified by
+    finalize(). Plaintext released before finalize() is NOT yet authenticated,
+    so callers must be able to discard what they consumed when finalize()
+    raises cryptography.exceptions.InvalidTag.
+    """
+
+    def __init__(self, key):
+        """
+        Args:
+            key (str): 32-character dynamic key (256 bits)
+        """
+        context = get_cipher_context(key)
+        self.decryptor = Cipher(algorithms.AES(context.secret_key), modes.GCM(context.iv)).decryptor()
+        self.base64_pending = b''
+        self.cipher_pending = b''
+        self.plain_pending = b''
+
+    def update(self, base64_chunk):
+        """
+        Decrypt the next Base64 chunk
+
+        Args:
+            base64_chunk (bytes): Next slice of the Base64 ciphertext (any length)
+
+        Returns:
+            bytes: Plaintext decrypted so far (may be empty)
+        """
+        data = self.base64_pending + base64_chunk
+        usable = len(data) - (len(data) % 4)
+        self.base64_pending = data[usable:]
+        if not usable:
+            return b''
+
+        cipher_bytes = self.cipher_pending + binascii.a2b_base64(data[:usable])
+        # Hold back the trailing bytes that may turn out to be the GCM tag
+        self.cipher_pending = cipher_bytes[-GCM_TAG_LENGTH:]
+        plain_bytes = self.decryptor.update(cipher_bytes[:-GCM_TAG_LENGTH])
+        return self._release(plain_bytes)
+
+    def finalize(self):
+        """
+        Verify the GCM tag and return any remaining plaintext
+
+        Returns:
+            bytes: Remaining plaintext with trailing \r\n\0 trimmed
+
+        Raises:
+            ValueError: If the Base64 input or ciphertext is truncated
+            cryptography.exceptions.InvalidTag: If authentication fails
+        """
+        if self.base64_pending:
+            raise ValueError("Truncated Base64 ciphertext")
+        if len(self.cipher_pending) < GCM_TAG_LENGTH:
+            raise ValueError("Ciphertext shorter than the GCM tag")
+        self.decryptor.finalize_with_tag(self.cipher_pending)
+        return self.plain_pending.rstrip(TRIM_END_BYTES)
+
+    def _release(self, plain_bytes):
+        """Emit plaintext, keeping a trailing \r\n\0 run back until more data arrives"""
+        data = self.plain_pending + plain_bytes
+        end = len(data.rstrip(TRIM_END_BYTES))
+        self.plain_pending = data[end:]
+        return data[:end]
+
+
+@lru_cache(maxsize=16)
+def get_cipher_context(key):
+    """
+    Get the cached AESCipherContext for a key
+
+    Args:
+        key (str): 32-character dynamic key (256 bits)
+
+    Returns:
+        AESCipherContext: Cipher context shared by all callers using this key
+    """
+    return AESCipherContext(key)
+
+
+class _PlaintextReader:
+    """
+    Minimal file-like reader over a memoryview so the incremental parser can
+    consume decrypted plaintext in fixed-size reads instead of one full copy
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.position = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self.buffer) - self.position
+        chunk = self.buffer[self.position:self.position + size]
+        self.position += len(chunk)
+        return bytes(chunk)
+
+
+def _json_input(plain_view):
+    """Return an object json.loads() accepts, copying only when trimming was needed"""
+    if len(plain_view) == len(plain_view.obj):
+        return plain_view.obj
+    return plain_view.tobytes()
+
 
 class AESEncryption:
     """
@@ -63,28 +242,21 @@ class AESEncryption:
         encrypted_str = ""
         
         try:
-            # Convert key to bytes (equivalent to Encoding.UTF8.GetBytes(key))
-            secret_key = self.key.encode('utf-8')
-            
-            # Get IV from first 12 bytes of secret key
-            # Equivalent to: Encoding.UTF8.GetBytes(Encoding.UTF8.GetString(secretkey).Substring(0,12))
-            iv = secret_key[:12]
+            # Cached cipher context: key bytes, IV (first 12 bytes of secret key)
+            # and AESGCM cipher are derived once per key
+            # (equivalent to GcmBlockCipher cipher = new GcmBlockCipher(new AesEngine()))
+            context = get_cipher_context(self.key)
             
             # Convert plain text to bytes (equivalent to Encoding.UTF8.GetBytes(PlainText))
             plain_bytes = plain_text.encode('utf-8')
             
-            # Create AESGCM cipher (equivalent to GcmBlockCipher cipher = new GcmBlockCipher(new AesEngine()))
-            aesgcm = AESGCM(secret_key)
-            
-            # Encrypt the data with GCM mode
+            # Encrypt the data with GCM mode and convert to Base64
             # This combines the functionality of:
             # - AeadParameters parameters = new AeadParameters(new KeyParameter(key), 128, iv, null)
             # - cipher.Init(true, parameters)
             # - cipher.ProcessBytes(...) and cipher.DoFinal(...)
-            encrypted_bytes = aesgcm.encrypt(iv, plain_bytes, None)
-            
-            # Convert to Base64 string (equivalent to Convert.ToBase64String(encryptedBytes, Base64FormattingOptions.None))
-            encrypted_str = base64.b64encode(encrypted_bytes).decode('utf-8')
+            # - Convert.ToBase64String(encryptedBytes, Base64FormattingOptions.None)
+            encrypted_str = context.encrypt_bytes(plain_bytes).decode('ascii')
             
         except Exception as ex:
             print(f"AES Encryption Error: {str(ex)}")
@@ -110,27 +282,20 @@ class AESEncryption:
         decrypted_str = ""
         
         try:
-            # Convert key to bytes (equivalent to Encoding.UTF8.GetBytes(key))
-            secret_key = self.key.encode('utf-8')
-            
-            # Get IV from first 12 bytes of secret key
-            iv = secret_key[:12]
+            # Cached cipher context for this key
+            context = get_cipher_context(self.key)
             
-            # Convert Base64 encrypted text to bytes (equivalent to Convert.FromBase64String(EncryptedText))
-            encrypted_bytes = base64.b64decode(encrypted_text)
-            
-            # Create AESGCM cipher (equivalent to GcmBlockCipher cipher = new GcmBlockCipher(new AesEngine()))
-            aesgcm = AESGCM(secret_key)
-            
-            # Decrypt the data
+            # Base64 decode and decrypt the data
             # This combines the functionality of:
+            # - Convert.FromBase64String(EncryptedText)
             # - AeadParameters parameters = new AeadParameters(new KeyParameter(key), 128, iv, null)
             # - cipher.Init(false, parameters)
             # - cipher.ProcessBytes(...) and cipher.DoFinal(...)
-            plain_bytes = aesgcm.decrypt(iv, encrypted_bytes, None)
+            # - TrimEnd("\r\n\0".ToCharArray())
+            plain_view = context.decrypt_bytes(encrypted_text)
             
-            # Convert to string and trim (equivalent to Encoding.UTF8.GetString(plainBytes).TrimEnd("\r\n\0".ToCharArray()))
-            decrypted_str = plain_bytes.decode('utf-8').rstrip('\r\n\0')
+            # Convert to string (equivalent to Encoding.UTF8.GetString(plainBytes))
+            decrypted_str = str(plain_view, 'utf-8')
             
         except Exception as ex:
             print(f"AES Decryption Error: {str(ex)}")
@@ -196,13 +361,53 @@ def decrypt_json_data(encrypted_data, key):
     Returns:
         dict: Decrypted JSON data
     """
-    decrypted_str = aes_decrypt(encrypted_data, key)
     try:
-        return json.loads(decrypted_str)
-    except json.JSONDecodeError:
+        plain_view = get_cipher_context(key).decrypt_bytes(encrypted_data)
+    except Exception as ex:
+        print(f"AES Decryption Error: {str(ex)}")
+        return None
+    
+    # json.loads() decodes UTF-8 bytes itself, so no intermediate str is built
+    try:
+        return json.loads(_json_input(plain_view))
+    except (json.JSONDecodeError, UnicodeDecodeError):
         return None
 
 
+def decrypt_json_stream(encrypted_data, key, prefix='data.item'):
+    """
+    Decrypt a JSON payload and yield the items under `prefix` one at a time
+    
+    The decrypted plaintext buffer is handed straight to ijson, so large
+    jP_Response payloads are never materialised as a str or a full Python
+    object tree. Without ijson installed the whole document is parsed with
+    json.loads() and the items are yielded from it.
+    
+    Args:
+        encrypted_data (str | bytes | memoryview): Base64 encoded encrypted data
+        key (str): The 32-character AES key
+        prefix (str): ijson prefix of the items to yield ('data.item' for the
+            records of a JP report, 'item' for a top-level list)
+        
+    Yields:
+        dict: One decoded item per record
+    """
+    plain_view = get_cipher_context(key).decrypt_bytes(encrypted_data)
+    
+    if ijson is not None:
+        yield from ijson.items(_PlaintextReader(plain_view), prefix, use_float=True)
+        return
+    
+    document = json.loads(_json_input(plain_view))
+    del plain_view
+    for part in prefix.split('.'):
+        if part == 'item':
+            break
+        document = document.get(part, []) if isinstance(document, dict) else []
+    if isinstance(document, list):
+        yield from document
+
+
 def demo():
     """
     Demonstration of AES encryption/decryption functionality
@@ -340,10 +340,13 @@
 
 from flask import Flask, request, jsonify
 from datetime import datetime
+import os
 import requests
 import json
 from hash_creation import generate_access_token
 from aes_encryption import encrypt_json_data, decrypt_json_data
+from report_loader import load_report_into_db, DEFAULT_DB_PATH
+import sqlite3
 
 app = Flask(__name__)
 
@@ -351,8 +354,10 @@ app = Flask(__name__)
 USERNAME = "UserJP"
 PLAIN_PASSWORD = "29#@JP25bhaV"
 PWD_SECRET_KEY = "bam5kllfzjzvjv560s5q24fnwbtqs50d"
-AUTH_URL = "https://ipension.nic.in/JPWrapper/api/Auth"
-REPORT_URL = "https://ipension.nic.in/JPWrapper/api/Broker/Report"
+# Point JP_BASE_URL at mock_jp_server.py (e.g. http://127.0.0.1:5050) for local load tests
+JP_BASE_URL = os.getenv("JP_BASE_URL", "https://ipension.nic.in")
+AUTH_URL = f"{JP_BASE_URL}/JPWrapper/api/Auth"
+REPORT_URL = f"{JP_BASE_URL}/JPWrapper/api/Broker/Report"
 AES_KEY = "3sw6dmhh2vsrjpo5ba36myv6qt5j20fd"
 
 def authenticate():
@@ -609,6 +614,54 @@ def get_pensioner_report():
             "timestamp": datetime.now().isoformat()
         }), 500
 
+@app.route('/pensioner-report/load', methods=['POST'])
+def load_pensioner_report():
+    """
+    Fetch-and-load endpoint: streams the decrypted report for a date straight
+    into pensioners_live_data (PENSIONER_DB_PATH) instead of returning it
+    
+    POST: Pass date in JSON body {"date": "2025-09-21"}
+    
+    Returns:
+        JSON response with fetch_id and record count or error information
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        date_str = data.get('date')
+        
+        if not date_str or not validate_date_format(date_str):
+            return jsonify({
+                "success": False,
+                "error": "Date parameter is required in yyyy-MM-dd format",
+                "example": '{"date": "2025-09-21"}'
+            }), 400
+        
+        jwt_token = authenticate()
+        if not jwt_token:
+            return jsonify({
+                "success": False,
+                "error": "Authentication failed",
+                "details": "Unable to obtain JWT token from JP API"
+            }), 500
+        
+        conn = sqlite3.connect(DEFAULT_DB_PATH)
+        try:
+            load_result = load_report_into_db(conn, jwt_token, date_str, REPORT_URL, AES_KEY)
+        finally:
+            conn.close()
+        
+        load_result["date"] = date_str
+        return jsonify(load_result), (200 if load_result["success"] else 500)
+        
+    except Exception as e:
+        print(f"❌ Endpoint error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": "Internal server error",
+            "details": str(e),
+            "timestamp": datetime.now().isoformat()
+        }), 500
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -639,6 +692,13 @@ def api_info():
                 },
                 "example": '{"date": "2025-09-21"}'
             },
+            "POST /pensioner-report/load": {
+                "description": "Fetch a report and stream it into pensioners_live_data",
+                "body": {
+                    "date": "Date in yyyy-MM-dd format"
+                },
+                "example": '{"date": "2025-09-21"}'
+            },
             "GET /health": "Health check endpoint"
         },
         "timestamp": datetime.now().isoformat()
@@ -654,7 +714,8 @@ def not_found(error):
             "GET /",
             "GET /health",
             "GET /pensioner-report?date=yyyy-MM-dd",
-            "POST /pensioner-report"
+            "POST /pensioner-report",
+            "POST /pensioner-report/load"
         ]
     }), 404
 
@@ -677,6 +738,7 @@ if __name__ == '__main__':
     print("- GET  /health               - Health check")
     print("- GET  /pensioner-report     - Fetch report (date as query param)")
     print("- POST /pensioner-report     - Fetch report (date in JSON body)")
+    print("- POST /pensioner-report/load - Fetch report into pensioners_live_data")
     print("="*60)
     print("Example usage:")
     print("GET  http://localhost:5000/pensioner-report?date=2025-09-21")
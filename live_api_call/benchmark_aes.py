@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+AES-GCM Decrypt Benchmark for Jeevan Pramaan report payloads
+
+Compares the legacy decrypt path (base64 str -> new AESGCM -> str -> json.loads)
+with the cached cipher context paths from aes_encryption.py:
+
+➢ legacy   : per-call AESGCM, str decode and rstrip, json.loads
+➢ bytes    : decrypt_json_data() - cached context, bytes-only, json.loads
+➢ stream   : decrypt_json_stream() - cached context, incremental parser
+
+Throughput is reported in MB/s of plaintext JSON, peak memory is the
+tracemalloc peak above the baseline held by the encrypted payload itself.
+
+Usage:
+    python benchmark_aes.py                  # 10, 100 and 500 MB payloads
+    python benchmark_aes.py --sizes 10 50    # custom sizes in MB
+"""
+
+import argparse
+import base64
+import gc
+import json
+import time
+import tracemalloc
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from aes_encryption import ijson, get_cipher_context, decrypt_json_data, decrypt_json_stream
+
+AES_KEY = "3sw6dmhh2vsrjpo5ba36myv6qt5j20fd"
+
+# Record shape matches DLCServer/db-scripts/sample-data-from-jeevan-praman.json
+RECORD_TEMPLATE = {
+    "PPO": "",
+    "central_govt_pensioner_type": "Defence - PCDA (P) Allahabad",
+    "disbursing_agency": "SPARSH - PCDA (Pensions) Allahabad",
+    "disbursing_authority": "SPARSH - PCDA (Pensions) Allahabad",
+    "pensioner_DLC_type": "P",
+    "pensioner_YearOfBirth": "1951",
+    "pensioner_district": "Ghazipur",
+    "pensioner_pin": "275203",
+    "pensioner_state": "Uttar Pradesh",
+    "type_of_pensioner": "Central Government"
+}
+
+
+def build_payload(size_mb):
+    """
+    Build an encrypted jP_Response string of roughly size_mb of plaintext JSON
+
+    Returns:
+        tuple: (encrypted Base64 str, plaintext size in bytes, record count)
+    """
+    record_json = json.dumps(RECORD_TEMPLATE, separators=(',', ':'))
+    head, tail = record_json.split('"PPO":""', 1)
+    record_size = len(record_json) + 12
+    record_count = max(1, (size_mb * 1024 * 1024) // record_size)
+
+    parts = [b'{"date":"2024-11-05","data":[']
+    for index in range(record_count):
+        if index:
+            parts.append(b',')
+        parts.append(f'{head}"PPO":"{index:012d}"{tail}'.encode('utf-8'))
+    parts.append(b']}')
+    plain_bytes = b''.join(parts)
+    del parts
+
+    encrypted = get_cipher_context(AES_KEY).encrypt_bytes(plain_bytes).decode('ascii')
+    plain_size = len(plain_bytes)
+    del plain_bytes
+    return encrypted, plain_size, record_count
+
+
+def legacy_decrypt(encrypted_data, key):
+    """Decrypt path as it was before the cached cipher context"""
+    secret_key = key.encode('utf-8')
+    aesgcm = AESGCM(secret_key)
+    plain_bytes = aesgcm.decrypt(secret_key[:12], base64.b64decode(encrypted_data), None)
+    decrypted_str = plain_bytes.decode('utf-8').rstrip('\r\n\0')
+    return json.loads(decrypted_str)
+
+
+def run_legacy(encrypted):
+    return len(legacy_decrypt(encrypted, AES_KEY)["data"])
+
+
+def run_bytes(encrypted):
+    return len(decrypt_json_data(encrypted, AES_KEY)["data"])
+
+
+def run_stream(encrypted):
+    count = 0
+    for _ in decrypt_json_stream(encrypted, AES_KEY):
+        count += 1
+    return count
+
+
+def measure(func, encrypted):
+    """
+    Run one decrypt path and measure wall time and peak traced memory
+
+    Returns:
+        tuple: (records decoded, seconds, peak bytes above baseline)
+    """
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    start_time = time.perf_counter()
+    records = func(encrypted)
+    duration = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    return records, duration, peak - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AES-GCM decrypt paths for JP report payloads")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500],
+                        help="Plaintext payload sizes in MB (default: 10 100 500)")
+    args = parser.parse_args()
+
+    paths = [
+        ("legacy", run_legacy),
+        ("bytes", run_bytes),
+        ("stream", run_stream),
+    ]
+
+    print("=" * 80)
+    print("AES-GCM DECRYPT BENCHMARK")
+    print("=" * 80)
+    print(f"Incremental parser: {'ijson ' + ijson.backend if ijson else 'not installed (json.loads fallback)'}")
+    print()
+    print(f"{'Size':>8} {'Path':<8} {'Records':>10} {'Seconds':>9} {'MB/s':>9} {'Peak MB':>9}")
+    print("-" * 80)
+
+    for size_mb in args.sizes:
+        encrypted, plain_size, record_count = build_payload(size_mb)
+        plain_mb = plain_size / (1024 * 1024)
+
+        for name, func in paths:
+            records, duration, peak = measure(func, encrypted)
+            if records != record_count:
+                print(f"❌ {name}: decoded {records} records, expected {record_count}")
+            print(f"{size_mb:>6}MB {name:<8} {records:>10,} {duration:>9.2f} "
+                  f"{plain_mb / duration:>9.1f} {peak / (1024 * 1024):>9.1f}")
+
+        del encrypted
+        gc.collect()
+        print("-" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Latency/Throughput Benchmark for the Pensioner Report proxy
+
+Fires concurrent requests at the proxy (auth_api_call.py) or directly at the
+JPWrapper API and reports p50/p95/p99 latency, requests/sec and error counts.
+Meant to be run against mock_jp_server.py:
+
+    python mock_jp_server.py --port 5050 --records 20000 --latency-ms 150
+    JP_BASE_URL=http://127.0.0.1:5050 python auth_api_call.py
+    python benchmark_jp_proxy.py --requests 200 --concurrency 1 4 16
+
+Use --target jp to skip the proxy and exercise the Auth + Report endpoints directly.
+"""
+
+import argparse
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from hash_creation import generate_access_token
+from aes_encryption import encrypt_json_data, decrypt_json_data
+
+USERNAME = "UserJP"
+PLAIN_PASSWORD = "29#@JP25bhaV"
+PWD_SECRET_KEY = "bam5kllfzjzvjv560s5q24fnwbtqs50d"
+AES_KEY = "3sw6dmhh2vsrjpo5ba36myv6qt5j20fd"
+
+PROXY_URL = os.getenv("PROXY_URL", "http://127.0.0.1:5000/pensioner-report")
+JP_BASE_URL = os.getenv("JP_BASE_URL", "http://127.0.0.1:5050")
+
+_thread_local = threading.local()
+
+
+def get_session():
+    """One pooled HTTP session per worker thread"""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        _thread_local.session = session
+    return session
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def call_proxy(report_date, timeout):
+    """
+    One GET /pensioner-report call through the proxy
+
+    Returns:
+        str: Outcome label ("ok", "http_<status>", "error_<code>" or exception name)
+    """
+    response = get_session().get(PROXY_URL, params={"date": report_date}, timeout=timeout)
+    if response.status_code != 200:
+        return f"http_{response.status_code}"
+    body = response.json()
+    data = body.get("data")
+    if isinstance(data, dict) and data.get("errorCode"):
+        return f"error_{data['errorCode']}"
+    return "ok"
+
+
+def call_jp(report_date, timeout):
+    """One Auth + Report round trip straight against the JPWrapper endpoints"""
+    session = get_session()
+    auth_data = generate_access_token(USERNAME, PLAIN_PASSWORD, PWD_SECRET_KEY)
+    payload = {
+        "UserName": auth_data["Username"],
+        "TS": auth_data["Timestamp"],
+        "AccessToken": auth_data["AccessToken"]
+    }
+    response = session.post(f"{JP_BASE_URL}/JPWrapper/api/Auth", json=payload, timeout=timeout)
+    if response.status_code != 200:
+        return f"auth_http_{response.status_code}"
+    token = response.json().get("Token")
+
+    response = session.post(
+        f"{JP_BASE_URL}/JPWrapper/api/Broker/Report",
+        json={"JP_Request": encrypt_json_data({"date": report_date}, AES_KEY)},
+        headers={'Authorization': f'Bearer {token}'},
+        timeout=timeout
+    )
+    if response.status_code != 200:
+        return f"http_{response.status_code}"
+    body = response.json()
+    if body.get("errorCode"):
+        return f"error_{body['errorCode']}"
+    if decrypt_json_data(body.get("jP_Response") or "", AES_KEY) is None:
+        return "decrypt_failed"
+    return "ok"
+
+
+def run_level(call, total_requests, concurrency, report_date, timeout):
+    """
+    Run total_requests calls with the given concurrency
+
+    Returns:
+        dict: latencies (seconds, sorted), outcomes Counter and wall time
+    """
+    latencies = []
+    outcomes = Counter()
+    lock = threading.Lock()
+
+    def worker(_):
+        start_time = time.perf_counter()
+        try:
+            outcome = call(report_date, timeout)
+        except requests.exceptions.RequestException as e:
+            outcome = type(e).__name__
+        elapsed = time.perf_counter() - start_time
+        with lock:
+            latencies.append(elapsed)
+            outcomes[outcome] += 1
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(total_requests)))
+    wall_time = time.perf_counter() - wall_start
+
+    return {"latencies": sorted(latencies), "outcomes": outcomes, "wall_time": wall_time}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pensioner report proxy under concurrency")
+    parser.add_argument("--target", choices=["proxy", "jp"], default="proxy",
+                        help="proxy: auth_api_call.py /pensioner-report, jp: JPWrapper endpoints directly")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16],
+                        help="Concurrency levels to run (default: 1 4 16)")
+    parser.add_argument("--date", default="2024-11-05", help="Report date (yyyy-MM-dd)")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-request timeout in seconds")
+    args = parser.parse_args()
+
+    call = call_proxy if args.target == "proxy" else call_jp
+
+    print("=" * 80)
+    print("PENSIONER REPORT PROXY BENCHMARK")
+    print("=" * 80)
+    print(f"Target: {PROXY_URL if args.target == 'proxy' else JP_BASE_URL}")
+    print(f"Requests per level: {args.requests}")
+    print()
+    print(f"{'Conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'ok':>6} {'failed':>7}")
+    print("-" * 80)
+
+    for concurrency in args.concurrency:
+        result = run_level(call, args.requests, concurrency, args.date, args.timeout)
+        latencies = result["latencies"]
+        outcomes = result["outcomes"]
+        ok = outcomes.get("ok", 0)
+        print(f"{concurrency:>5} {len(latencies) / result['wall_time']:>9.1f} "
+              f"{percentile(latencies, 50) * 1000:>9.1f} {percentile(latencies, 95) * 1000:>9.1f} "
+              f"{percentile(latencies, 99) * 1000:>9.1f} {latencies[-1] * 1000:>9.1f} "
+              f"{ok:>6} {len(latencies) - ok:>7}")
+        failures = {k: v for k, v in outcomes.items() if k != "ok"}
+        if failures:
+            print(f"      failures: {failures}")
+
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,13 +7,11 @@ def compute_sha256_hash(input_string: str) -> str:
     return sha256_hash.lower()  # ensure lowercase hex, like C#
 
 
-def generate_access_token(username: str, plain_password: str, pwd_secret_key: str):
+def compute_access_token(plain_password: str, timestamp: str, pwd_secret_key: str) -> str:
+    """AccessToken for a given yyyyMMddHHmmss timestamp (used by clients and the mock server)."""
     # Step 1: Compute SHA256 hash of plain password
     step1 = compute_sha256_hash(plain_password)
 
-    # Step 2: Generate timestamp in C# format (yyyyMMddHHmmss, UTC)
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
-
     # Step 3: Concatenate Step1 + Timestamp
     step3 = step1 + timestamp
 
@@ -24,7 +22,15 @@ def generate_access_token(username: str, plain_password: str, pwd_secret_key: st
     step5 = step4 + pwd_secret_key
 
     # Step 6: Compute SHA256 hash of Step5 → Final AccessToken
-    access_token = compute_sha256_hash(step5)
+    return compute_sha256_hash(step5)
+
+
+def generate_access_token(username: str, plain_password: str, pwd_secret_key: str):
+    # Step 2: Generate timestamp in C# format (yyyyMMddHHmmss, UTC)
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+
+    # Steps 1 and 3-6: hash chain over password, timestamp and secret key
+    access_token = compute_access_token(plain_password, timestamp, pwd_secret_key)
 
     return {
         "Username": username,
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Local Mock Jeevan Pramaan (JPWrapper) Server
+
+Stand-in for https://ipension.nic.in, which is IP-whitelisted, so the proxy
+(auth_api_call.py) and the diagnostic scripts can be load-tested locally.
+
+➢ POST /JPWrapper/api/Auth          : validates the SHA-256 AccessToken scheme from hash_creation.py
+➢ POST /JPWrapper/api/Broker/Report : expects a Bearer token and an AES-256-GCM JP_Request,
+                                      answers with an AES-256-GCM jP_Response
+
+Payload size, latency and error injection are configurable from the command line.
+
+Usage:
+    python mock_jp_server.py --port 5050 --records 50000 --latency-ms 200 --error-rate 0.05
+    JP_BASE_URL=http://127.0.0.1:5050 python auth_api_call.py
+"""
+
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import Flask, request, jsonify, Response
+
+from hash_creation import compute_access_token
+from aes_encryption import get_cipher_context, decrypt_json_data
+
+app = Flask(__name__)
+
+# Credentials must match the client configuration in auth_api_call.py
+USERNAME = "UserJP"
+PLAIN_PASSWORD = "29#@JP25bhaV"
+PWD_SECRET_KEY = "bam5kllfzjzvjv560s5q24fnwbtqs50d"
+AES_KEY = "3sw6dmhh2vsrjpo5ba36myv6qt5j20fd"
+
+# Allowed clock skew between the client TS and the server, in seconds
+TIMESTAMP_TOLERANCE_SECONDS = 300
+
+# Runtime configuration, overwritten from the command line in main()
+CONFIG = {
+    "records": 1000,
+    "payload_mb": None,
+    "latency_ms": 0,
+    "latency_jitter_ms": 0,
+    "error_rate": 0.0,
+    "error_code": "BHJP106",
+    "http_error_rate": 0.0,
+    "auth_error_rate": 0.0,
+    "token_ttl_seconds": 3600,
+}
+
+STATES = [
+    ("Uttar Pradesh", "Ghazipur", "275203"),
+    ("Tamil Nadu", "Coimbatore", "641201"),
+    ("Maharashtra", "Pune", "411001"),
+    ("West Bengal", "Kolkata", "700001"),
+    ("Punjab", "Ludhiana", "141001"),
+]
+
+AGENCIES = [
+    ("Central Government", "Defence - PCDA (P) Allahabad", "SPARSH - PCDA (Pensions) Allahabad"),
+    ("Others", "Banking Staff", "Indian Overseas Bank"),
+    ("Central Government", "Civil", "State Bank of India"),
+]
+
+_tokens = {}
+_tokens_lock = threading.Lock()
+_payload_cache = {}
+_payload_lock = threading.Lock()
+
+
+def record_count():
+    """Number of records per report, derived from --payload-mb when given"""
+    if CONFIG["payload_mb"]:
+        # ~330 bytes of compact JSON per generated record
+        return max(1, int(CONFIG["payload_mb"] * 1024 * 1024 / 330))
+    return CONFIG["records"]
+
+
+def build_report(report_date, count):
+    """
+    Build the plain report JSON (same shape as sample-data-from-jeevan-praman.json)
+
+    Returns:
+        bytes: Compact UTF-8 JSON document
+    """
+    rng = random.Random(report_date)
+    records = []
+    for index in range(count):
+        state, district, pin = STATES[index % len(STATES)]
+        pensioner_type, subtype, agency = AGENCIES[index % len(AGENCIES)]
+        records.append({
+            "PPO": f"{index:012d}",
+            "central_govt_pensioner_type": subtype,
+            "disbursing_agency": agency,
+            "disbursing_authority": agency,
+            "pensioner_DLC_type": rng.choice("PF"),
+            "pensioner_YearOfBirth": str(rng.randint(1930, 1965)),
+            "pensioner_district": district,
+            "pensioner_pin": pin,
+            "pensioner_state": state,
+            "type_of_pensioner": pensioner_type
+        })
+    return json.dumps({"date": report_date, "data": records}, separators=(',', ':')).encode('utf-8')
+
+
+def encrypted_report(report_date):
+    """Encrypted jP_Response for a date, generated once per (date, size) and cached"""
+    count = record_count()
+    cache_key = (report_date, count)
+    with _payload_lock:
+        payload = _payload_cache.get(cache_key)
+        if payload is None:
+            payload = get_cipher_context(AES_KEY).encrypt_bytes(build_report(report_date, count))
+            _payload_cache.clear()
+            _payload_cache[cache_key] = payload
+    return payload
+
+
+def inject_latency():
+    """Sleep for the configured latency plus random jitter"""
+    delay_ms = CONFIG["latency_ms"]
+    if CONFIG["latency_jitter_ms"]:
+        delay_ms += random.uniform(0, CONFIG["latency_jitter_ms"])
+    if delay_ms > 0:
+        time.sleep(delay_ms / 1000.0)
+
+
+def validate_timestamp(timestamp):
+    """Check TS is yyyyMMddHHmmss (UTC) and within the allowed clock skew"""
+    try:
+        ts = datetime.strptime(timestamp, "%Y%m%d%H%M%S").replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return False
+    return abs((datetime.now(timezone.utc) - ts).total_seconds()) <= TIMESTAMP_TOLERANCE_SECONDS
+
+
+def issue_token():
+    """Create a bearer token valid for token_ttl_seconds"""
+    token = secrets.token_urlsafe(48)
+    with _tokens_lock:
+        now = time.time()
+        for expired in [t for t, expires_at in _tokens.items() if expires_at < now]:
+            del _tokens[expired]
+        _tokens[token] = now + CONFIG["token_ttl_seconds"]
+    return token
+
+
+def token_is_valid(auth_header):
+    """Validate an 'Authorization: Bearer <token>' header"""
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return False
+    with _tokens_lock:
+        expires_at = _tokens.get(auth_header[len("Bearer "):])
+    return expires_at is not None and expires_at >= time.time()
+
+
+@app.route('/JPWrapper/api/Auth', methods=['POST'])
+def auth():
+    """
+    Mock authentication endpoint
+
+    Accepts both payload spellings used by the clients:
+    {"UserName", "TS", "AccessToken"} and {"Username", "Timestamp", "AccessToken"}
+    """
+    inject_latency()
+
+    if random.random() < CONFIG["auth_error_rate"]:
+        return jsonify({"errorCode": CONFIG["error_code"], "errorMessage": "Injected auth error"}), 500
+
+    data = request.get_json(silent=True) or {}
+    username = data.get("UserName") or data.get("Username")
+    timestamp = data.get("TS") or data.get("Timestamp")
+    access_token = data.get("AccessToken")
+
+    if username != USERNAME or not validate_timestamp(timestamp):
+        return jsonify({"errorMessage": "Invalid username or timestamp"}), 401
+
+    expected_token = compute_access_token(PLAIN_PASSWORD, timestamp, PWD_SECRET_KEY)
+    if not access_token or not secrets.compare_digest(str(access_token).encode('utf-8'), expected_token.encode('utf-8')):
+        return jsonify({"errorMessage": "Invalid access token"}), 401
+
+    return jsonify({"Token": issue_token()})
+
+
+@app.route('/JPWrapper/api/Broker/Report', methods=['POST'])
+def report():
+    """Mock report endpoint returning an AES-256-GCM encrypted jP_Response"""
+    inject_latency()
+
+    if not token_is_valid(request.headers.get('Authorization')):
+        return jsonify({"errorMessage": "Invalid or expired token"}), 401
+
+    if random.random() < CONFIG["http_error_rate"]:
+        return jsonify({"errorCode": CONFIG["error_code"], "errorMessage": "Injected server error"}), 500
+
+    data = request.get_json(silent=True) or {}
+    plain_request = decrypt_json_data(data.get("JP_Request") or "", AES_KEY)
+    if not isinstance(plain_request, dict) or not plain_request.get("date"):
+        return jsonify({"errorMessage": "Unable to decrypt JP_Request"}), 400
+
+    if random.random() < CONFIG["error_rate"]:
+        # JP reports business errors with HTTP 200 and an errorCode body
+        return jsonify({"errorCode": CONFIG["error_code"], "errorMessage": "Injected report error"})
+
+    payload = encrypted_report(plain_request["date"])
+    body = b'{"jP_Response":"' + payload + b'"}'
+    return Response(body, mimetype='application/json')
+
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint"""
+    return jsonify({
+        "status": "healthy",
+        "service": "Mock JPWrapper API",
+        "config": CONFIG,
+        "timestamp": datetime.now().isoformat()
+    })
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local mock Jeevan Pramaan JPWrapper server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5050)
+    parser.add_argument("--records", type=int, default=CONFIG["records"],
+                        help="Records per report response")
+    parser.add_argument("--payload-mb", type=float, default=None,
+                        help="Approximate plaintext report size in MB (overrides --records)")
+    parser.add_argument("--latency-ms", type=float, default=0,
+                        help="Fixed latency added to every response")
+    parser.add_argument("--latency-jitter-ms", type=float, default=0,
+                        help="Random extra latency, uniform in [0, jitter]")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of report calls answered with an errorCode body")
+    parser.add_argument("--error-code", default=CONFIG["error_code"],
+                        help="errorCode returned by injected errors")
+    parser.add_argument("--http-error-rate", type=float, default=0.0,
+                        help="Fraction of report calls answered with HTTP 500")
+    parser.add_argument("--auth-error-rate", type=float, default=0.0,
+                        help="Fraction of auth calls answered with HTTP 500")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    CONFIG.update({
+        "records": args.records,
+        "payload_mb": args.payload_mb,
+        "latency_ms": args.latency_ms,
+        "latency_jitter_ms": args.latency_jitter_ms,
+        "error_rate": args.error_rate,
+        "error_code": args.error_code,
+        "http_error_rate": args.http_error_rate,
+        "auth_error_rate": args.auth_error_rate,
+    })
+
+    print("=" * 60)
+    print("MOCK JEEVAN PRAMAAN SERVER")
+    print("=" * 60)
+    print(f"Records per report: {record_count():,}")
+    print(f"Latency: {args.latency_ms}ms (+ up to {args.latency_jitter_ms}ms jitter)")
+    print(f"Error rates: report={args.error_rate} http={args.http_error_rate} auth={args.auth_error_rate}")
+    print(f"Point clients at: JP_BASE_URL=http://{args.host}:{args.port}")
+    print("=" * 60)
+
+    app.run(host=args.host, port=args.port, debug=False, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
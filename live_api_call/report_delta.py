@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Change-Data-Capture for consecutive Jeevan Pramaan reports
+
+Daily reports re-send largely the same PPO population. In delta mode the
+records of a fetch are fingerprinted (PPO + normalized fields) and staged in
+a connection-local TEMP table; once the fetch is authenticated they are
+compared against the materialized current state in a few set-based
+statements:
+
+➢ pensioners_live_changes : compact change log (new / changed / removed per fetch)
+➢ pensioners_live_current : one row per PPO, updated only from the deltas
+
+Only new, changed and disappeared PPOs touch the main database file, and
+all_pensioners.LC_date is only written for PPOs that are new in this fetch.
+"""
+
+import hashlib
+
+from report_loader import COLUMN_MAPPING
+
+# pensioners_live_data column names in COLUMN_MAPPING order
+DELTA_COLUMNS = list(COLUMN_MAPPING.values())
+DELTA_FIELDS = list(COLUMN_MAPPING)
+FIELD_SEPARATOR = '\x1f'
+
+
+def create_delta_tables(conn):
+    """Create the change log and current-state tables if missing"""
+    value_columns = ",\n        ".join(f"{column} TEXT" for column in DELTA_COLUMNS if column != "PPO")
+    conn.executescript(f"""
+    CREATE TABLE IF NOT EXISTS pensioners_live_current (
+        PPO TEXT PRIMARY KEY,
+        fingerprint TEXT NOT NULL,
+        {value_columns},
+        first_seen_fetch_id INTEGER NOT NULL,
+        last_changed_fetch_id INTEGER NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS pensioners_live_changes (
+        change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        fetch_id INTEGER NOT NULL REFERENCES api_fetch_status(fetch_id),
+        PPO TEXT NOT NULL,
+        change_type TEXT NOT NULL CHECK (change_type IN ('new', 'changed', 'removed')),
+        fingerprint TEXT,
+        {value_columns}
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_pensioners_live_changes_fetch
+        ON pensioners_live_changes(fetch_id, change_type);
+    """)
+    conn.commit()
+
+
+def normalize_value(value):
+    """Trim, collapse internal whitespace and casefold a field for fingerprinting"""
+    if value is None:
+        return ''
+    return ' '.join(str(value).split()).casefold()
+
+
+def record_fingerprint(record):
+    """
+    Fingerprint of a JP record over PPO and all normalized fields
+
+    Returns:
+        str: 32-character hex digest (BLAKE2b, 16 bytes)
+    """
+    joined = FIELD_SEPARATOR.join(normalize_value(record.get(field)) for field in DELTA_FIELDS)
+    return hashlib.blake2b(joined.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def begin_staging(conn):
+    """Create the TEMP staging table for one fetch (kept out of the main DB file)"""
+    columns = ", ".join(f"{column} TEXT" for column in DELTA_COLUMNS if column != "PPO")
+    conn.execute("DROP TABLE IF EXISTS temp.live_stage")
+    conn.execute(f"CREATE TEMP TABLE live_stage (PPO TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, {columns})")
+
+
+def stage_batch(conn, records):
+    """
+    Stage one batch of records; a PPO repeated within a fetch keeps its last version
+
+    Returns:
+        int: Records staged (records without a PPO are skipped)
+    """
+    rows = []
+    for record in records:
+        ppo = normalize_value(record.get("PPO"))
+        if not ppo:
+            continue
+        rows.append(
+            (str(record.get("PPO")).strip(), record_fingerprint(record))
+            + tuple(record.get(field) for field in DELTA_FIELDS if field != "PPO")
+        )
+    conn.executemany(
+        f"INSERT OR REPLACE INTO temp.live_stage (PPO, fingerprint, "
+        f"{', '.join(c for c in DELTA_COLUMNS if c != 'PPO')}) "
+        f"VALUES ({', '.join('?' * (len(DELTA_COLUMNS) + 1))})",
+        rows
+    )
+    return len(rows)
+
+
+def apply_deltas(conn, fetch_id, report_date):
+    """
+    Diff the staged fetch against pensioners_live_current and apply the deltas
+
+    Args:
+        conn (sqlite3.Connection): Target database with live_stage populated
+        fetch_id (int): api_fetch_status row of this fetch
+        report_date (str): Date in format yyyy-MM-dd, written to all_pensioners.LC_date
+
+    Returns:
+        dict: Counts of new, changed, removed and unchanged PPOs
+    """
+    value_columns = [c for c in DELTA_COLUMNS if c != "PPO"]
+    columns_sql = ", ".join(value_columns)
+    staged = conn.execute("SELECT COUNT(*) FROM temp.live_stage").fetchone()[0]
+
+    with conn:
+        conn.execute(f"""
+            INSERT INTO pensioners_live_changes (fetch_id, PPO, change_type, fingerprint, {columns_sql})
+            SELECT ?, s.PPO, CASE WHEN c.PPO IS NULL THEN 'new' ELSE 'changed' END,
+                   s.fingerprint, {', '.join('s.' + c for c in value_columns)}
+            FROM temp.live_stage s
+            LEFT JOIN pensioners_live_current c ON c.PPO = s.PPO
+            WHERE c.PPO IS NULL OR c.fingerprint <> s.fingerprint
+        """, (fetch_id,))
+
+        if staged:
+            conn.execute("""
+                INSERT INTO pensioners_live_changes (fetch_id, PPO, change_type, fingerprint)
+                SELECT ?, c.PPO, 'removed', c.fingerprint
+                FROM pensioners_live_current c
+                WHERE NOT EXISTS (SELECT 1 FROM temp.live_stage s WHERE s.PPO = c.PPO)
+            """, (fetch_id,))
+        else:
+            # An empty report must not wipe the whole current state
+            print("⚠️  Fetch contained no records; skipping disappeared-PPO detection")
+
+        conn.execute("""
+            DELETE FROM pensioners_live_current
+            WHERE PPO IN (SELECT PPO FROM pensioners_live_changes
+                          WHERE fetch_id = ? AND change_type = 'removed')
+        """, (fetch_id,))
+
+        conn.execute(f"""
+            INSERT INTO pensioners_live_current
+                (PPO, fingerprint, {columns_sql}, first_seen_fetch_id, last_changed_fetch_id)
+            SELECT PPO, fingerprint, {columns_sql}, fetch_id, fetch_id
+            FROM pensioners_live_changes
+            WHERE fetch_id = ? AND change_type IN ('new', 'changed')
+            ON CONFLICT(PPO) DO UPDATE SET
+                fingerprint = excluded.fingerprint,
+                {', '.join(f'{c} = excluded.{c}' for c in value_columns)},
+                last_changed_fetch_id = excluded.last_changed_fetch_id
+        """, (fetch_id,))
+
+        counts = dict(conn.execute("""
+            SELECT change_type, COUNT(*) FROM pensioners_live_changes
+            WHERE fetch_id = ? GROUP BY change_type
+        """, (fetch_id,)).fetchall())
+
+        has_all_pensioners = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'all_pensioners'"
+        ).fetchone()
+        lc_updated = 0
+        if has_all_pensioners:
+            lc_updated = conn.execute("""
+                UPDATE all_pensioners SET LC_date = ?
+                WHERE PPO IN (SELECT PPO FROM pensioners_live_changes
+                              WHERE fetch_id = ? AND change_type = 'new')
+            """, (report_date, fetch_id)).rowcount
+
+    conn.execute("DROP TABLE IF EXISTS temp.live_stage")
+
+    new = counts.get('new', 0)
+    changed = counts.get('changed', 0)
+    return {
+        "new": new,
+        "changed": changed,
+        "removed": counts.get('removed', 0),
+        "unchanged": staged - new - changed,
+        "lc_date_updated": lc_updated
+    }
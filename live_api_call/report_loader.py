@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Fetch-and-Load Pipeline for Jeevan Pramaan reports
+
+Streams the Broker/Report response straight into pensioners_live_data:
+
+➢ HTTP body is read in chunks (requests stream=True), never held in full
+➢ The jP_Response string is cut out of the JSON envelope incrementally
+➢ Base64 + AES-256-GCM are decoded chunk by chunk (AESGCMStreamDecryptor)
+➢ Plaintext is pushed into ijson, records are inserted in batches
+➢ Every run gets a fetch_id row in api_fetch_status
+
+GCM authenticates only at the end of the stream, so the rows of a fetch stay
+in status 'loading' until the tag is verified. On failure they are deleted and
+the fetch is marked 'failed'; all_pensioners.LC_date is only updated once the
+fetch has been authenticated.
+
+With --mode delta only new/changed/disappeared PPOs are written, into a
+change log plus a materialized current-state table (see report_delta.py).
+
+Usage:
+    python report_loader.py --date 2024-11-05 --db ../updated_db/updated_db.db
+    python report_loader.py --date 2024-11-06 --mode delta
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+import ijson
+import requests
+
+from aes_encryption import AESGCMStreamDecryptor, encrypt_json_data
+
+DEFAULT_DB_PATH = os.getenv(
+    "PENSIONER_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'updated_db', 'updated_db.db')
+)
+DEFAULT_BATCH_SIZE = 5000
+HTTP_CHUNK_SIZE = 256 * 1024
+
+# JP record field -> pensioners_live_data column
+# (same mapping as DLCServer/db-scripts/jeevan-praman-api-sql-script.py)
+COLUMN_MAPPING = {
+    "PPO": "PPO",
+    "type_of_pensioner": "pensioner_type",
+    "central_govt_pensioner_type": "pensioner_subtype",
+    "disbursing_agency": "disbursing_agency",
+    "disbursing_authority": "disbursing_authority",
+    "pensioner_DLC_type": "pensioner_DLC_type",
+    "pensioner_YearOfBirth": "pensioner_YearOfBirth",
+    "pensioner_district": "pensioner_district",
+    "pensioner_pin": "pensioner_pin",
+    "pensioner_state": "pensioner_state",
+}
+
+INSERT_SQL = (
+    f"INSERT INTO pensioners_live_data ({', '.join(COLUMN_MAPPING.values())}, inserted_at, fetch_id) "
+    f"VALUES ({', '.join('?' * (len(COLUMN_MAPPING) + 2))})"
+)
+
+
+def create_tables(conn):
+    """Create api_fetch_status and pensioners_live_data if missing"""
+    conn.executescript("""
+    CREATE TABLE IF NOT EXISTS api_fetch_status (
+        fetch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        report_date TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'loading',
+        records_count INTEGER DEFAULT 0,
+        error_message TEXT,
+        started_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        finished_at DATETIME
+    );
+
+    CREATE TABLE IF NOT EXISTS pensioners_live_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        PPO TEXT,
+        pensioner_type TEXT,
+        disbursing_agency TEXT,
+        disbursing_authority TEXT,
+        pensioner_DLC_type TEXT,
+        pensioner_YearOfBirth TEXT,
+        pensioner_district TEXT,
+        pensioner_pin TEXT,
+        pensioner_state TEXT,
+        pensioner_subtype TEXT,
+        inserted_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        fetch_id INTEGER NOT NULL REFERENCES api_fetch_status(fetch_id)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_pensioners_live_data_fetch_id
+        ON pensioners_live_data(fetch_id);
+    """)
+    conn.commit()
+
+
+class JPResponseEnvelopeParser:
+    """
+    Incrementally extracts the Base64 value of jP_Response / JP_Response
+    from a streamed JSON envelope such as {"jP_Response":"<base64>"}.
+
+    JSON escapes inside the string (\\/ and \\uXXXX, e.g. \\u002B for '+')
+    are decoded, including escapes split across chunk boundaries.
+    """
+
+    KEY_PATTERN = re.compile(rb'"j[pP]_Response"\s*:\s*')
+    MAX_HEADER_BYTES = 64 * 1024
+
+    def __init__(self):
+        self.state = 'key'
+        self.header = b''
+        self.escape_pending = b''
+
+    def feed(self, chunk):
+        """
+        Args:
+            chunk (bytes): Next slice of the HTTP body
+
+        Returns:
+            bytes: Base64 characters found in this chunk (may be empty)
+        """
+        if self.state == 'key':
+            self.header += chunk
+            match = self.KEY_PATTERN.search(self.header)
+            if not match or match.end() == len(self.header):
+                if len(self.header) > self.MAX_HEADER_BYTES:
+                    raise ValueError("jP_Response not found in report envelope")
+                return b''
+            if self.header[match.end():match.end() + 1] != b'"':
+                # jP_Response is null or not a string: nothing to decrypt
+                self.state = 'done'
+                return b''
+            chunk = self.header[match.end() + 1:]
+            self.header = self.header[:match.start()]
+            self.state = 'value'
+
+        if self.state == 'value':
+            return self._feed_value(chunk)
+        return b''
+
+    def _feed_value(self, chunk):
+        data = self.escape_pending + chunk if self.escape_pending else chunk
+        self.escape_pending = b''
+
+        end = data.find(b'"')
+        if end != -1:
+            self.state = 'done'
+            data = data[:end]
+        if b'\\' not in data:
+            return data
+
+        parts = []
+        position = 0
+        while True:
+            backslash = data.find(b'\\', position)
+            if backslash == -1:
+                parts.append(data[position:])
+                break
+            parts.append(data[position:backslash])
+            kind = data[backslash + 1:backslash + 2]
+            if kind == b'u':
+                if backslash + 6 > len(data):
+                    self.escape_pending = data[backslash:]
+                    break
+                parts.append(chr(int(data[backslash + 2:backslash + 6], 16)).encode('ascii'))
+                position = backslash + 6
+            elif kind:
+                parts.append(kind)
+                position = backslash + 2
+            else:
+                self.escape_pending = data[backslash:]
+                break
+        return b''.join(parts)
+
+
+def start_fetch(conn, report_date):
+    """Insert the api_fetch_status row for this run and return its fetch_id"""
+    cursor = conn.execute(
+        "INSERT INTO api_fetch_status (report_date, status) VALUES (?, 'loading')",
+        (report_date,)
+    )
+    conn.commit()
+    return cursor.lastrowid
+
+
+def finish_fetch(conn, fetch_id, status, records_count, error_message=None):
+    """Record the final status of a fetch"""
+    conn.execute(
+        """UPDATE api_fetch_status
+           SET status = ?, records_count = ?, error_message = ?, finished_at = CURRENT_TIMESTAMP
+           WHERE fetch_id = ?""",
+        (status, records_count, error_message, fetch_id)
+    )
+    conn.commit()
+
+
+def write_batch(conn, records, report_date, fetch_id):
+    """Insert one batch of JP records and commit"""
+    fields = list(COLUMN_MAPPING)
+    conn.executemany(
+        INSERT_SQL,
+        [tuple(record.get(field) for field in fields) + (report_date, fetch_id) for record in records]
+    )
+    conn.commit()
+
+
+def update_lc_dates(conn, fetch_id, report_date):
+    """Set all_pensioners.LC_date for every PPO of an authenticated fetch"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'all_pensioners'"
+    ).fetchone()
+    if not exists:
+        return 0
+    cursor = conn.execute(
+        """UPDATE all_pensioners SET LC_date = ?
+           WHERE PPO IN (SELECT PPO FROM pensioners_live_data WHERE fetch_id = ?)""",
+        (report_date, fetch_id)
+    )
+    conn.commit()
+    return cursor.rowcount
+
+
+def load_report_into_db(conn, jwt_token, report_date, report_url, aes_key,
+                        batch_size=DEFAULT_BATCH_SIZE, timeout=300, mode='append'):
+    """
+    Fetch the report for report_date and stream its records into pensioners_live_data
+
+    In 'delta' mode nothing is appended to pensioners_live_data; records are
+    fingerprinted and only new/changed/removed PPOs are written to
+    pensioners_live_changes and pensioners_live_current (see report_delta.py).
+
+    Args:
+        conn (sqlite3.Connection): Target database
+        jwt_token (str): JWT token from the Auth API
+        report_date (str): Date in format yyyy-MM-dd
+        report_url (str): Broker/Report endpoint
+        aes_key (str): 32-character AES key
+        batch_size (int): Records per INSERT batch/commit
+        timeout (int): HTTP timeout in seconds
+        mode (str): 'append' (every record into pensioners_live_data) or 'delta'
+
+    Returns:
+        dict: success flag, fetch_id, records loaded and timings, or error details
+    """
+    if mode not in ('append', 'delta'):
+        raise ValueError(f"Unknown load mode: {mode}")
+
+    create_tables(conn)
+    if mode == 'delta':
+        # Local import: report_delta reads COLUMN_MAPPING from this module
+        import report_delta
+        report_delta.create_delta_tables(conn)
+        report_delta.begin_staging(conn)
+
+    def write_records(batch):
+        if mode == 'delta':
+            return report_delta.stage_batch(conn, batch)
+        write_batch(conn, batch, report_date, fetch_id)
+        return len(batch)
+
+    fetch_id = start_fetch(conn, report_date)
+    records_count = 0
+    start_time = time.time()
+    print(f"=== Fetch-and-load for {report_date} (fetch_id={fetch_id}) ===")
+
+    try:
+        response = requests.post(
+            report_url,
+            json={"JP_Request": encrypt_json_data({"date": report_date}, aes_key)},
+            headers={
+                'Content-Type': 'application/json',
+                'Accept': 'application/json',
+                'Authorization': f'Bearer {jwt_token}',
+                'User-Agent': 'JP-API-Client/1.0'
+            },
+            timeout=timeout,
+            stream=True
+        )
+
+        with response:
+            if response.status_code != 200:
+                raise ValueError(f"API request failed with status {response.status_code}: {response.text[:500]}")
+
+            envelope = JPResponseEnvelopeParser()
+            decryptor = AESGCMStreamDecryptor(aes_key)
+            records = ijson.sendable_list()
+            parser = ijson.items_coro(records, 'data.item', use_float=True)
+
+            def consume(plain_bytes):
+                nonlocal records_count
+                if plain_bytes:
+                    parser.send(plain_bytes)
+                while len(records) >= batch_size:
+                    records_count += write_records(records[:batch_size])
+                    del records[:batch_size]
+                    print(f"  Loaded {records_count:,} records...")
+
+            for chunk in response.iter_content(chunk_size=HTTP_CHUNK_SIZE):
+                base64_chunk = envelope.feed(chunk)
+                if base64_chunk:
+                    consume(decryptor.update(base64_chunk))
+
+            if envelope.state == 'key':
+                # No jP_Response in the body, e.g. {"errorCode": "BHJP106", ...}
+                raise ValueError(f"Report API returned no jP_Response: {envelope.header[:500].decode('utf-8', 'replace')}")
+
+            # Verifies the GCM tag before the fetch is marked completed
+            consume(decryptor.finalize())
+            parser.close()
+            if records:
+                records_count += write_records(records)
+                del records[:]
+
+        result = {
+            "success": True,
+            "fetch_id": fetch_id,
+            "mode": mode,
+            "records": records_count,
+        }
+        if mode == 'delta':
+            changes = report_delta.apply_deltas(conn, fetch_id, report_date)
+            result["changes"] = changes
+            result["lc_date_updated"] = changes.pop("lc_date_updated")
+            print(f"  Changes: {changes}")
+        else:
+            result["lc_date_updated"] = update_lc_dates(conn, fetch_id, report_date)
+        finish_fetch(conn, fetch_id, 'completed', records_count)
+        duration = time.time() - start_time
+        print(f"✅ Loaded {records_count:,} records in {duration:.1f}s (fetch_id={fetch_id})")
+        result["duration_seconds"] = round(duration, 2)
+        result["message"] = "Report loaded successfully"
+        return result
+
+    except Exception as e:
+        print(f"❌ Fetch-and-load error: {str(e)}")
+        conn.rollback()
+        conn.execute("DELETE FROM pensioners_live_data WHERE fetch_id = ?", (fetch_id,))
+        conn.execute("DROP TABLE IF EXISTS temp.live_stage")
+        finish_fetch(conn, fetch_id, 'failed', 0, str(e) or type(e).__name__)
+        return {
+            "success": False,
+            "fetch_id": fetch_id,
+            "error": "Failed to fetch and load report",
+            "details": str(e) or type(e).__name__
+        }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Fetch a Jeevan Pramaan report and stream it into pensioners_live_data."
+    )
+    parser.add_argument("--date", required=True, help="Report date in yyyy-MM-dd format")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path to the SQLite database file")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Records per insert batch")
+    parser.add_argument("--mode", choices=["append", "delta"], default="append",
+                        help="append: every record into pensioners_live_data, "
+                             "delta: only new/changed/removed PPOs (change log + current state)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    datetime.strptime(args.date, '%Y-%m-%d')
+
+    from auth_api_call import authenticate, REPORT_URL, AES_KEY
+
+    jwt_token = authenticate()
+    if not jwt_token:
+        print("❌ Authentication failed. Cannot proceed with report load.")
+        return
+
+    conn = sqlite3.connect(args.db)
+    try:
+        load_report_into_db(conn, jwt_token, args.date, REPORT_URL, AES_KEY,
+                            batch_size=args.batch_size, mode=args.mode)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
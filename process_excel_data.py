@@ -13,6 +13,8 @@ import glob
 from pathlib import Path
 import re
 
+from report_writer import StreamingExcelWriter
+
 # Bank name mapping for consistent naming
 BANK_NAME_MAPPING = {
     'BOB': 'Bank of Baroda',
@@ -251,12 +253,12 @@ def main():
         
         # Save analysis results
         print("\n💾 Saving analysis results...")
-        with pd.ExcelWriter('pensioner_data_analysis.xlsx') as writer:
+        with StreamingExcelWriter('pensioner_data_analysis.xlsx') as writer:
             for bank_name, analyses in analysis_results.items():
                 for analysis_name, df in analyses.items():
                     if not df.empty:
-                        sheet_name = f"{bank_name}_{analysis_name}"[:31]  # Excel sheet name limit
-                        df.to_excel(writer, sheet_name=sheet_name, index=False)
+                        # Sheet names are cleaned/truncated to Excel's 31-character limit
+                        writer.write_dataframe(f"{bank_name}_{analysis_name}", df)
         
         print("✅ Analysis saved to pensioner_data_analysis.xlsx")
     
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Streaming Excel Report Writer
+Writes .xlsx reports row by row with xlsxwriter's constant_memory mode, so a
+sheet fed from a SQLite cursor or a DuckDB result never has to be held in RAM
+(pd.ExcelWriter keeps the whole workbook XML in memory until it is saved).
+
+- several sheets per workbook, each written once, top to bottom
+- bold frozen header row with autofilter, thousands format for integers
+- rows beyond Excel's sheet limit continue on "<sheet> (2)", "<sheet> (3)", ...
+
+Usage:
+    with StreamingExcelWriter("report.xlsx") as writer:
+        writer.write_cursor("pincodes", conn.execute("SELECT ..."))
+        writer.write_dataframe("by_state", df)
+"""
+
+import math
+from datetime import date, datetime
+from decimal import Decimal
+
+import xlsxwriter
+
+EXCEL_MAX_ROWS = 1048576
+SHEET_NAME_LIMIT = 31
+INVALID_SHEET_CHARS = '[]:*?/\\'
+
+
+class StreamingExcelWriter:
+    def __init__(self, filename, batch_size=10000, max_rows_per_sheet=EXCEL_MAX_ROWS):
+        self.filename = filename
+        self.batch_size = batch_size
+        # Header row included
+        self.max_rows_per_sheet = max_rows_per_sheet
+        self.workbook = xlsxwriter.Workbook(filename, {
+            'constant_memory': True,
+            'nan_inf_to_errors': True,
+            'strings_to_numbers': False,
+            'strings_to_urls': False,
+        })
+        self.header_format = self.workbook.add_format({'bold': True, 'bg_color': '#D9E1F2', 'border': 1})
+        self.integer_format = self.workbook.add_format({'num_format': '#,##0'})
+        self.float_format = self.workbook.add_format({'num_format': '#,##0.00'})
+        self.date_format = self.workbook.add_format({'num_format': 'yyyy-mm-dd'})
+        self.datetime_format = self.workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+        self.sheet_names = set()
+        self.rows_written = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        """Finish the workbook (writes the remaining sheet data and the zip container)"""
+        if self.workbook is not None:
+            self.workbook.close()
+            self.workbook = None
+
+    def write_rows(self, sheet_name, columns, rows, column_widths=None):
+        """
+        Stream an iterable of row tuples into a new sheet
+
+        Args:
+            sheet_name (str): Sheet name (cleaned and truncated to Excel's 31 characters)
+            columns (list): Header labels
+            rows (iterable): Row tuples/lists in column order
+            column_widths (dict): Optional header label -> width overrides
+
+        Returns:
+            int: Number of data rows written (across overflow sheets)
+        """
+        base_name = self._unique_sheet_name(sheet_name)
+        worksheet = self._add_sheet(base_name, columns, column_widths)
+        part = 1
+        row_index = 0
+        total = 0
+
+        for row in rows:
+            if row_index + 1 >= self.max_rows_per_sheet:
+                self._finish_sheet(worksheet, row_index, len(columns))
+                part += 1
+                tail = f" ({part})"
+                overflow_name = self._unique_sheet_name(base_name[:SHEET_NAME_LIMIT - len(tail)] + tail)
+                worksheet = self._add_sheet(overflow_name, columns, column_widths)
+                row_index = 0
+            row_index += 1
+            for col_index, value in enumerate(row):
+                self._write_cell(worksheet, row_index, col_index, value)
+            total += 1
+
+        self._finish_sheet(worksheet, row_index, len(columns))
+        self.rows_written[base_name] = total
+        return total
+
+    def write_cursor(self, sheet_name, cursor, column_widths=None):
+        """
+        Stream a DB-API cursor (sqlite3, or a DuckDB connection/relation after execute)
+
+        Rows are pulled with fetchmany(batch_size), so memory stays bounded by one batch.
+        """
+        columns = [description[0] for description in cursor.description]
+        return self.write_rows(sheet_name, columns, self._iter_cursor(cursor), column_widths)
+
+    def write_dataframe(self, sheet_name, df, column_widths=None):
+        """Write a pandas DataFrame without the pandas Excel machinery (NaN becomes a blank cell)"""
+        rows = df.itertuples(index=False, name=None)
+        return self.write_rows(sheet_name, [str(column) for column in df.columns], rows, column_widths)
+
+    def _iter_cursor(self, cursor):
+        while True:
+            batch = cursor.fetchmany(self.batch_size)
+            if not batch:
+                return
+            yield from batch
+
+    def _add_sheet(self, name, columns, column_widths):
+        worksheet = self.workbook.add_worksheet(name)
+        column_widths = column_widths or {}
+        # Widths must be set before any row is written in constant_memory mode
+        for col_index, column in enumerate(columns):
+            worksheet.set_column(col_index, col_index, column_widths.get(column, max(12, min(len(str(column)) + 4, 50))))
+        worksheet.freeze_panes(1, 0)
+        worksheet.write_row(0, 0, columns, self.header_format)
+        return worksheet
+
+    def _finish_sheet(self, worksheet, last_row, column_count):
+        if column_count:
+            worksheet.autofilter(0, 0, max(last_row, 0), column_count - 1)
+
+    def _write_cell(self, worksheet, row, col, value):
+        if value is None:
+            return
+        # numpy scalars (from DataFrames) are classified by dtype kind
+        kind = getattr(getattr(value, 'dtype', None), 'kind', None)
+        if isinstance(value, bool) or kind == 'b':
+            worksheet.write_boolean(row, col, bool(value))
+        elif isinstance(value, int) or kind in ('i', 'u'):
+            worksheet.write_number(row, col, int(value), self.integer_format)
+        elif isinstance(value, (float, Decimal)) or kind == 'f':
+            value = float(value)
+            if not math.isnan(value):
+                worksheet.write_number(row, col, value, self.float_format)
+        elif isinstance(value, datetime):
+            if value == value:  # skip pandas NaT
+                worksheet.write_datetime(row, col, value.replace(tzinfo=None), self.datetime_format)
+        elif isinstance(value, date):
+            worksheet.write_datetime(row, col, value, self.date_format)
+        else:
+            value = str(value)
+            if value:
+                worksheet.write_string(row, col, value)
+
+    def _unique_sheet_name(self, name):
+        cleaned = ''.join('_' if ch in INVALID_SHEET_CHARS else ch for ch in str(name)).strip("'") or 'Sheet'
+        candidate = cleaned[:SHEET_NAME_LIMIT]
+        suffix = 2
+        while candidate.lower() in self.sheet_names:
+            tail = f"~{suffix}"
+            candidate = cleaned[:SHEET_NAME_LIMIT - len(tail)] + tail
+            suffix += 1
+        self.sheet_names.add(candidate.lower())
+        return candidate
@@ -2,129 +2,155 @@
 
 """
 Script to analyze data quality and identify issues in the pensioner_bank_master table
+
+The table is scanned once by the one-pass profiler (DLCServer/table_profiler.py)
+and the full profile is written as JSON. Duplicate PPO numbers and out-of-range
+birth years are still counted exactly in SQL: the profiler's HyperLogLog
+distinct count is only an estimate (about ±1.6%), which would report phantom
+duplicates on large tables.
 """
 
-import sqlite3
+import argparse
 import os
+import sqlite3
+import sys
 from datetime import datetime
 
-def analyze_data_quality(db_path):
-    """Analyze data quality issues in the database"""
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DLCServer'))
+from table_profiler import profile_database, save_profile, PLACEHOLDER_PINCODES
+
+TABLE = 'pensioner_bank_master'
+
+def analyze_data_quality(db_path, output_file=None, tables=(TABLE,)):
+    """
+    Analyze data quality issues in the database
+
+    Args:
+        db_path (str): SQLite database file
+        output_file (str): JSON profile output (default data_quality_<timestamp>.json)
+        tables (list): Tables to profile (None: every table)
+
+    Returns:
+        dict: The profile report, or None on error
+    """
     print("🔍 DATA QUALITY ANALYSIS")
     print("="*80)
     print(f"Database: {db_path}")
     print(f"Analysis time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*80)
-    
+
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Get total record count
-        cursor.execute("SELECT COUNT(*) FROM pensioner_bank_master")
-        total_records = cursor.fetchone()[0]
+        report = profile_database(db_path, list(tables) if tables else None, top_k=20)
+        output_file = output_file or f"data_quality_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        save_profile(report, output_file)
+
+        profile = report['tables'].get(TABLE)
+        if not profile or 'error' in profile:
+            print(f"⚠️  {TABLE} not profiled; see {output_file} for the other tables")
+            return report
+        columns = profile['columns']
+        total_records = profile['rows']
         print(f"📈 Total records: {total_records:,}")
-        
-        # Check for invalid pin codes (111111, 999999, etc.)
+        if total_records == 0:
+            return report
+
+        # Invalid pin codes (111111, 999999, etc.)
         print(f"\n📍 INVALID PIN CODE ANALYSIS:")
         print("-" * 40)
-        
-        invalid_pin_patterns = ['111111', '999999', '000000', '888888', '777777']
-        total_invalid_pins = 0
-        
-        for pattern in invalid_pin_patterns:
-            cursor.execute("""
-                SELECT COUNT(*) FROM pensioner_bank_master 
-                WHERE pensioner_postcode = ? OR branch_postcode = ?
-            """, (pattern, pattern))
-            count = cursor.fetchone()[0]
-            if count > 0:
-                print(f"   {pattern}: {count:,} records")
-                total_invalid_pins += count
-        
-        print(f"   Total records with invalid pin codes: {total_invalid_pins:,} ({(total_invalid_pins/total_records)*100:.2f}%)")
-        
-        # Check for empty or null important fields
+
+        for field in ('pensioner_postcode', 'branch_postcode'):
+            if field not in columns:
+                continue
+            patterns = columns[field]['patterns']
+            placeholders = patterns.get('pincode_placeholder', 0)
+            valid = patterns.get('pincode_6_digit', 0)
+            print(f"   {field}: {placeholders:,} placeholder pin codes ({', '.join(sorted(PLACEHOLDER_PINCODES))}), "
+                  f"{valid:,} valid 6-digit ({(valid/total_records)*100:.2f}%)")
+            for value in columns[field]['top_values']:
+                if str(value['value']).split('.')[0] in PLACEHOLDER_PINCODES:
+                    print(f"      {value['value']}: {value['count']:,} records")
+
+        # Empty or null important fields
         print(f"\nEmptyEntries ANALYSIS:")
         print("-" * 40)
-        
-        fields_to_check = ['ppo_number', 'state', 'pensioner_postcode']
-        for field in fields_to_check:
+
+        for field in ['ppo_number', 'state', 'pensioner_postcode']:
+            if field not in columns:
+                continue
+            empty = columns[field]['nulls'] + columns[field]['blanks']
+            print(f"   {field}: {empty:,} empty/null records ({columns[field]['empty_rate']*100:.2f}%)")
+
+        # State name variations
+        if 'state' in columns:
+            print(f"\n🗾 STATE NAME ANALYSIS:")
+            print("-" * 40)
+            print(f"   Distinct state spellings (approx.): {columns['state']['distinct_estimate']:,}")
+            print("   Top 20 states by record count:")
+            for value in columns['state']['top_values']:
+                print(f"      {value['value']}: {value['count']:,}")
+
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Duplicate records (exact; the HyperLogLog estimate is not precise enough)
+        if 'ppo_number' in columns:
+            print(f"\n🔄 DUPLICATE RECORD ANALYSIS:")
+            print("-" * 40)
             cursor.execute(f"""
-                SELECT COUNT(*) FROM pensioner_bank_master 
-                WHERE {field} IS NULL OR {field} = '' OR {field} = 'NA' OR {field} = 'null'
+                SELECT COUNT(*), COUNT(DISTINCT ppo_number) FROM {TABLE}
+                WHERE ppo_number IS NOT NULL AND ppo_number != ''
             """)
-            count = cursor.fetchone()[0]
-            print(f"   {field}: {count:,} empty/null records ({(count/total_records)*100:.2f}%)")
-        
-        # Check state name variations
-        print(f"\n🗾 STATE NAME ANALYSIS:")
-        print("-" * 40)
-        
-        cursor.execute("""
-            SELECT state, COUNT(*) as count 
-            FROM pensioner_bank_master 
-            WHERE state IS NOT NULL AND state != ''
-            GROUP BY state 
-            ORDER BY count DESC 
-            LIMIT 20
-        """)
-        states = cursor.fetchall()
-        print("   Top 20 states by record count:")
-        for state, count in states[:20]:
-            print(f"      {state}: {count:,}")
-        
-        # Check for duplicate records
-        print(f"\n🔄 DUPLICATE RECORD ANALYSIS:")
-        print("-" * 40)
-        
-        cursor.execute("""
-            SELECT ppo_number, COUNT(*) as count 
-            FROM pensioner_bank_master 
-            WHERE ppo_number IS NOT NULL AND ppo_number != ''
-            GROUP BY ppo_number 
-            HAVING COUNT(*) > 1
-        """)
-        duplicates = cursor.fetchall()
-        print(f"   Duplicate PPO numbers: {len(duplicates):,}")
-        
-        # Check age/birth year data
-        print(f"\n🎂 AGE/BIRTH YEAR ANALYSIS:")
-        print("-" * 40)
-        
-        cursor.execute("""
-            SELECT birth_year, COUNT(*) as count 
-            FROM pensioner_bank_master 
-            WHERE birth_year IS NOT NULL AND birth_year != ''
-            GROUP BY birth_year 
-            ORDER BY birth_year 
-            LIMIT 10
-        """)
-        birth_years = cursor.fetchall()
-        print("   Sample birth years:")
-        for year, count in birth_years:
-            print(f"      {year}: {count:,}")
-        
-        # Check for very old or very young birth years
-        cursor.execute("""
-            SELECT COUNT(*) FROM pensioner_bank_master 
-            WHERE birth_year IS NOT NULL AND birth_year != '' 
-            AND (CAST(birth_year AS INTEGER) < 1900 OR CAST(birth_year AS INTEGER) > 2020)
-        """)
-        invalid_years = cursor.fetchone()[0]
-        print(f"   Records with invalid birth years (<1900 or >2020): {invalid_years:,}")
-        
+            present, distinct = cursor.fetchone()
+            cursor.execute(f"""
+                SELECT COUNT(*) FROM (
+                    SELECT ppo_number FROM {TABLE}
+                    WHERE ppo_number IS NOT NULL AND ppo_number != ''
+                    GROUP BY ppo_number
+                    HAVING COUNT(*) > 1
+                )
+            """)
+            print(f"   Duplicate PPO numbers: {cursor.fetchone()[0]:,}")
+            print(f"   Records repeating an earlier PPO number: {present - distinct:,}")
+
+        # Age/birth year data
+        for field in ('birth_year', 'age'):
+            if field not in columns:
+                continue
+            print(f"\n🎂 {field.upper().replace('_', ' ')} ANALYSIS:")
+            print("-" * 40)
+            column = columns[field]
+            print(f"   Range: {column['min']} - {column['max']}")
+            print(f"   Non-numeric values: {sum(count for pattern, count in column['patterns'].items() if pattern not in ('integer', 'decimal')):,}")
+
+        # Very old or very young birth years
+        if 'birth_year' in columns:
+            cursor.execute(f"""
+                SELECT COUNT(*) FROM {TABLE}
+                WHERE birth_year IS NOT NULL AND birth_year != ''
+                AND (CAST(birth_year AS INTEGER) < 1900 OR CAST(birth_year AS INTEGER) > 2020)
+            """)
+            print(f"   Records with invalid birth years (<1900 or >2020): {cursor.fetchone()[0]:,}")
+
         conn.close()
-        
+
         print(f"\n{'='*80}")
         print("✅ Data quality analysis completed!")
-        
+        return report
+
     except Exception as e:
         print(f"❌ Error during data quality analysis: {e}")
+        return None
 
 def main():
-    db_path = "/data1/jainendra/DLC_backend-main/DLC_Database.db"
-    analyze_data_quality(db_path)
+    parser = argparse.ArgumentParser(description="Profile pensioner data quality in one pass per table")
+    parser.add_argument("--db", default="/data1/jainendra/DLC_backend-main/DLC_Database.db", help="SQLite database file")
+    parser.add_argument("--output", help="JSON report file")
+    parser.add_argument("--table", action="append", dest="tables", help="Table to profile (repeatable, default pensioner_bank_master)")
+    parser.add_argument("--all-tables", action="store_true", help="Profile every table in the database")
+    args = parser.parse_args()
+
+    tables = None if args.all_tables else (args.tables or [TABLE])
+    analyze_data_quality(args.db, args.output, tables)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
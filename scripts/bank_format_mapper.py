@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Bank Format Mapper
+One loader for the per-bank pensioner Excel layouts, driven by bank_formats/*.json
+
+Each format file declares how a workbook is read (sheet, header row), which
+columns hold which fields (position or header aliases), the transforms to
+apply and how the target table's columns are built. The spec is compiled into
+a column-wise pandas pipeline, so every bank gets the same vectorized path:
+one read per sheet, one set of string operations per column, one duplicate
+filter against the table and one executemany in a single transaction.
+
+Format file layout:
+    {
+      "name": "IDBI Bank",
+      "read": {"sheet": 0, "header": 0},          # sheet index/name, or "*" for every sheet
+      "fields": {                                 # evaluated in order
+        "ppo": {"column": 1},                     # position, header alias, or a list of candidates;
+                                                  # a sheet missing a non-"optional" column is skipped
+        "psa": {"column": ["PSA", 3], "default": "CPAO"},
+        "pincode": {"column": 5},
+        "branch_pincode": {"from": "branch_address", "transforms": ["extract_pincode"]},
+        "state": {"from": "pincode", "transforms": ["state_from_pincode"], "default": "Unknown"}
+      },
+      "dob": {"from": "yob", "formats": ["year"],   # adds dob_text, age, age_category;
+              "reject_unparsed": true},           # a birth cell no format reads makes the row an error
+      "target": {
+        "table": "pensioner_pincode_data",
+        "key": {"field": "ppo", "column": "ppo_number"},
+        "values": {"ppo_number": "{ppo}", "pension_sanctioning_authority": "{psa} - IDBI Bank"}
+      }
+    }
+
+Output differences from the old per-bank loops (process_idbi.py and friends):
+    - integral numeric cells lose their '.0' (PPO 12345.0 -> '12345', pincode
+      110001.0 -> '110001'); the duplicate filter strips '.0' on both sides, so
+      rows loaded earlier as '12345.0' still count as existing
+    - a blank cell inside a template renders as '' rather than 'None'
+      ("Pincode: " instead of "Pincode: None"), and every cell is stripped
+    - cells Excel typed as dates are read as dates (DOB '01-07-1950' and an
+      age) where the old loops stored '1950-07-01 00:00:00' or no DOB; year
+      columns (idbi, up) still reject them
+    - Excel serials later than today move back a century like two-digit years;
+      serials past 2192 get no DOB (the old loops stored a negative age)
+
+Usage:
+    python3 bank_format_mapper.py --list
+    python3 bank_format_mapper.py idbi <excel_file> [--db ../DLC_Database.db] [--dry-run]
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import string
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from pincode_states import UNKNOWN_STATE, get_pincode_state_map
+
+FORMATS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bank_formats')
+EXCEL_EPOCH = pd.Timestamp(1899, 12, 30)
+# Serials that fit a datetime64[ns] (1677-09-22 .. 2192-04-14); the old loops got no DOB for 19450615
+EXCEL_SERIAL_RANGE = ((pd.Timestamp.min.ceil('D') - EXCEL_EPOCH).days, pd.Timedelta.max.days)
+PINCODE_PATTERN = r'\b(\d{6})\b'
+SHEET_FIELD = '$sheet'
+UNPARSED_FIELD = '$dob_unparsed'
+
+# Same boundaries as the get_age_category() helpers of the old per-bank scripts
+AGE_CATEGORIES = [(60, 'Below 60'), (70, '60-69'), (80, '70-79'), (90, '80-89')]
+
+
+def list_formats():
+    """Return the names of the format files in bank_formats/"""
+    return sorted(name[:-5] for name in os.listdir(FORMATS_DIR) if name.endswith('.json'))
+
+
+def load_format(name_or_path):
+    """
+    Load a format spec by name (bank_formats/<name>.json) or path
+
+    Raises:
+        FileNotFoundError: No such format
+    """
+    path = name_or_path if name_or_path.endswith('.json') else os.path.join(FORMATS_DIR, f'{name_or_path}.json')
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Unknown bank format '{name_or_path}' - available: {', '.join(list_formats())}")
+    with open(path, 'r') as f:
+        spec = json.load(f)
+    spec.setdefault('name', os.path.basename(path)[:-5])
+    return spec
+
+
+def _missing_to_none(series):
+    series = series.astype(object)
+    return series.where(series.notna() & (series != ''), None)
+
+
+def _cell_text(series):
+    """Cells as stripped strings, None for blanks; integral floats lose their '.0'"""
+    if pd.api.types.is_float_dtype(series):
+        integral = series.notna() & (series == series.round())
+        text = series.astype(object).where(~integral, series.where(integral).astype('Int64').astype(str))
+        series = text.where(series.notna(), None)
+    text = series.astype(str).str.strip().where(series.notna(), None)
+    return _missing_to_none(text)
+
+
+def _dedup_key(series):
+    """Keys compared as text with any integral '.0' dropped, so '12345.0' matches '12345'"""
+    text = series.astype(str).str.strip().str.replace(r'^([+-]?\d+)\.0+$', r'\1', regex=True)
+    return text.astype(object).where(series.notna(), None)
+
+
+def _normalize_header(value):
+    return re.sub(r'\s+', ' ', str(value)).strip().lower()
+
+
+def _transform(series, step):
+    """Apply one declared transform to a text column (None stays None)"""
+    name, arg = (step, None) if isinstance(step, str) else next(iter(step.items()))
+    present = series.notna()
+    text = series.where(present, '').astype(str)
+
+    if name == 'strip':
+        result = text.str.strip()
+    elif name == 'title':
+        result = text.str.title()
+    elif name == 'upper':
+        result = text.str.upper()
+    elif name == 'remove_spaces':
+        result = text.str.replace(' ', '', regex=False)
+    elif name == 'extract_pincode':
+        result = text.str.extract(PINCODE_PATTERN, expand=False)
+    elif name == 'state_from_pincode':
+        result = get_pincode_state_map().states(series.where(present, ''))
+        result = result.where(result != UNKNOWN_STATE, None)
+    elif name == 'replace':
+        result = text
+        for old, new in arg.items():
+            result = result.str.replace(old, new, regex=False)
+    elif name == 'map':
+        result = text.map(lambda value: arg.get(value, value))
+    elif name == 'truncate':
+        result = text.str[:arg]
+    else:
+        raise ValueError(f"Unknown transform '{name}'")
+    return _missing_to_none(result.where(present, None))
+
+
+class FormatPipeline:
+    def __init__(self, spec):
+        """
+        Compile a format spec into column operations
+
+        Args:
+            spec (dict): Parsed format file (see module docstring)
+        """
+        self.spec = spec
+        self.name = spec['name']
+        self.read = spec.get('read', {})
+        self.fields = spec['fields']
+        self.dob = spec.get('dob')
+        self.target = spec['target']
+        self.key_field = self.target['key']['field']
+        self.key_column = self.target['key']['column']
+        self.columns = list(self.target['values'])
+        self.templates = {
+            column: self._compile_template(value) for column, value in self.target['values'].items()
+        }
+
+    @staticmethod
+    def _compile_template(value):
+        if isinstance(value, str):
+            value = {'template': value}
+        compiled = dict(value)
+        for key in ('template', 'else'):
+            if key in compiled:
+                compiled[key] = list(string.Formatter().parse(compiled[key]))
+        return compiled
+
+    def _resolve_column(self, df, candidates):
+        headers = [_normalize_header(column) for column in df.columns]
+        for candidate in candidates if isinstance(candidates, list) else [candidates]:
+            if isinstance(candidate, int):
+                if candidate < len(df.columns):
+                    return df.iloc[:, candidate]
+            elif _normalize_header(candidate) in headers:
+                return df.iloc[:, headers.index(_normalize_header(candidate))]
+        return None
+
+    def _dob_fields(self, raw, values):
+        """dob_text / age / age_category from a birth date or year column"""
+        now = pd.Timestamp(datetime.now())
+        text = _cell_text(raw)
+        numeric = pd.to_numeric(raw, errors='coerce')
+        dates = pd.Series(pd.NaT, index=raw.index, dtype='datetime64[ns]')
+        years = pd.Series(np.nan, index=raw.index)
+        dob_text = text.copy()
+
+        # Cells Excel already typed as dates need no parsing; a bare year column
+        # never took them (the old int(year_of_birth) raised on a date)
+        native = raw.map(lambda value: isinstance(value, datetime))
+        if native.any() and set(self.dob['formats']) != {'year'}:
+            dates = dates.where(~native, pd.to_datetime(raw.where(native), errors='coerce'))
+            dob_text = dob_text.where(~native, dates.dt.strftime('%d-%m-%Y'))
+
+        for fmt in self.dob['formats']:
+            pending = dates.isna() & years.isna()
+            if fmt == 'year':
+                # Any number, truncated like the old str(int(year_of_birth))
+                found = pending & numeric.abs().lt(2 ** 53)
+                whole = np.trunc(numeric.where(found))
+                years = years.where(~found, whole)
+                dob_text = dob_text.where(~found, whole.astype('Int64').astype(str))
+            elif fmt == 'excel':
+                # Like excel_date_to_datetime(): a cell that is not a usable serial has no DOB
+                found = pending & numeric.between(*EXCEL_SERIAL_RANGE)
+                parsed = EXCEL_EPOCH + pd.to_timedelta(numeric.where(found), unit='D')
+                dates = dates.where(~found, parsed)
+                dob_text = dob_text.where(~pending | found, None)
+                dob_text = dob_text.where(~found, parsed.dt.strftime('%d-%m-%Y'))
+            else:
+                parsed = pd.to_datetime(text.where(pending), format=fmt, errors='coerce')
+                dates = dates.where(~(pending & parsed.notna()), parsed)
+
+        # Two-digit years (01-JUN-42) parse into the future; move them back a century
+        future = dates.notna() & (dates > now)
+        dates = dates.where(~future, dates.where(future) - pd.DateOffset(years=100))
+
+        # Seconds, not nanoseconds: now - 1700-01-01 overflows a timedelta64[ns]
+        elapsed = np.datetime64(now.to_pydatetime(), 's') - dates.to_numpy().astype('datetime64[s]')
+        with np.errstate(invalid='ignore'):
+            days = pd.Series(elapsed // np.timedelta64(1, 'D'), index=raw.index, dtype='Float64')
+        age = (days // 365).where(dates.notna())
+        age = age.where(years.isna(), now.year - years)
+        values['dob_text'] = _missing_to_none(dob_text)
+        # A birth cell no format could read; the old loops raised on it and counted an error
+        values[UNPARSED_FIELD] = text.notna() & dates.isna() & years.isna()
+        values['age'] = age.astype('Int64').astype(object).where(age.notna(), None)
+
+        conditions = [age.lt(limit).fillna(False).to_numpy(dtype=bool) for limit, _ in AGE_CATEGORIES]
+        labels = [label for _, label in AGE_CATEGORIES]
+        category = np.select(conditions, labels, default='90+')
+        values['age_category'] = pd.Series(category, index=raw.index, dtype=object).where(age.notna(), 'Unknown')
+
+    def _render(self, compiled, values, index):
+        def render(parts):
+            if len(parts) == 1 and not parts[0][0] and parts[0][1] is not None:
+                return values[parts[0][1]]
+            result = pd.Series('', index=index, dtype=object)
+            for literal, field, _, _ in parts:
+                if literal:
+                    result = result + literal
+                if field is not None:
+                    result = result + values[field].where(values[field].notna(), '').astype(str)
+            return result
+
+        result = render(compiled['template'])
+        if 'if' in compiled:
+            otherwise = render(compiled['else']) if 'else' in compiled else pd.Series(None, index=index, dtype=object)
+            result = result.where(values[compiled['if']].notna(), otherwise)
+        if 'truncate' in compiled:
+            result = result.where(result.isna(), result.astype(str).str[:compiled['truncate']])
+        return result
+
+    def transform(self, df, sheet_name=None):
+        """
+        Map one sheet onto the target columns
+
+        Args:
+            df (pd.DataFrame): Sheet read with the format's header row
+            sheet_name (str): Name of the sheet, available to specs as '$sheet'
+
+        Returns:
+            pd.DataFrame: Target columns plus the key field and a _rejected flag, one row per input row
+        """
+        values = {SHEET_FIELD: pd.Series(sheet_name, index=df.index, dtype=object)}
+        for field, rule in self.fields.items():
+            if 'column' in rule:
+                column = self._resolve_column(df, rule['column'])
+                if column is None:
+                    if not rule.get('optional'):
+                        raise ValueError(f"column {rule['column']!r} for '{field}' not found")
+                    column = pd.Series(None, index=df.index, dtype=object)
+                candidates = [_cell_text(column)]
+            else:
+                sources = rule['from'] if isinstance(rule['from'], list) else [rule['from']]
+                candidates = [values[source] for source in sources]
+
+            result = None
+            for candidate in candidates:
+                for step in rule.get('transforms', []):
+                    candidate = _transform(candidate, step)
+                result = candidate if result is None else result.where(result.notna(), candidate)
+            if 'default' in rule:
+                result = result.where(result.notna(), rule['default'])
+            values[field] = result
+
+        if self.dob:
+            column = self._resolve_column(df, self.fields[self.dob['from']]['column'])
+            self._dob_fields(column if column is not None else pd.Series(None, index=df.index, dtype=object), values)
+
+        mapped = pd.DataFrame(
+            {column: self._render(self.templates[column], values, df.index) for column in self.columns},
+            index=df.index
+        )
+        mapped['_key'] = values[self.key_field]
+        rejected = self.dob is not None and self.dob.get('reject_unparsed', False)
+        mapped['_rejected'] = values[UNPARSED_FIELD] if rejected else False
+        return mapped
+
+    def read_sheets(self, excel_file):
+        """Yield (sheet_name, DataFrame) for the sheets the format covers, reading the workbook once"""
+        workbook = pd.ExcelFile(excel_file)
+        sheet = self.read.get('sheet', 0)
+        names = workbook.sheet_names if sheet == '*' else [
+            workbook.sheet_names[sheet] if isinstance(sheet, int) else sheet
+        ]
+        for name in names:
+            df = workbook.parse(name, header=self.read.get('header', 0))
+            required = self.read.get('require_header')
+            if required and not any(required.lower() in str(column).lower() for column in df.columns):
+                print(f"   ⏭️  Skipping sheet without '{required}' column: {name}")
+                continue
+            if len(df) == 0:
+                print(f"   ⏭️  Skipping empty sheet: {name}")
+                continue
+            yield name, df
+
+
+class BankFormatLoader:
+    FORMAT = None
+
+    def __init__(self, db_path='../DLC_Database.db', format_name=None):
+        self.db_path = db_path
+        self.conn = None
+        self.pipeline = FormatPipeline(load_format(format_name or self.FORMAT))
+
+    def process_file(self, excel_file, dry_run=False):
+        """
+        Load one workbook into the format's target table
+
+        Args:
+            excel_file (str): Path to the bank's Excel file
+            dry_run (bool): Map and count rows without inserting
+
+        Returns:
+            dict: {'rows', 'inserted', 'duplicates', 'errors'}
+        """
+        pipeline = self.pipeline
+        print(f"\n📂 Processing {pipeline.name} file: {excel_file}")
+        print("="*80)
+        started = time.time()
+
+        print("📖 Reading Excel file...")
+        frames = []
+        sheet_errors = 0
+        for name, df in pipeline.read_sheets(excel_file):
+            try:
+                frames.append(pipeline.transform(df, name))
+            except ValueError as e:
+                sheet_errors += 1
+                print(f"   ❌ Skipping sheet {name}: {e}")
+        mapped = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=pipeline.columns + ['_key', '_rejected'])
+        print(f"📊 Total rows: {len(mapped)}")
+
+        self.conn = sqlite3.connect(self.db_path)
+        try:
+            print("📋 Loading existing keys...")
+            table = pipeline.target['table']
+            existing = pd.Series(
+                [row[0] for row in self.conn.execute(f"SELECT {pipeline.key_column} FROM {table}")],
+                dtype=object
+            )
+            print(f"   Found {len(existing)} existing records")
+
+            # Earlier loads stored integral PPOs as '12345.0'; compare keys without the '.0'
+            keys = _dedup_key(mapped['_key'])
+            has_key = keys.notna()
+            # As in the old loops, a rejected row still claims its PPO for the rest of the file
+            seen = has_key & (keys.isin(_dedup_key(existing).dropna()) | keys.duplicated())
+            rejected = has_key & ~seen & mapped['_rejected'].astype(bool)
+            fresh = has_key & ~seen & ~rejected
+            stats = {
+                'rows': len(mapped),
+                'inserted': int(fresh.sum()),
+                'duplicates': int(seen.sum()),
+                'errors': int((~has_key).sum()) + int(rejected.sum()) + sheet_errors,
+            }
+
+            records = mapped.loc[fresh, pipeline.columns]
+            records = records.astype(object).where(records.notna(), None)
+            if not dry_run:
+                print(f"\n💾 Inserting {len(records)} records...")
+                with self.conn:
+                    self.conn.executemany(
+                        f"INSERT INTO {table} ({', '.join(pipeline.columns)}) "
+                        f"VALUES ({', '.join('?' for _ in pipeline.columns)})",
+                        records.itertuples(index=False, name=None)
+                    )
+        finally:
+            self.conn.close()
+
+        print("\n" + "="*80)
+        print("✅ Processing Complete!" if not dry_run else "✅ Dry run complete (nothing inserted)")
+        print("="*80)
+        print(f"   Total Rows: {stats['rows']}")
+        print(f"   ✅ {'Inserted' if not dry_run else 'Would insert'}: {stats['inserted']}")
+        print(f"   ⏭️  Duplicates: {stats['duplicates']}")
+        print(f"   ❌ Errors: {stats['errors']}")
+        print(f"   ⏱️  {time.time() - started:.1f}s")
+        print("="*80)
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load a bank pensioner Excel file using its format spec")
+    parser.add_argument("format", nargs="?", help="Format name from bank_formats/ or a path to a format file")
+    parser.add_argument("excel_file", nargs="?", help="Excel file to load")
+    parser.add_argument("--db", default="../DLC_Database.db", help="SQLite database to load into")
+    parser.add_argument("--dry-run", action="store_true", help="Map and count rows without inserting")
+    parser.add_argument("--list", action="store_true", help="List the available formats")
+    args = parser.parse_args()
+
+    if args.list or not args.format:
+        for name in list_formats():
+            print(f"  {name:<22} {load_format(name)['name']}")
+        return 0
+    if not args.excel_file:
+        parser.error("excel_file is required")
+
+    BankFormatLoader(args.db, args.format).process_file(args.excel_file, dry_run=args.dry_run)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,13 +2,175 @@
 
 """
 Script to clean and filter data in the pensioner_bank_master table
+
+The cleanup is a declarative rule set (CLEANUP_RULES). The table is scanned
+once; every row is classified by the first delete rule it matches, or else
+gets its rewrites. Delete rules compile to the WHERE clauses of the old
+one-statement-per-rule script and are evaluated by SQLite inside the scan, so
+NULLs, column affinity and CAST behave exactly as before. Deletes and rewrites
+are then applied by rowid in small transactions, so the Node API is only ever
+blocked for one batch.
 """
 
+import argparse
 import sqlite3
 import os
+import sys
+import time
 from datetime import datetime
 
-def clean_database(db_path):
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DLCServer'))
+from pensioner_rollup import refresh_rollup
+
+TABLE = 'pensioner_bank_master'
+CLEANUP_BATCH_SIZE = 5000
+SCAN_BATCH_SIZE = 50000
+# Pause between write batches so other writers/readers can take the lock
+BATCH_PAUSE_SECONDS = 0.05
+
+# Ordered rules; a row is deleted by the first matching delete rule
+CLEANUP_RULES = [
+    {
+        'name': 'invalid_pincode',
+        'action': 'delete',
+        'columns': ['pensioner_postcode', 'branch_postcode'],
+        'any_in': {'111111', '999999', '000000', '888888', '777777'},
+    },
+    {
+        'name': 'empty_ppo_doppw',
+        'action': 'delete',
+        'columns': ['ppo_number'],
+        'all_empty': {'', 'NA', 'null'},
+        'data_source_prefix': 'DOPPW',
+    },
+    {
+        'name': 'birth_year_out_of_range',
+        'action': 'delete',
+        'columns': ['birth_year'],
+        'year_range': (1900, 2020),
+    },
+    {
+        'name': 'empty_essential_fields',
+        'action': 'delete',
+        'columns': ['ppo_number', 'state', 'pensioner_postcode'],
+        'all_empty': {''},
+        'exclude_data_source_prefix': 'DOPPW',
+    },
+    {
+        'name': 'state_synonym',
+        'action': 'rewrite',
+        'columns': ['state'],
+        # Exact matches only, as the old per-name UPDATEs
+        'synonyms': {
+            'NCT OF DELHI': 'DELHI',
+            'NCTOFDELHI': 'DELHI',
+            'GUJRAT': 'GUJARAT',
+            'ANDRA PRADESH': 'ANDHRA PRADESH',
+            'CTI GUINDY': 'TAMIL NADU',  # Branch name seen in the state column
+        },
+    },
+]
+
+def rule_columns(rule):
+    """Columns a rule reads, data_source included when it filters on it"""
+    filters_source = 'data_source_prefix' in rule or 'exclude_data_source_prefix' in rule
+    return rule['columns'] + (['data_source'] if filters_source else [])
+
+def compile_rule(rule):
+    """
+    Turn a delete rule dict into a SQL predicate
+
+    Args:
+        rule (dict): Delete entry of CLEANUP_RULES
+
+    Returns:
+        tuple: (predicate SQL, parameters)
+    """
+    clauses = []
+    params = []
+    if 'any_in' in rule:
+        values = sorted(rule['any_in'])
+        marks = ', '.join('?' for _ in values)
+        clauses.append('(' + ' OR '.join(f"{column} IN ({marks})" for column in rule['columns']) + ')')
+        params += values * len(rule['columns'])
+    elif 'all_empty' in rule:
+        values = sorted(rule['all_empty'])
+        marks = ', '.join('?' for _ in values)
+        for column in rule['columns']:
+            clauses.append(f"({column} IS NULL OR {column} IN ({marks}))")
+            params += values
+    elif 'year_range' in rule:
+        column = rule['columns'][0]
+        clauses.append(f"{column} IS NOT NULL AND {column} != '' "
+                       f"AND (CAST({column} AS INTEGER) < ? OR CAST({column} AS INTEGER) > ?)")
+        params += list(rule['year_range'])
+    else:
+        raise ValueError(f"Unsupported cleanup rule: {rule['name']}")
+
+    # NOT LIKE is NULL for a NULL data_source, so such rows are kept like in the old DELETE
+    if 'data_source_prefix' in rule:
+        clauses.append("data_source LIKE ?")
+        params.append(rule['data_source_prefix'] + '%')
+    if 'exclude_data_source_prefix' in rule:
+        clauses.append("data_source NOT LIKE ?")
+        params.append(rule['exclude_data_source_prefix'] + '%')
+    return ' AND '.join(clauses), params
+
+def classify_rows(conn, rules=CLEANUP_RULES):
+    """
+    One scan of the table: rowids to delete and (value, rowid) rewrites per rule
+
+    Returns:
+        tuple: (deletes {rule: [rowid]}, rewrites {rule: (column, [(value, rowid)])}, skipped rule names)
+    """
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({TABLE})")]
+    skipped = [rule['name'] for rule in rules if not set(rule_columns(rule)) <= set(columns)]
+    active = [rule for rule in rules if rule['name'] not in skipped]
+    delete_rules = [rule for rule in active if rule['action'] == 'delete']
+    rewrite_rules = [rule for rule in active if rule['action'] == 'rewrite']
+    deletes = {rule['name']: [] for rule in delete_rules}
+    rewrites = {rule['name']: (rule['columns'][0], []) for rule in rewrite_rules}
+
+    # CASE stops at the first true WHEN, which is the first matching delete rule
+    cases = []
+    params = []
+    for position, rule in enumerate(delete_rules):
+        predicate, rule_params = compile_rule(rule)
+        cases.append(f"WHEN {predicate} THEN {position}")
+        params += rule_params
+    classify = f"CASE {' '.join(cases)} END" if cases else "NULL"
+    rewrite_columns = sorted({rule['columns'][0] for rule in rewrite_rules})
+    selected = ''.join(f", {column}" for column in rewrite_columns)
+
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(f"SELECT rowid, {classify}{selected} FROM {TABLE}", params)
+    while True:
+        batch = cursor.fetchmany(SCAN_BATCH_SIZE)
+        if not batch:
+            break
+        for row in batch:
+            if row[1] is not None:
+                deletes[delete_rules[row[1]]['name']].append(row[0])
+                continue
+            for rule in rewrite_rules:
+                value = row[2 + rewrite_columns.index(rule['columns'][0])]
+                new_value = rule['synonyms'].get(value) if isinstance(value, str) else None
+                if new_value is not None:
+                    rewrites[rule['name']][1].append((new_value, row[0]))
+    return deletes, rewrites, skipped
+
+def apply_in_batches(conn, sql, params, batch_size=CLEANUP_BATCH_SIZE):
+    """executemany in short transactions; returns rows affected"""
+    affected = 0
+    for start in range(0, len(params), batch_size):
+        with conn:
+            cursor = conn.executemany(sql, params[start:start + batch_size])
+            affected += cursor.rowcount
+        time.sleep(BATCH_PAUSE_SECONDS)
+    return affected
+
+def clean_database(db_path, dry_run=False, batch_size=CLEANUP_BATCH_SIZE):
     """Clean and filter data in the database"""
     print("🧹 DATABASE CLEANING PROCESS")
     print("="*80)
@@ -17,7 +179,7 @@ def clean_database(db_path):
     print("="*80)
     
     try:
-        conn = sqlite3.connect(db_path)
+        conn = sqlite3.connect(db_path, timeout=30)
         cursor = conn.cursor()
         
         # Get initial record count
@@ -25,83 +187,42 @@ def clean_database(db_path):
         initial_count = cursor.fetchone()[0]
         print(f"📊 Initial record count: {initial_count:,}")
         
-        # 1. Remove records with invalid pin codes
-        print(f"\n🗑️  REMOVING RECORDS WITH INVALID PIN CODES...")
-        invalid_pin_patterns = ['111111', '999999', '000000', '888888', '777777']
-        removed_invalid_pins = 0
-        
-        for pattern in invalid_pin_patterns:
-            cursor.execute("""
-                DELETE FROM pensioner_bank_master 
-                WHERE pensioner_postcode = ? OR branch_postcode = ?
-            """, (pattern, pattern))
-            count = cursor.rowcount
-            removed_invalid_pins += count
-            if count > 0:
-                print(f"   Removed {count:,} records with pin code {pattern}")
-        
-        conn.commit()
-        print(f"   Total records removed for invalid pins: {removed_invalid_pins:,}")
+        # 1. Classify every row in one scan
+        print(f"\n🔍 CLASSIFYING ROWS (single scan)...")
+        scan_started = time.time()
+        deletes, rewrites, skipped = classify_rows(conn)
+        print(f"   Scanned {initial_count:,} rows in {time.time() - scan_started:.1f}s")
+        for name in skipped:
+            print(f"   ⚠️  Rule '{name}' skipped: column missing in {TABLE}")
         
-        # 2. Remove records with empty/null PPO numbers (if they're not essential)
-        print(f"\n🗑️  REMOVING RECORDS WITH EMPTY PPO NUMBERS...")
-        cursor.execute("""
-            DELETE FROM pensioner_bank_master 
-            WHERE (ppo_number IS NULL OR ppo_number = '' OR ppo_number = 'NA' OR ppo_number = 'null')
-            AND data_source LIKE 'DOPPW%'
-        """)
-        removed_empty_ppo = cursor.rowcount
-        conn.commit()
-        print(f"   Removed {removed_empty_ppo:,} records with empty PPO numbers (DOPPW data only)")
-        
-        # 3. Standardize state names
-        print(f"\n🔤 STANDARDIZING STATE NAMES...")
-        state_corrections = {
-            'NCT OF DELHI': 'DELHI',
-            'NCTOFDELHI': 'DELHI',
-            'GUJRAT': 'GUJARAT',
-            'ANDRA PRADESH': 'ANDHRA PRADESH',
-            'CTI GUINDY': 'TAMIL NADU',  # This looks like a branch name, not a state
-        }
-        
-        corrected_states = 0
-        for old_state, new_state in state_corrections.items():
-            cursor.execute("""
-                UPDATE pensioner_bank_master 
-                SET state = ? 
-                WHERE state = ?
-            """, (new_state, old_state))
-            count = cursor.rowcount
-            corrected_states += count
-            if count > 0:
-                print(f"   Corrected {count:,} records from '{old_state}' to '{new_state}'")
+        print(f"\n📋 PER-RULE COUNTS{' (dry run)' if dry_run else ''}:")
+        print("-" * 40)
+        for name, rowids in deletes.items():
+            print(f"   🗑️  {name}: {len(rowids):,} rows to delete")
+        for name, (column, updates) in rewrites.items():
+            print(f"   🔤 {name}: {len(updates):,} rows to rewrite ({column})")
         
-        conn.commit()
-        print(f"   Total state name corrections: {corrected_states:,}")
+        if dry_run:
+            conn.close()
+            return
         
-        # 4. Remove records with invalid birth years
-        print(f"\n🎂 CLEANING INVALID BIRTH YEARS...")
-        cursor.execute("""
-            DELETE FROM pensioner_bank_master 
-            WHERE birth_year IS NOT NULL AND birth_year != '' 
-            AND (CAST(birth_year AS INTEGER) < 1900 OR CAST(birth_year AS INTEGER) > 2020)
-        """)
-        removed_invalid_years = cursor.rowcount
-        conn.commit()
-        print(f"   Removed {removed_invalid_years:,} records with invalid birth years")
+        # 2. Apply deletes and rewrites by rowid in bounded batches
+        print(f"\n✏️  APPLYING CHANGES IN BATCHES OF {batch_size:,}...")
+        for name, rowids in deletes.items():
+            if rowids:
+                removed = apply_in_batches(conn, f"DELETE FROM {TABLE} WHERE rowid = ?",
+                                           [(rowid,) for rowid in rowids], batch_size)
+                print(f"   Removed {removed:,} records ({name})")
+        rewritten = 0
+        for name, (column, updates) in rewrites.items():
+            if updates:
+                changed = apply_in_batches(conn, f"UPDATE {TABLE} SET {column} = ? WHERE rowid = ?",
+                                           updates, batch_size)
+                rewritten += changed
+                print(f"   Rewrote {changed:,} records ({name})")
         
-        # 5. Remove records with completely empty essential fields
-        print(f"\n🗑️  REMOVING RECORDS WITH MULTIPLE EMPTY FIELDS...")
-        cursor.execute("""
-            DELETE FROM pensioner_bank_master 
-            WHERE (ppo_number IS NULL OR ppo_number = '') 
-            AND (state IS NULL OR state = '') 
-            AND (pensioner_postcode IS NULL OR pensioner_postcode = '')
-            AND data_source NOT LIKE 'DOPPW%'
-        """)
-        removed_empty_records = cursor.rowcount
-        conn.commit()
-        print(f"   Removed {removed_empty_records:,} records with multiple empty fields")
+        # In-place rewrites leave MAX(rowid)/COUNT(*) unchanged, so the cube must be rebuilt
+        refresh_rollup(conn, rebuild=rewritten > 0)
         
         # Get final record count
         cursor.execute("SELECT COUNT(*) FROM pensioner_bank_master")
@@ -113,7 +234,7 @@ def clean_database(db_path):
         print(f"   Initial records: {initial_count:,}")
         print(f"   Records removed: {records_removed:,}")
         print(f"   Final records: {final_count:,}")
-        print(f"   Reduction: {((records_removed/initial_count)*100):.2f}%")
+        print(f"   Reduction: {((records_removed/initial_count)*100) if initial_count else 0:.2f}%")
         
         # Show final data source distribution
         print(f"\n📋 FINAL DATA SOURCE DISTRIBUTION:")
@@ -157,8 +278,12 @@ def clean_database(db_path):
             conn.close()
 
 def main():
-    db_path = "/data1/jainendra/DLC_backend-main/DLC_Database.db"
-    clean_database(db_path)
+    parser = argparse.ArgumentParser(description="Rule-driven single-scan cleanup of pensioner_bank_master")
+    parser.add_argument("--db", default="/data1/jainendra/DLC_backend-main/DLC_Database.db", help="SQLite database file")
+    parser.add_argument("--dry-run", action="store_true", help="Only report per-rule counts")
+    parser.add_argument("--batch-size", type=int, default=CLEANUP_BATCH_SIZE, help="Rows per write transaction")
+    args = parser.parse_args()
+    clean_database(args.db, dry_run=args.dry_run, batch_size=args.batch_size)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -6,8 +6,12 @@ Script to generate a summary report of all imported data
 
 import sqlite3
 import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DLCServer'))
+from dimension_store import grouped_counts_sql, is_normalized
+
 def generate_summary_report(db_path):
     """Generate a summary report of all imported data"""
     print("📊 DATA IMPORT SUMMARY REPORT")
@@ -21,16 +25,26 @@ def generate_summary_report(db_path):
         cursor = conn.cursor()
         
         # Get total records
-        cursor.execute("SELECT COUNT(*) FROM pensioner_bank_master")
+        # A normalized table is counted and grouped on its encoded ids, not through the view's joins
+        normalized = is_normalized(conn, 'pensioner_bank_master')
+        cursor.execute(f"SELECT COUNT(*) FROM {'pensioner_bank_master_fact' if normalized else 'pensioner_bank_master'}")
         total_records = cursor.fetchone()[0]
         print(f"📈 Total Records: {total_records:,}")
         
+        if normalized:
+            source_sql = f"({grouped_counts_sql('pensioner_bank_master', ['data_source'])})"
+            state_sql = f"({grouped_counts_sql('pensioner_bank_master', ['state'])})"
+            count_sql = "SUM(rows)"
+        else:
+            source_sql = state_sql = "pensioner_bank_master"
+            count_sql = "COUNT(*)"
+        
         # Get records by data source
         print(f"\n📋 Records by Data Source:")
         print("-" * 40)
-        cursor.execute("""
-            SELECT data_source, COUNT(*) as count 
-            FROM pensioner_bank_master 
+        cursor.execute(f"""
+            SELECT data_source, {count_sql} as count 
+            FROM {source_sql} 
             GROUP BY data_source 
             ORDER BY count DESC
         """)
@@ -42,9 +56,9 @@ def generate_summary_report(db_path):
         # Get records by state (top 10)
         print(f"\n🗾 Top 10 States by Record Count:")
         print("-" * 40)
-        cursor.execute("""
-            SELECT state, COUNT(*) as count 
-            FROM pensioner_bank_master 
+        cursor.execute(f"""
+            SELECT state, {count_sql} as count 
+            FROM {state_sql} 
             WHERE state IS NOT NULL AND state != ''
             GROUP BY state 
             ORDER BY count DESC 
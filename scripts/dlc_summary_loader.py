@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+DLC Summary Sheet Loader
+Statewise / districtwise / PSA-wise manual LC summary sheets from the banks
+
+The bank summary workbooks (EXCEL_DATA/DLC Data) share one shape: a few title
+rows, a header row naming the block ("Name of State", "Name of District",
+"Name of PSA"), sometimes a second header row under merged group cells, then
+one row per state/district/PSA with total and submitted counts. Districtwise
+sheets interleave state rows (no serial number) above their districts.
+
+Each workbook is read once (raw grid, no fixed header offset). Every sheet's
+header row is detected, the block type follows from its label column, and
+the count columns are found by name. Wide layouts - one total/submitted pair
+per PSA under a merged PSA heading - are melted into one row per PSA. All
+blocks of a workbook are written in a single transaction.
+
+    python3 dlc_summary_loader.py "<workbook>.xlsx" [--bank "Bank of Baroda"]
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+
+import pandas as pd
+
+FISCAL_YEAR = '2024-25'
+HEADER_SCAN_ROWS = 15
+DEFAULT_PSA = 'CGOV'
+
+# Block type -> label header text, target table and key columns
+SUMMARY_BLOCKS = {
+    'state': {'label': 'name of state', 'table': 'dlc_state_summary', 'keys': ['state', 'psa']},
+    'district': {'label': 'name of district', 'table': 'dlc_district_summary', 'keys': ['state', 'district', 'psa']},
+    'bank': {'label': 'name of psa', 'table': 'dlc_bank_summary', 'keys': ['bank_name', 'psa_type']},
+}
+
+# Positions used before header detection existed (read_excel(header=3))
+FALLBACK_COLUMNS = {
+    'state': {'header_row': 3, 'sno': 0, 'label': 1, 'psa': 2, 'counts': [(None, 3, 4)]},
+    'district': {'header_row': 3, 'sno': 0, 'label': 1, 'psa': 2, 'counts': [(None, 3, 4)]},
+    'bank': {'header_row': 3, 'sno': 0, 'label': 1, 'psa': None, 'counts': [(None, 2, 3)]},
+}
+
+TOTAL_PATTERN = re.compile(r'\btotal\b')
+SUBMITTED_PATTERN = re.compile(r'submitted|received|completed')
+SNO_PATTERN = re.compile(r'^(s\.?\s*no|sl|sr)\b')
+
+SUMMARY_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS dlc_state_summary (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        state TEXT NOT NULL,
+        psa TEXT,
+        total_pensioners INTEGER DEFAULT 0,
+        manual_lc_submitted INTEGER DEFAULT 0,
+        manual_lc_pending INTEGER DEFAULT 0,
+        completion_percentage REAL DEFAULT 0,
+        fiscal_year TEXT DEFAULT '2024-25',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(state, psa, fiscal_year)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS dlc_district_summary (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        state TEXT,
+        district TEXT NOT NULL,
+        psa TEXT,
+        total_pensioners INTEGER DEFAULT 0,
+        manual_lc_submitted INTEGER DEFAULT 0,
+        manual_lc_pending INTEGER DEFAULT 0,
+        completion_percentage REAL DEFAULT 0,
+        fiscal_year TEXT DEFAULT '2024-25',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(district, psa, fiscal_year)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS dlc_bank_summary (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        bank_name TEXT NOT NULL,
+        psa_type TEXT NOT NULL,
+        total_pensioners INTEGER DEFAULT 0,
+        manual_lc_submitted INTEGER DEFAULT 0,
+        manual_lc_pending INTEGER DEFAULT 0,
+        completion_percentage REAL DEFAULT 0,
+        fiscal_year TEXT DEFAULT '2024-25',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(bank_name, psa_type, fiscal_year)
+    )
+    ''',
+]
+
+
+def create_summary_tables(conn):
+    """Create the state / district / bank DLC summary tables"""
+    for statement in SUMMARY_SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+
+
+def read_workbook(excel_file):
+    """
+    Read every sheet of a workbook once, as raw cell grids
+
+    Returns:
+        dict: sheet name -> DataFrame with positional columns and no header
+    """
+    return pd.read_excel(excel_file, sheet_name=None, header=None)
+
+
+def _cell_text(series):
+    text = series.astype(str).str.strip()
+    return text.where(series.notna() & (text != '') & (text.str.lower() != 'nan'), None)
+
+
+def _header_text(row):
+    return [re.sub(r'\s+', ' ', str(value)).strip().lower() if pd.notna(value) else '' for value in row]
+
+
+def detect_block(grid, kind=None):
+    """
+    Find the summary block of one sheet
+
+    Args:
+        grid (pd.DataFrame): Sheet read with header=None
+        kind (str): Expected block type when the header row cannot be recognised
+            ('state', 'district' or 'bank'); None skips such sheets
+
+    Returns:
+        dict: {'kind', 'header_row', 'data_row', 'sno', 'label', 'psa', 'counts'}
+        where counts lists (group label, total column, submitted column); None
+        when the sheet holds no recognisable block
+    """
+    for row_index in range(min(HEADER_SCAN_ROWS, len(grid))):
+        top = _header_text(grid.iloc[row_index])
+        found = [
+            (name, column) for column, text in enumerate(top)
+            for name, block in SUMMARY_BLOCKS.items() if block['label'] in text
+        ]
+        if found:
+            break
+    else:
+        if kind is None or len(grid) <= FALLBACK_COLUMNS[kind]['header_row']:
+            return None
+        fallback = dict(FALLBACK_COLUMNS[kind], kind=kind)
+        fallback['data_row'] = fallback['header_row'] + 1
+        return fallback
+
+    block_kind, label = found[0]
+    # A second header row under merged group cells holds the Total/Submitted names
+    below = _header_text(grid.iloc[row_index + 1]) if row_index + 1 < len(grid) else []
+    two_level = any(TOTAL_PATTERN.search(text) for text in below) and not any(
+        TOTAL_PATTERN.search(text) for text in top
+    )
+    groups = pd.Series(top).replace('', None).ffill().fillna('') if two_level else pd.Series(top)
+    names = [
+        f"{group} {sub}".strip() if two_level else group
+        for group, sub in zip(groups, below if two_level else top)
+    ]
+    originals = [
+        str(value).strip() if pd.notna(value) else '' for value in grid.iloc[row_index]
+    ]
+    group_labels = pd.Series(originals).replace('', None).ffill().fillna('') if two_level else None
+
+    sno = next((column for column, text in enumerate(top) if SNO_PATTERN.search(text)), 0)
+    psa = None
+    if block_kind != 'bank':
+        psa = next((column for column, text in enumerate(names)
+                    if 'psa' in text and column != label and not TOTAL_PATTERN.search(text)), None)
+
+    totals = [column for column, text in enumerate(names) if TOTAL_PATTERN.search(text)]
+    submitted = [column for column, text in enumerate(names) if SUBMITTED_PATTERN.search(text)]
+    counts = []
+    for total in totals:
+        group = groups.iloc[total] if two_level else None
+        partner = next((column for column in submitted
+                        if column > total and (not two_level or groups.iloc[column] == group)), None)
+        if partner is not None:
+            counts.append((group_labels.iloc[total] if two_level and psa is None else None, total, partner))
+    if not counts:
+        counts = FALLBACK_COLUMNS[block_kind]['counts']
+
+    return {
+        'kind': block_kind,
+        'header_row': row_index,
+        'data_row': row_index + (2 if two_level else 1),
+        'sno': sno,
+        'label': label,
+        'psa': psa,
+        'counts': counts,
+    }
+
+
+def _counts(raw, missing_as_zero):
+    """Numeric counts ('1,234' allowed); blanks/NA -> 0 or NaN, other text -> NaN"""
+    text = _cell_text(raw)
+    missing = text.isna() | (text.str.upper() == 'NA')
+    numeric = pd.to_numeric(text.str.replace(',', '', regex=False), errors='coerce')
+    if missing_as_zero:
+        numeric = numeric.where(~missing, 0)
+    return numeric
+
+
+def block_records(grid, block, bank_name=None):
+    """
+    Turn a detected block into long-form records, one per (label, PSA)
+
+    Args:
+        grid (pd.DataFrame): Sheet read with header=None
+        block (dict): Result of detect_block()
+        bank_name (str): Bank the sheet belongs to (bank blocks only)
+
+    Returns:
+        pd.DataFrame: Key columns of the block's table plus total_pensioners,
+        manual_lc_submitted, manual_lc_pending and completion_percentage
+    """
+    kind = block['kind']
+    data = grid.iloc[block['data_row']:]
+    if data.empty:
+        return pd.DataFrame()
+    label = _cell_text(data.iloc[:, block['label']])
+    base = pd.DataFrame({'label': label}, index=data.index)
+
+    if kind == 'district':
+        # State rows carry no serial number; their name applies to the districts below
+        sno = _cell_text(data.iloc[:, block['sno']]) if block['sno'] != block['label'] else pd.Series(None, index=data.index)
+        is_state = (sno.isna() & label.notna() & ~label.fillna('').str.isdigit()
+                    & (label.fillna('').str.len() > 3)
+                    & ~label.fillna('').str.contains('Name of District', regex=False))
+        base['state'] = label.where(is_state).ffill()
+        base = base[~is_state]
+        data = data.loc[base.index]
+
+    psa = _cell_text(data.iloc[:, block['psa']]) if block.get('psa') is not None else None
+
+    frames = []
+    for group, total_column, submitted_column in block['counts']:
+        frame = base.copy()
+        frame['psa'] = psa.fillna(DEFAULT_PSA) if psa is not None else (group or DEFAULT_PSA)
+        # A blank or NA total on a district sheet means the row is not reported; the old
+        # loop stored both as 0 (pandas reads a literal NA as missing) and such rows are skipped now
+        frame['total'] = _counts(data.iloc[:, total_column], missing_as_zero=kind != 'district')
+        frame['submitted'] = _counts(data.iloc[:, submitted_column], missing_as_zero=True)
+        frames.append(frame)
+    long = pd.concat(frames)
+
+    header_label = SUMMARY_BLOCKS[kind]['label']
+    keep = (long['label'].notna()
+            & ~long['label'].fillna('').str.lower().str.contains(header_label, regex=False)
+            & long['total'].notna() & long['submitted'].notna())
+    if kind == 'district':
+        keep &= ~long['psa'].str.contains('Concerned State|Others', regex=True)
+    if kind == 'bank':
+        keep &= ~(long['label'].fillna('').str.contains('Others', regex=False) & (long['total'] == 0))
+    long = long[keep].copy()
+
+    long['total_pensioners'] = long['total'].astype(int)
+    long['manual_lc_submitted'] = long['submitted'].astype(int)
+    long['manual_lc_pending'] = long['total_pensioners'] - long['manual_lc_submitted']
+    long['completion_percentage'] = (
+        (long['manual_lc_submitted'] / long['total_pensioners'].where(long['total_pensioners'] > 0) * 100)
+        .fillna(0).round(2)
+    )
+
+    if kind == 'state':
+        long = long.rename(columns={'label': 'state'})
+    elif kind == 'district':
+        long = long.rename(columns={'label': 'district'})
+    else:
+        long = long.rename(columns={'label': 'psa_type'}).assign(bank_name=bank_name)
+    columns = SUMMARY_BLOCKS[kind]['keys'] + [
+        'total_pensioners', 'manual_lc_submitted', 'manual_lc_pending', 'completion_percentage'
+    ]
+    return long[columns].reset_index(drop=True)
+
+
+def write_records(conn, kind, records):
+    """
+    INSERT OR REPLACE block records into their summary table (caller commits)
+
+    Args:
+        conn (sqlite3.Connection): Database holding the summary tables
+        kind (str): Block type ('state', 'district' or 'bank')
+        records (pd.DataFrame): Result of block_records()
+    """
+    if records.empty:
+        return
+    columns = list(records.columns) + ['fiscal_year']
+    rows = records.assign(fiscal_year=FISCAL_YEAR).astype(object)
+    rows = rows.where(rows.notna(), None)
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {SUMMARY_BLOCKS[kind]['table']} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})",
+        rows.itertuples(index=False, name=None)
+    )
+
+
+def load_workbook(conn, excel_file, bank_name=None, fallback_kinds=None, sheets=None, kinds=None, verbose=True):
+    """
+    Load every summary block of a workbook in one transaction
+
+    Args:
+        conn (sqlite3.Connection): Database holding the summary tables
+        excel_file (str): Workbook path
+        bank_name (str): Bank name for PSA-wise (bank) blocks
+        fallback_kinds (dict): sheet name (or index) -> block type for sheets
+            whose header row cannot be recognised
+        sheets (dict): Grids already returned by read_workbook(), to avoid a second read
+        kinds (set): Block types to load, others are skipped (default: all). The
+            state/district tables have no bank column, so a bank-level loader must
+            not write them or it would replace another bank's rows
+        verbose (bool): Print one line per block
+
+    Returns:
+        dict: block type -> DataFrame of the records written
+    """
+    create_summary_tables(conn)
+    sheets = read_workbook(excel_file) if sheets is None else sheets
+    fallback_kinds = fallback_kinds or {}
+    loaded = {}
+
+    for position, (sheet_name, grid) in enumerate(sheets.items()):
+        fallback = fallback_kinds.get(sheet_name, fallback_kinds.get(position))
+        block = detect_block(grid, fallback)
+        if block is None:
+            if verbose:
+                print(f"   ⏭️  No summary block in sheet: {sheet_name}")
+            continue
+        if kinds is not None and block['kind'] not in kinds:
+            if verbose:
+                print(f"   ⏭️  Skipping {block['kind']}wise block in sheet: {sheet_name}")
+            continue
+        if block['kind'] == 'bank' and not bank_name:
+            print(f"   ⚠️  Sheet {sheet_name} is PSA-wise but no bank name was given, skipping")
+            continue
+        records = block_records(grid, block, bank_name)
+        if verbose:
+            print(f"   📄 {sheet_name}: {block['kind']}wise block, {len(records)} rows "
+                  f"(header row {block['header_row'] + 1}, {len(block['counts'])} count group(s))")
+        loaded[block['kind']] = pd.concat([loaded[block['kind']], records]) if block['kind'] in loaded else records
+
+    with conn:
+        for kind, records in loaded.items():
+            write_records(conn, kind, records)
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the statewise/districtwise/PSA-wise DLC summary sheets of a workbook")
+    parser.add_argument("excel_file", help="Bank DLC summary workbook")
+    parser.add_argument("--bank", help="Bank name, required for PSA-wise sheets")
+    parser.add_argument("--db", default="../DLC_Database.db", help="SQLite database to load into")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        loaded = load_workbook(conn, args.excel_file, args.bank)
+    finally:
+        conn.close()
+    for kind, records in loaded.items():
+        print(f"✅ {SUMMARY_BLOCKS[kind]['table']}: {len(records)} records")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,8 +8,12 @@ organized by state, bank, branch pincode, age groups, and family pincode
 import sqlite3
 import pandas as pd
 import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DLCServer'))
+from pensioner_rollup import refresh_rollup
+
 def generate_sparsh_summary(db_path):
     """Generate summary report of SPARSH Defence pensioners data"""
     print("📊 SPARSH DEFENCE PENSIONERS DATA SUMMARY REPORT")
@@ -23,8 +27,15 @@ def generate_sparsh_summary(db_path):
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         
+        # Summaries read the rollup cube; source is pensioner_bank_master.data_source
+        # and age_bucket its PSA age group (DEFENCE_<age>)
+        refresh_rollup(conn, verbose=False)
+        
         # Get total SPARSH records
-        cursor.execute("SELECT COUNT(*) FROM pensioner_bank_master WHERE data_source LIKE '%SPARSH%'")
+        cursor.execute("""
+            SELECT COALESCE(SUM(pensioners), 0) FROM pensioner_rollup
+            WHERE source_table = 'pensioner_bank_master' AND source LIKE '%SPARSH%'
+        """)
         total_sparsh = cursor.fetchone()[0]
         print(f"📊 Total SPARSH Defence Pensioners: {total_sparsh:,}")
         
@@ -32,9 +43,9 @@ def generate_sparsh_summary(db_path):
         print(f"\n🗾 STATE-WISE SUMMARY:")
         print("-" * 50)
         cursor.execute("""
-            SELECT state, COUNT(*) as total_count
-            FROM pensioner_bank_master 
-            WHERE data_source LIKE '%SPARSH%' AND state IS NOT NULL AND state != ''
+            SELECT state, SUM(pensioners) as total_count
+            FROM pensioner_rollup 
+            WHERE source_table = 'pensioner_bank_master' AND source LIKE '%SPARSH%' AND state != ''
             GROUP BY state 
             ORDER BY total_count DESC
         """)
@@ -45,9 +56,9 @@ def generate_sparsh_summary(db_path):
             
             # Get bank distribution for this state
             cursor.execute("""
-                SELECT bank_name, COUNT(*) as bank_count
-                FROM pensioner_bank_master 
-                WHERE data_source LIKE '%SPARSH%' AND state = ? AND bank_name IS NOT NULL
+                SELECT bank_name, SUM(pensioners) as bank_count
+                FROM pensioner_rollup 
+                WHERE source_table = 'pensioner_bank_master' AND source LIKE '%SPARSH%' AND state = ? AND bank_name != ''
                 GROUP BY bank_name 
                 ORDER BY bank_count DESC
             """, (state,))
@@ -58,11 +69,11 @@ def generate_sparsh_summary(db_path):
                 
                 # Get branch pincode distribution for this bank in this state
                 cursor.execute("""
-                    SELECT branch_postcode, COUNT(*) as branch_count
-                    FROM pensioner_bank_master 
-                    WHERE data_source LIKE '%SPARSH%' AND state = ? AND bank_name = ? 
-                    AND branch_postcode IS NOT NULL AND branch_postcode != ''
-                    GROUP BY branch_postcode 
+                    SELECT pincode, SUM(pensioners) as branch_count
+                    FROM pensioner_rollup 
+                    WHERE source_table = 'pensioner_bank_master' AND source LIKE '%SPARSH%' AND state = ? AND bank_name = ? 
+                    AND pincode != ''
+                    GROUP BY pincode 
                     ORDER BY branch_count DESC
                     LIMIT 5
                 """, (state, bank_name))
@@ -73,11 +84,11 @@ def generate_sparsh_summary(db_path):
                     
                     # Get age group distribution for this branch
                     cursor.execute("""
-                        SELECT PSA, COUNT(*) as age_count
-                        FROM pensioner_bank_master 
-                        WHERE data_source LIKE '%SPARSH%' AND state = ? AND bank_name = ? 
-                        AND branch_postcode = ? AND PSA IS NOT NULL
-                        GROUP BY PSA 
+                        SELECT age_bucket, SUM(pensioners) as age_count
+                        FROM pensioner_rollup 
+                        WHERE source_table = 'pensioner_bank_master' AND source LIKE '%SPARSH%' AND state = ? AND bank_name = ? 
+                        AND pincode = ? AND age_bucket != ''
+                        GROUP BY age_bucket 
                         ORDER BY age_count DESC
                     """, (state, bank_name, branch_pin))
                     age_data = cursor.fetchall()
@@ -86,6 +97,7 @@ def generate_sparsh_summary(db_path):
                         print(f"      │   │   ├── {age_group}: {age_count:,} pensioners")
         
         # 2. Detailed breakdown for Andhra Pradesh (as requested)
+        # Family pincodes are not a cube dimension, so this drill-down stays on the raw table
         print(f"\n🔍 DETAILED BREAKDOWN FOR ANDHRA PRADESH:")
         print("-" * 50)
         cursor.execute("""
@@ -123,10 +135,10 @@ def generate_sparsh_summary(db_path):
         print(f"\n👥 AGE GROUP DISTRIBUTION:")
         print("-" * 50)
         cursor.execute("""
-            SELECT PSA, COUNT(*) as count
-            FROM pensioner_bank_master 
-            WHERE data_source LIKE '%SPARSH%' AND PSA IS NOT NULL
-            GROUP BY PSA 
+            SELECT age_bucket, SUM(pensioners) as count
+            FROM pensioner_rollup 
+            WHERE source_table = 'pensioner_bank_master' AND source LIKE '%SPARSH%' AND age_bucket != ''
+            GROUP BY age_bucket 
             ORDER BY count DESC
         """)
         age_distribution = cursor.fetchall()
@@ -141,12 +153,12 @@ def generate_sparsh_summary(db_path):
         cursor.execute("""
             SELECT 
                 CASE 
-                    WHEN data_source LIKE '%FAMILY%' THEN 'Family Pensioners'
+                    WHEN source LIKE '%FAMILY%' THEN 'Family Pensioners'
                     ELSE 'Service Pensioners'
                 END as pensioner_type,
-                COUNT(*) as count
-            FROM pensioner_bank_master 
-            WHERE data_source LIKE '%SPARSH%'
+                SUM(pensioners) as count
+            FROM pensioner_rollup 
+            WHERE source_table = 'pensioner_bank_master' AND source LIKE '%SPARSH%'
             GROUP BY pensioner_type
             ORDER BY count DESC
         """)
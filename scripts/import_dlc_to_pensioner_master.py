@@ -5,10 +5,19 @@ Script to import DLC data from Excel file into pensioner_bank_master table
 """
 
 import sqlite3
+import numpy as np
 import pandas as pd
 import os
+import sys
+import time
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DLCServer'))
+from pensioner_rollup import refresh_rollup
+from state_names import normalize_state_series
+
+IMPORT_BATCH_SIZE = 50000
+
 def import_dlc_data_to_pensioner_master(db_path, excel_file_path):
     """Import DLC data from Excel file into pensioner_bank_master table"""
     print("📥 DLC DATA IMPORT TO PENSIONER MASTER TABLE")
@@ -25,8 +34,9 @@ def import_dlc_data_to_pensioner_master(db_path, excel_file_path):
         
         # Read Excel file
         print("📄 Reading Excel file...")
+        read_started = time.time()
         df = pd.read_excel(excel_file_path)
-        print(f"✅ Successfully read {len(df)} rows from Excel file")
+        print(f"✅ Successfully read {len(df)} rows from Excel file in {time.time() - read_started:.1f}s")
         
         # Display column names for verification
         print(f"\n📋 Excel columns: {list(df.columns)}")
@@ -48,68 +58,66 @@ def import_dlc_data_to_pensioner_master(db_path, excel_file_path):
         # PSA = GCODE (RAILWAY/CIVIL/etc.)
         # ppo_number = We'll generate a unique identifier since it's not in the data
         
-        imported_count = 0
-        skipped_count = 0
-        
         print(f"\n💾 Importing data...")
+        started = time.time()
+        total_rows = len(df)
+        
+        def column(name):
+            """Excel column, or empty strings when the export does not have it"""
+            if name in df.columns:
+                return df[name]
+            return pd.Series('', index=df.index, dtype=object)
+        
+        def pincode_column(name):
+            # Pincodes arrive as text ('110,001'), ints or floats (110001.0)
+            values = column(name).astype(str).str.replace(',', '', regex=False).str.strip()
+            values = values.str.replace(r'\.0+$', '', regex=True)
+            return values.where(column(name).notna(), '')
+        
+        def text_column(name):
+            values = column(name)
+            return values.astype(object).where(values.notna(), None)
+        
+        # Column-wise mapping to pensioner_bank_master
+        # (PSA = GCODE category, ppo_number = synthetic DLC<row number>)
+        records = pd.DataFrame({
+            'bank_name': 'SBI',
+            'branch_name': text_column('BRANCH_NAME'),
+            'branch_postcode': pincode_column('BRANCH_PIN'),
+            'pensioner_city': text_column('PENSIONER DISTNAME'),
+            'state': normalize_state_series(column('PENSIONER STATENAME')),
+            'pensioner_postcode': pincode_column('PENSIONER PINCODE'),
+            'PSA': text_column('GCODE'),
+            'ppo_number': 'DLC' + pd.Series(np.arange(1, total_rows + 1), index=df.index).astype(str).str.zfill(6),
+            'data_source': 'DLC_IMPORT',
+        })
+        
+        imported_count = 0
+        insert_sql = """
+            INSERT INTO pensioner_bank_master (
+                bank_name, branch_name, branch_postcode, 
+                pensioner_city, state, pensioner_postcode, 
+                PSA, ppo_number, data_source
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        # One transaction; one executemany per batch
+        with conn:
+            for batch_start in range(0, total_rows, IMPORT_BATCH_SIZE):
+                batch = records.iloc[batch_start:batch_start + IMPORT_BATCH_SIZE]
+                cursor.executemany(insert_sql, batch.itertuples(index=False, name=None))
+                imported_count += len(batch)
+                elapsed = time.time() - started
+                print(f"   Inserted {imported_count:,}/{total_rows:,} rows "
+                      f"({imported_count / elapsed if elapsed else 0:,.0f} rows/sec)")
         
-        for index, row in df.iterrows():
-            try:
-                # Extract data from row
-                gcode = row.get('GCODE', '')
-                branch_name = row.get('BRANCH_NAME', '')
-                branch_pin = row.get('BRANCH_PIN', '')
-                pensioner_distname = row.get('PENSIONER DISTNAME', '')
-                
-                # Handle state name corrections
-                pensioner_statename = row.get('PENSIONER STATENAME', '')
-                if pensioner_statename == 'GUJRAT':
-                    pensioner_statename = 'GUJARAT'
-                
-                pensioner_pincode = row.get('PENSIONER PINCODE', '')
-                submitted_status = row.get('SUBMITTED_STATUS', '')
-                
-                # Generate a unique PPO-like identifier
-                ppo_number = f"DLC{index+1:06d}"
-                
-                # Insert into pensioner_bank_master table
-                cursor.execute("""
-                    INSERT INTO pensioner_bank_master (
-                        bank_name, branch_name, branch_postcode, 
-                        pensioner_city, state, pensioner_postcode, 
-                        PSA, ppo_number, data_source
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    'SBI',  # bank_name
-                    branch_name,  # branch_name
-                    str(branch_pin).replace(',', '') if pd.notna(branch_pin) else '',  # branch_postcode
-                    pensioner_distname,  # pensioner_city
-                    pensioner_statename,  # state
-                    str(pensioner_pincode).replace(',', '') if pd.notna(pensioner_pincode) else '',  # pensioner_postcode
-                    gcode,  # PSA (category)
-                    ppo_number,  # ppo_number
-                    'DLC_IMPORT'  # data_source
-                ))
-                
-                imported_count += 1
-                
-                # Print progress every 100 rows
-                if (index + 1) % 100 == 0:
-                    print(f"   Processed {index + 1} rows...")
-                    
-            except Exception as e:
-                print(f"   ❌ Error processing row {index + 1}: {e}")
-                skipped_count += 1
-                continue
-        
-        # Commit changes
-        conn.commit()
+        elapsed = time.time() - started
+        refresh_rollup(conn)
         
         print(f"\n📊 IMPORT RESULTS:")
         print("-" * 40)
         print(f"   Successfully imported: {imported_count:,} records")
-        print(f"   Skipped due to errors: {skipped_count:,} records")
-        print(f"   Total rows processed: {len(df):,} records")
+        print(f"   Total rows processed: {total_rows:,} records")
+        print(f"   Insert throughput: {imported_count / elapsed if elapsed else 0:,.0f} rows/sec ({elapsed:.1f}s)")
         
         # Show data source distribution after import
         print(f"\n📋 DATA SOURCE DISTRIBUTION AFTER IMPORT:")
@@ -8,8 +8,12 @@ into pensioner_bank_master table, organized by state, bank, branch pincode, age
 import sqlite3
 import pandas as pd
 import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'DLCServer'))
+from pensioner_rollup import refresh_rollup
+
 def import_sparsh_data(db_path, excel_files):
     """Import SPARSH Defence pensioners data from Excel files"""
     print("📥 SPARSH DEFENCE PENSIONERS DATA IMPORT")
@@ -303,6 +307,7 @@ def import_sparsh_data(db_path, excel_files):
         for bank, count in bank_distribution:
             print(f"   {bank}: {count:,} records")
         
+        refresh_rollup(conn)
         conn.close()
         
         print(f"\n{'='*80}")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Pincode → State Lookup
+Shared loader for pincode_state_mapping.json used by the bank/state processors
+
+The mapping lists 2-digit pincode prefixes per state ('pincodeRanges') plus
+exact-pincode overrides ('specialCases'). It is compiled once per process into
+a 1000-entry array indexed by the first 3 digits, so a lookup is one array
+index instead of a scan over every state's prefix list. A prefix claimed by
+several states keeps the first state in file order, as the old per-processor
+scans did; longer (3-digit) prefixes win over shorter ones.
+
+The file is resolved next to this module, not from the working directory, and
+a missing or empty mapping raises instead of silently returning 'Unknown'.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+MAPPING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pincode_state_mapping.json')
+UNKNOWN_STATE = 'Unknown'
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+class PincodeStateMap:
+    def __init__(self, mapping_path=MAPPING_FILE):
+        """
+        Compile a pincode mapping file into prefix lookup arrays
+
+        Args:
+            mapping_path (str): Path to a pincode_state_mapping.json file
+
+        Raises:
+            FileNotFoundError: The mapping file does not exist
+            ValueError: The file has no usable pincodeRanges
+        """
+        if not os.path.exists(mapping_path):
+            raise FileNotFoundError(
+                f"Pincode state mapping not found: {mapping_path} - every state would resolve to 'Unknown'"
+            )
+        with open(mapping_path, 'r') as f:
+            mapping = json.load(f)
+
+        ranges = mapping.get('pincodeRanges') or {}
+        if not ranges:
+            raise ValueError(f"Pincode state mapping has no pincodeRanges: {mapping_path}")
+
+        self.mapping_path = mapping_path
+        self.by_prefix = np.full(1000, UNKNOWN_STATE, dtype=object)
+        prefix_length = np.zeros(1000, dtype=np.int8)
+        for state, prefixes in ranges.items():
+            for prefix in prefixes:
+                prefix = str(prefix).strip()
+                if not prefix.isdigit() or not 1 <= len(prefix) <= 3:
+                    raise ValueError(f"Invalid pincode prefix {prefix!r} for {state} in {mapping_path}")
+                start = int(prefix) * 10 ** (3 - len(prefix))
+                cells = slice(start, start + 10 ** (3 - len(prefix)))
+                # Earlier states keep shared prefixes; a longer prefix overrides
+                free = prefix_length[cells] < len(prefix)
+                self.by_prefix[cells][free] = state
+                prefix_length[cells][free] = len(prefix)
+
+        self.special_cases = {
+            str(pincode): case for pincode, case in (mapping.get('specialCases') or {}).items()
+        }
+        self.special_states = {
+            pincode: case['state'] for pincode, case in self.special_cases.items() if case.get('state')
+        }
+
+    @staticmethod
+    def _key(pincode):
+        if pincode is None:
+            return None
+        key = str(pincode).strip()
+        return key if len(key) == 6 and key.isdigit() else None
+
+    def state(self, pincode):
+        """
+        Look up the state of one pincode
+
+        Args:
+            pincode: 6-digit pincode as str or int
+
+        Returns:
+            str: State name, or 'Unknown' for invalid or unmapped pincodes
+        """
+        key = self._key(pincode)
+        if key is None:
+            return UNKNOWN_STATE
+        special = self.special_states.get(key)
+        if special:
+            return special
+        return self.by_prefix[int(key[:3])]
+
+    def district(self, pincode):
+        """
+        Look up the district of a pincode listed in specialCases
+
+        Returns:
+            str: District name, or None when the pincode has no special case
+        """
+        key = self._key(pincode)
+        return self.special_cases.get(key, {}).get('district') if key else None
+
+    def states(self, pincodes):
+        """
+        Look up the state of a whole column of pincodes
+
+        Args:
+            pincodes: pandas Series or any iterable of pincodes
+
+        Returns:
+            pd.Series: State names aligned with the input ('Unknown' where invalid)
+        """
+        series = pincodes if isinstance(pincodes, pd.Series) else pd.Series(list(pincodes), dtype=object)
+        keys = series.astype(str).str.strip()
+        valid = keys.str.fullmatch(r'\d{6}').fillna(False).to_numpy(dtype=bool)
+
+        result = np.full(len(keys), UNKNOWN_STATE, dtype=object)
+        prefixes = keys[valid].str[:3].astype(int).to_numpy()
+        result[valid] = self.by_prefix[prefixes]
+        result = pd.Series(result, index=series.index, dtype=object)
+
+        if self.special_states:
+            special = keys.map(self.special_states)
+            result = special.where(special.notna(), result)
+        return result
+
+
+def get_pincode_state_map(mapping_path=MAPPING_FILE):
+    """
+    Return the process-wide PincodeStateMap for a mapping file, compiling it on first use
+
+    Raises:
+        FileNotFoundError / ValueError: see PincodeStateMap
+    """
+    mapping_path = os.path.abspath(mapping_path)
+    with _instances_lock:
+        instance = _instances.get(mapping_path)
+        if instance is None:
+            instance = _instances[mapping_path] = PincodeStateMap(mapping_path)
+    return instance
+
+
+if __name__ == "__main__":
+    import sys
+
+    lookup = get_pincode_state_map()
+    for pincode in sys.argv[1:]:
+        district = lookup.district(pincode)
+        print(f"{pincode}: {lookup.state(pincode)}" + (f" ({district})" if district else ""))
@@ -2,12 +2,13 @@
 """
 Bank-level DLC (Digital Life Certificate) Data Processor
 For banks like Bank of Baroda that provide PSA-wise summary
+Header detection and row parsing: dlc_summary_loader.py
 """
 
-import pandas as pd
 import sqlite3
 import sys
-from datetime import datetime
+
+from dlc_summary_loader import create_summary_tables, load_workbook
 
 class BankDLCProcessor:
     def __init__(self, db_path='../DLC_Database.db'):
@@ -16,85 +17,24 @@ class BankDLCProcessor:
     
     def create_table(self):
         """Create bank-level DLC summary table"""
-        cursor = self.conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS dlc_bank_summary (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                bank_name TEXT NOT NULL,
-                psa_type TEXT NOT NULL,
-                total_pensioners INTEGER DEFAULT 0,
-                manual_lc_submitted INTEGER DEFAULT 0,
-                manual_lc_pending INTEGER DEFAULT 0,
-                completion_percentage REAL DEFAULT 0,
-                fiscal_year TEXT DEFAULT '2024-25',
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(bank_name, psa_type, fiscal_year)
-            )
-        ''')
-        
-        self.conn.commit()
+        create_summary_tables(self.conn)
         print("✅ Bank DLC table created successfully")
     
     def process_bank_file(self, excel_file, bank_name):
         """Process bank-level DLC data"""
         print(f"\n📄 Processing {bank_name} DLC data...")
         
-        # Read Excel
-        df = pd.read_excel(excel_file, sheet_name=0, header=3)
-        print(f"   Found {len(df)} rows")
-        
-        cursor = self.conn.cursor()
-        records = []
-        
-        for idx, row in df.iterrows():
-            try:
-                psa_type = str(row.iloc[1]).strip() if not pd.isna(row.iloc[1]) else None
-                
-                # Handle comma-separated numbers
-                total_str = str(row.iloc[2]).strip().replace(',', '') if not pd.isna(row.iloc[2]) else '0'
-                submitted_str = str(row.iloc[3]).strip().replace(',', '') if not pd.isna(row.iloc[3]) else '0'
-                
-                total = int(float(total_str)) if total_str and total_str != '' else 0
-                submitted = int(float(submitted_str)) if submitted_str and submitted_str != '' else 0
-                
-                if not psa_type or psa_type == '' or 'Name of PSA' in psa_type:
-                    continue
-                
-                # Skip "Others" without data
-                if 'Others' in psa_type and total == 0:
-                    continue
-                
-                pending = total - submitted
-                percentage = (submitted / total * 100) if total > 0 else 0
-                
-                record = (
-                    bank_name,
-                    psa_type,
-                    total,
-                    submitted,
-                    pending,
-                    round(percentage, 2),
-                    '2024-25'
-                )
-                records.append(record)
-                
-                print(f"   ✅ {psa_type}: {submitted}/{total} ({round(percentage, 2)}%)")
-                
-            except Exception as e:
-                if idx < 5:
-                    print(f"   ⚠️  Error at row {idx}: {e}")
+        # Sheets without a "Name of PSA" header are read as the old fixed layout;
+        # only PSA-wise blocks are loaded, as before
+        loaded = load_workbook(self.conn, excel_file, bank_name, fallback_kinds={0: 'bank'}, kinds={'bank'})
+        records = loaded.get('bank')
+        if records is None or records.empty:
+            print(f"\n   ⚠️  No PSA-wise rows found for {bank_name}")
+            return 0
         
-        # Insert with REPLACE to handle duplicates
-        cursor.executemany('''
-            INSERT OR REPLACE INTO dlc_bank_summary 
-            (bank_name, psa_type, total_pensioners, manual_lc_submitted, 
-             manual_lc_pending, completion_percentage, fiscal_year)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', records)
+        for row in records.itertuples(index=False):
+            print(f"   ✅ {row.psa_type}: {row.manual_lc_submitted}/{row.total_pensioners} ({row.completion_percentage}%)")
         
-        self.conn.commit()
         print(f"\n   ✅ Inserted {len(records)} records for {bank_name}")
         return len(records)
     
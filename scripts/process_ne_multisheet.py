@@ -8,32 +8,17 @@ import pandas as pd
 import sqlite3
 import sys
 from datetime import datetime, timedelta
-import json
+
+from pincode_states import get_pincode_state_map
 
 class NEProcessor:
     def __init__(self, db_path='../DLC_Database.db'):
         self.db_path = db_path
         self.conn = None
-        self.pincode_mapping = self.load_pincode_mapping()
+        self.pincode_states = get_pincode_state_map()
         
-    def load_pincode_mapping(self):
-        try:
-            with open('pincode_state_mapping.json', 'r') as f:
-                return json.load(f)
-        except:
-            return {'pincodeRanges': {}, 'specialCases': {}}
-    
     def get_state_from_pincode(self, pincode):
-        if not pincode or len(str(pincode)) != 6:
-            return 'Unknown'
-            
-        pincode_str = str(pincode)
-        prefix = pincode_str[:2]
-            
-        for state, ranges in self.pincode_mapping.get('pincodeRanges', {}).items():
-            if prefix in ranges:
-                return state
-        return 'Unknown'
+        return self.pincode_states.state(pincode)
     
     def excel_date_to_datetime(self, excel_date):
         if pd.isna(excel_date):
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Regression checks for bank_format_mapper against the old per-bank loops
+
+Each check writes a small workbook to a temp directory, loads it into a scratch
+SQLite file and compares the counts/values with what the old iterrows scripts
+stored. Runs standalone (python3 test_bank_format_mapper.py) or under pytest.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from bank_format_mapper import BankFormatLoader, load_format
+
+
+def _load(format_name, rows, header_rows=1):
+    """Write rows (after header_rows title/header lines) to a workbook and load it"""
+    workdir = tempfile.mkdtemp()
+    excel_file = os.path.join(workdir, f'{format_name}.xlsx')
+    db_path = os.path.join(workdir, 'test.db')
+    width = max(len(row) for row in rows)
+    header = [[f'Column {i}' for i in range(width)]] * header_rows
+    pd.DataFrame(header + rows).to_excel(excel_file, header=False, index=False)
+
+    columns = list(load_format(format_name)['target']['values'])
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"CREATE TABLE pensioner_pincode_data (id INTEGER PRIMARY KEY, {', '.join(columns)})")
+    conn.close()
+
+    stats = BankFormatLoader(db_path=db_path, format_name=format_name).process_file(excel_file)
+    conn = sqlite3.connect(db_path)
+    stored = {row[0]: row[1:] for row in conn.execute(
+        "SELECT ppo_number, date_of_birth, age, pensioner_pincode FROM pensioner_pincode_data")}
+    conn.close()
+    return stats, stored
+
+
+def test_hdfc_out_of_range_serial_keeps_sheet():
+    """One DOB serial past datetime64 (19450615) must not drop the sheet; that row gets no DOB"""
+    rows = [[i, f'PPO{i}', 17000 + i, 'CPAO', 'Branch 110001', 'Home 110005', '', 110005]
+            for i in range(5)]
+    rows.append([5, 'PPO5', 19450615, 'CPAO', 'Branch 110001', 'Home 110005', '', 110005])
+    stats, stored = _load('hdfc', rows, header_rows=2)
+    assert stats['inserted'] == 6, stats
+    assert stored['PPO5'][:2] == (None, None), stored['PPO5']
+    assert stored['PPO0'][0] == '17-07-1946', stored['PPO0']
+
+
+def test_idbi_rejects_non_numeric_year():
+    """Old process_idbi.py raised on str(int(year_of_birth)) and counted the row as an error"""
+    rows = [
+        [1, 'P1', 1950, 'CPAO', 'Branch', 110001],
+        [2, 'P2', 'unknown', 'CPAO', 'Branch', 110001],
+        [3, 'P2', 1955, 'CPAO', 'Branch', 110001],
+        [4, 'P4', None, 'CPAO', 'Branch', ' 110001 '],
+    ]
+    stats, stored = _load('idbi', rows)
+    assert (stats['inserted'], stats['duplicates'], stats['errors']) == (2, 1, 1), stats
+    assert stored['P1'] == ('1950', pd.Timestamp.now().year - 1950, '110001'), stored['P1']
+    assert stored['P4'][2] == '110001', stored['P4']
+
+
+def main():
+    failures = 0
+    for name, check in sorted(globals().items()):
+        if name.startswith('test_'):
+            try:
+                check()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failures += 1
+                print(f"❌ {name}: {e}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,8 +16,10 @@ from aes_encryption import encrypt_json_data, decrypt_json_data
 USERNAME = "UserJP"
 PLAIN_PASSWORD = "29#@JP25bhaV"
 PWD_SECRET_KEY = "bam5kllfzjzvjv560s5q24fnwbtqs50d"
-AUTH_URL = "https://ipension.nic.in/JPWrapper/api/Auth"
-REPORT_URL = "https://ipension.nic.in/JPWrapper/api/Broker/Report"
+# Point JP_BASE_URL at mock_jp_server.py (e.g. http://127.0.0.1:5050) for local load tests
+JP_BASE_URL = os.getenv("JP_BASE_URL", "https://ipension.nic.in")
+AUTH_URL = f"{JP_BASE_URL}/JPWrapper/api/Auth"
+REPORT_URL = f"{JP_BASE_URL}/JPWrapper/api/Broker/Report"
 AES_KEY = "3sw6dmhh2vsrjpo5ba36myv6qt5j20fd"
 
 # Test date: 05.11.2024 (expected ~700k records, ~300MB)